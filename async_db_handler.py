@@ -0,0 +1,141 @@
+# Python/third-party imports
+from collections.abc import Callable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import pandas as pd
+
+# Internal imports
+from db_handler import DBHandler
+
+
+def run_coroutine(coroutine: Coroutine):
+    """
+    Runs a coroutine to completion from synchronous code.
+
+    `asyncio.run` raises RuntimeError when the caller already runs inside
+    an event loop (e.g. a notebook or an asynchronous service). In that case
+    the coroutine is run on its own event loop in a worker thread, blocking
+    the caller like the rest of the synchronous stage.
+
+    Parameters
+    ----------
+    coroutine : Coroutine
+        The coroutine to run.
+
+    Returns
+    -------
+    Any
+        The value returned by the coroutine.
+    """
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class AsyncDBHandler:
+    def __init__(self, db_handler: DBHandler):
+        """
+        Initialize the AsyncDBHandler object.
+
+        The handler exposes the DBHandler methods as coroutines. The
+        database drivers are blocking, so every call is offloaded to a
+        worker thread with its own pooled connection, which lets independent
+        loads and inserts of a stage run concurrently with
+        `asyncio.gather`.
+
+        Parameters
+        ----------
+        db_handler : DBHandler
+            The synchronous handler performing the work.
+
+        Attributes
+        ----------
+        db_handler : DBHandler
+            The synchronous handler performing the work.
+        """
+
+        self.db_handler = db_handler
+
+
+    async def run(self, function: Callable, **kwargs):
+        """
+        Runs a blocking function in a worker thread.
+
+        Parameters
+        ----------
+        function : Callable
+            The function to run.
+        **kwargs
+            Keyword arguments passed to the function.
+
+        Returns
+        -------
+        Any
+            The value returned by the function.
+        """
+
+        return await asyncio.to_thread(function, **kwargs)
+
+
+    async def insert_data(
+        self,
+        table_name: str,
+        schema_name: str,
+        data: pd.DataFrame,
+        chunksize: int | None = None,
+        use_staging: bool = False,
+        key_columns: list[str] | None = None
+    ) -> str:
+        """
+        Coroutine version of `DBHandler.insert_data`.
+        """
+
+        return await self.run(
+            self.db_handler.insert_data,
+            table_name=table_name,
+            schema_name=schema_name,
+            data=data,
+            chunksize=chunksize,
+            use_staging=use_staging,
+            key_columns=key_columns
+        )
+
+
+    async def load_data(
+        self,
+        table_name: str,
+        schema_name: str,
+        columns: list[str] | str = '*',
+        timestamps_list: list[int] = None
+    ) -> pd.DataFrame:
+        """
+        Coroutine version of `DBHandler.load_data`.
+        """
+
+        return await self.run(
+            self.db_handler.load_data,
+            table_name=table_name,
+            schema_name=schema_name,
+            columns=columns,
+            timestamps_list=timestamps_list
+        )
+
+
+    async def get_max_and_min_time(
+        self,
+        table_name: str,
+        schema_name: str
+    ) -> pd.DataFrame:
+        """
+        Coroutine version of `DBHandler.get_max_and_min_time`.
+        """
+
+        return await self.run(
+            self.db_handler.get_max_and_min_time,
+            table_name=table_name,
+            schema_name=schema_name
+        )
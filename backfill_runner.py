@@ -0,0 +1,192 @@
+# Python/third-party imports
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Internal imports
+from settings import Settings
+from engine_registry import engine_registry
+from db_handler import DBHandler
+from sensor_cache import sensor_cache_from_settings
+from calculate import DestructionAccumulator, calculate_destruction
+from fixed_point import quantize_outputs
+from calculation_runner import check_last_destruction
+
+
+def backfill_runner(
+    start_timestamp: int,
+    stop_timestamp: int,
+    last_results_timestamp: int,
+    accumulator: DestructionAccumulator | None = None,
+    shard_size: int = 24 * 60 * 60,
+    max_workers: int | None = None
+) -> tuple[float, str, int, int]:
+    """
+    Calculates the destruction for a long range of unprocessed sensor data
+    in parallel and saves the results to the database.
+
+    The range is split into shards. Every shard is loaded and its
+    per-second destruction and shard-local cumulative destruction are
+    calculated in a separate process. The shard totals are then turned into
+    shard offsets with an exclusive prefix-sum, so the cumulative destruction
+    of the whole range is stitched without recalculating any shard.
+
+    Parameters
+    ----------
+    start_timestamp : int
+        The start timestamp of the data to be processed.
+    stop_timestamp : int
+        The end timestamp of the data to be processed.
+    last_results_timestamp : int
+        The latest timestamp of the results in the database.
+    accumulator : DestructionAccumulator | None, optional
+        The running destruction state, used as in `calculation_runner` and
+        moved to the end of the backfilled range. Defaults to None.
+    shard_size : int, optional
+        The number of seconds in one shard. Defaults to one day.
+    max_workers : int | None, optional
+        The number of worker processes. Defaults to None (number of CPUs).
+
+    Returns
+    -------
+    tuple[float, str, int, int]
+        A tuple containing the latest destruction, a saving message,
+        the first timestamp of the results, and the last timestamp of the
+        results (the same as `calculation_runner`).
+    """
+
+    # Load settings
+    server_name, _, _, results_db_settings, _ = Settings().get_db_settings()
+    bulk_insert_settings = Settings().get_bulk_insert_settings()
+    results_db = DBHandler(
+        server_name=server_name,
+        database_name=results_db_settings['database']
+    )
+    column_names = results_db_settings['columns']
+
+    # Get the latest destruction
+    if accumulator is None:
+        accumulator = DestructionAccumulator(column_names=column_names)
+    if (
+        last_results_timestamp is None
+        or accumulator.last_timestamp != last_results_timestamp
+    ):
+        accumulator.reset(
+            latest_destruction=check_last_destruction(
+                results_db=results_db,
+                results_db_settings=results_db_settings,
+                last_results_timestamp=last_results_timestamp
+            ),
+            last_timestamp=last_results_timestamp,
+            reset_damage_model=True
+        )
+
+    # Calculate the shards in parallel
+    shard_starts = list(range(start_timestamp, stop_timestamp + 1, shard_size))
+    shard_stops = [
+        min(shard_start + shard_size - 1, stop_timestamp)
+        for shard_start in shard_starts
+    ]
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=configure_worker
+    ) as executor:
+        shards = list(executor.map(
+            calculate_shard,
+            shard_starts,
+            shard_stops,
+            [column_names] * len(shard_starts)
+        ))
+    shards = [shard for shard in shards if not shard.empty]
+    if not shards:
+        raise ValueError('There is no sensor data in the backfill range.')
+
+    # Stitch the cumulative destruction with the shard offsets
+    shard_totals = np.array(
+        [shard[column_names[2]].iloc[-1] for shard in shards]
+    )
+    shard_offsets = np.concatenate(
+        ([0.0], np.cumsum(shard_totals)[:-1])
+    ) + accumulator.latest_destruction
+    for shard, shard_offset in zip(shards, shard_offsets):
+        shard[column_names[2]] += shard_offset
+    destruction = pd.concat(shards, ignore_index=True)
+    latest_destruction = destruction[column_names[2]].iloc[-1]
+    quantize_outputs(
+        data=destruction,
+        columns=column_names[1:],
+        fixed_point_settings=Settings().get_fixed_point_settings()
+    )
+
+    # Save the results in bulk
+    saving_message = results_db.insert_data(
+        table_name=results_db_settings['table'],
+        schema_name=results_db_settings['schema'],
+        data=destruction,
+        chunksize=bulk_insert_settings['chunksize'],
+        use_staging=bulk_insert_settings['use_staging']
+    )
+    accumulator.reset(
+        latest_destruction=latest_destruction,
+        last_timestamp=destruction[column_names[0]].iloc[-1]
+    )
+    return (
+        accumulator.latest_destruction,
+        saving_message,
+        destruction[column_names[0]].iloc[0],
+        destruction[column_names[0]].iloc[-1]
+    )
+
+
+def configure_worker():
+    """
+    Prepares the engine registry of a worker process. Connections inherited
+    from the parent process are dropped without closing them.
+    """
+
+    engine_registry.dispose_all(close=False)
+    engine_registry.configure_from_settings(Settings())
+
+
+def calculate_shard(
+    start_timestamp: int,
+    stop_timestamp: int,
+    column_names: list
+) -> pd.DataFrame:
+    """
+    Loads one shard of sensor data and calculates its destruction and
+    shard-local cumulative destruction (starting from 0).
+
+    Parameters
+    ----------
+    start_timestamp : int
+        The start timestamp of the shard.
+    stop_timestamp : int
+        The end timestamp of the shard.
+    column_names : list
+        A list containing the column names for the resulting DataFrame.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A DataFrame with columns for timestamps, destruction percentage, and
+        shard-local cumulative destruction.
+    """
+
+    server_name, _, sensors_db_settings, _, _ = Settings().get_db_settings()
+    sensors_db = DBHandler(
+        server_name=server_name,
+        database_name=sensors_db_settings['database'],
+        use_watermarks=False,
+        cache=sensor_cache_from_settings(Settings().get_cache_settings())
+    )
+    sensor_data = sensors_db.load_data(
+        table_name=sensors_db_settings['table'],
+        schema_name=sensors_db_settings['schema'],
+        timestamps_list=[start_timestamp, stop_timestamp]
+    )
+    sensor_data.sort_values(by='timestamp', inplace=True)
+    return calculate_destruction(
+        column_names=column_names,
+        sensor_data=sensor_data
+    )
@@ -0,0 +1,97 @@
+# Python/third-party imports
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import os
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+# Internal imports
+from model_types import set_n_jobs
+
+
+def single_threaded(model: object) -> object:
+    """
+    Returns a shallow copy of a model predicting on one thread, so the
+    chunks of `predict_in_chunks` do not start their own thread pools. The
+    fitted arrays are shared with the model, which is left unchanged (e.g.
+    the instance of the model cache used by other callers).
+
+    Parameters
+    ----------
+    model : object
+        The fitted model. Models without `get_params` (e.g. a flattened
+        forest or a lookup table) are returned as they are.
+
+    Returns
+    -------
+    object
+        The single-threaded model.
+    """
+
+    if not hasattr(model, 'get_params'):
+        return model
+    model = copy.copy(model)
+    if isinstance(model, Pipeline):
+        model.steps = [(name, copy.copy(step)) for name, step in model.steps]
+    set_n_jobs(model, 1)
+    return model
+
+
+def predict_in_chunks(
+    model: object,
+    data_chunks: Iterable[pd.DataFrame],
+    feature_columns: list[str],
+    chunk_size: int = 16_384,
+    max_workers: int | None = None
+) -> Iterator[tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Predicts a stream of data in fixed-size chunks on a thread pool and
+    yields the predictions in the input order.
+
+    The data is split into chunks of `chunk_size` rows, which keeps the
+    intermediate arrays of the model small, and the chunks are predicted in
+    parallel (the tree traversal of scikit-learn releases the GIL) by a
+    single-threaded copy of the model, so the pool is the only source of
+    parallelism. At most two chunks per worker are in flight, so the memory
+    usage does not depend on the length of the data, and the next input
+    chunk is read while the previous ones are predicted.
+
+    Parameters
+    ----------
+    model : object
+        The fitted model with a `predict` method.
+    data_chunks : Iterable[pandas.DataFrame]
+        The data to predict, e.g. the chunks of `DBHandler.iter_data`.
+    feature_columns : list[str]
+        The feature columns of the model.
+    chunk_size : int, optional
+        The number of rows predicted at once. Defaults to 16 384.
+    max_workers : int | None, optional
+        The number of threads. Defaults to None (all cores).
+
+    Yields
+    ------
+    tuple[pandas.DataFrame, np.ndarray]
+        The chunk of the data and its predictions.
+    """
+
+    max_workers = max_workers or os.cpu_count() or 1
+    model = single_threaded(model)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for data in data_chunks:
+            for start in range(0, len(data), chunk_size):
+                chunk = data.iloc[start:start + chunk_size]
+                pending.append((
+                    chunk,
+                    executor.submit(model.predict, chunk[feature_columns])
+                ))
+                if len(pending) >= 2 * max_workers:
+                    chunk, prediction = pending.popleft()
+                    yield chunk, prediction.result()
+        while pending:
+            chunk, prediction = pending.popleft()
+            yield chunk, prediction.result()
@@ -1,11 +1,77 @@
 # Python/third-party imports
+from pathlib import Path
+import json
+import os
+import numpy as np
 import pandas as pd
 
 
+def destruction_kernel(
+    torque: np.ndarray,
+    speed: np.ndarray,
+    oli_temperature: np.ndarray,
+    latest_destruction: float = 0,
+    destruction_out: np.ndarray | None = None,
+    accumulated_out: np.ndarray | None = None,
+    dtype: type = np.float64
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the destruction and cumulative destruction on contiguous
+    arrays without temporary allocations.
+
+    Parameters
+    ----------
+    torque : np.ndarray
+        The torque readings [Nm].
+    speed : np.ndarray
+        The speed readings [RPM].
+    oli_temperature : np.ndarray
+        The oil temperature readings [C].
+    latest_destruction : float, optional
+        The initial destruction value to be added to the cumulative destruction.
+        Default is 0.
+    destruction_out : np.ndarray | None, optional
+        Preallocated array for the destruction. It may be the `torque` array
+        itself to calculate in place. If None, a new array is allocated.
+    accumulated_out : np.ndarray | None, optional
+        Preallocated array for the cumulative destruction. It may be the
+        `speed` array itself to calculate in place. If None, a new array is
+        allocated.
+    dtype : type, optional
+        The floating point type of the calculations, np.float32 halves the
+        memory usage at the cost of precision of long cumulative sums.
+        Default is np.float64.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        The destruction percentage and the cumulative destruction.
+    """
+
+    torque = np.ascontiguousarray(torque, dtype=dtype)
+    speed = np.ascontiguousarray(speed, dtype=dtype)
+    oli_temperature = np.ascontiguousarray(oli_temperature, dtype=dtype)
+    if destruction_out is None:
+        destruction_out = np.empty(torque.shape, dtype=dtype)
+    if accumulated_out is None:
+        accumulated_out = np.empty(torque.shape, dtype=dtype)
+
+    # The cumulative output is used as a scratch buffer for the speed
+    np.divide(speed, 60, out=accumulated_out)  # [RPS]
+    np.divide(torque, 1_000_000, out=destruction_out)  # [MNm]
+    np.multiply(destruction_out, accumulated_out, out=destruction_out)
+    np.add(destruction_out, oli_temperature, out=destruction_out)
+    np.divide(destruction_out, 5_000_000, out=destruction_out)  # [%]
+    np.cumsum(destruction_out, out=accumulated_out)
+    accumulated_out += latest_destruction
+    return destruction_out, accumulated_out
+
+
 def calculate_destruction(
     column_names: list,
     sensor_data: pd.DataFrame,
-    latest_destruction: float = 0
+    latest_destruction: float = 0,
+    dtype: type = np.float64
 ) -> pd.DataFrame:
     """
     Calculates the destruction percentage based on sensor data and returns
@@ -21,6 +87,8 @@ def calculate_destruction(
     latest_destruction : float, optional
         The initial destruction value to be added to the cumulative destruction.
         Default is 0.
+    dtype : type, optional
+        The floating point type of the calculations. Default is np.float64.
 
     Returns
     -------
@@ -29,18 +97,303 @@ def calculate_destruction(
         cumulative destruction.
     """
 
-    torque = sensor_data['torque'] / 1_000_000  # [MNm]
-    speed = sensor_data['speed'] / 60   # [RPS]
-    oli_temperature = sensor_data['oli_temperature']
-    destruction = (torque * speed + oli_temperature)/ 5_000_000 # [%]
-
+    destruction, accumulated_destruction = destruction_kernel(
+        torque=sensor_data['torque'].to_numpy(),
+        speed=sensor_data['speed'].to_numpy(),
+        oli_temperature=sensor_data['oli_temperature'].to_numpy(),
+        latest_destruction=latest_destruction,
+        dtype=dtype
+    )
     result = pd.DataFrame(
         {
-            column_names[0]: sensor_data['timestamp'],
-            column_names[1]: destruction
+            column_names[0]: sensor_data['timestamp'].to_numpy(),
+            column_names[1]: destruction,
+            column_names[2]: accumulated_destruction
+        },
+        copy=False
+    )
+    return result
+
+
+class DestructionAccumulator:
+    def __init__(
+        self,
+        column_names: list,
+        latest_destruction: float = 0,
+        last_timestamp: int | None = None,
+        dtype: type = np.float64,
+        damage_model=None
+    ):
+        """
+        Initialize the DestructionAccumulator object.
+
+        The accumulator holds the running cumulative destruction between
+        batches, so a continuously running pipeline does not have to read
+        the last result back from the database before every batch.
+
+        Parameters
+        ----------
+        column_names : list
+            A list containing the column names for the resulting DataFrames.
+        latest_destruction : float, optional
+            The cumulative destruction at `last_timestamp`. Default is 0.
+        last_timestamp : int | None, optional
+            The timestamp of the last processed sensor reading. Default is
+            None (nothing processed yet).
+        dtype : type, optional
+            The floating point type of the calculations, also of the outputs
+            of a damage model and their cumulative sum.
+            Default is np.float64.
+        damage_model : optional
+            A damage model from `damage_models` calculating the destruction
+            of every reading. Its state (e.g. the rainflow residual) is
+            carried between batches and saved in the checkpoint. Default is
+            None (the instantaneous formula of `calculate_destruction`).
+        """
+
+        self.column_names = column_names
+        self.latest_destruction = float(latest_destruction)
+        self.last_timestamp = last_timestamp
+        self.dtype = dtype
+        self.damage_model = damage_model
+
+
+    def update(self, sensor_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Consumes a chunk of sensor data of any size and returns its
+        destruction and cumulative destruction.
+
+        Parameters
+        ----------
+        sensor_data : DataFrame
+            Sensor data sorted by timestamp, following the already consumed
+            chunks.
+
+        Returns
+        -------
+        result : DataFrame
+            A DataFrame with columns for timestamps, destruction percentage,
+            and cumulative destruction.
+
+        Raises
+        ------
+        ValueError
+            If the chunk starts before the last consumed timestamp.
+        """
+
+        if (
+            self.last_timestamp is not None
+            and len(sensor_data)
+            and sensor_data['timestamp'].iloc[0] <= self.last_timestamp
+        ):
+            raise ValueError(
+                f"Sensor data must start after the last consumed timestamp "
+                f"{self.last_timestamp}."
+            )
+        if self.damage_model is None:
+            result = calculate_destruction(
+                column_names=self.column_names,
+                sensor_data=sensor_data,
+                latest_destruction=self.latest_destruction,
+                dtype=self.dtype
+            )
+        else:
+            destruction = np.asarray(
+                self.damage_model.calculate(sensor_data),
+                dtype=self.dtype
+            )
+            accumulated_destruction = np.cumsum(destruction, dtype=self.dtype)
+            accumulated_destruction += self.latest_destruction
+            result = pd.DataFrame(
+                {
+                    self.column_names[0]: sensor_data['timestamp'].to_numpy(),
+                    self.column_names[1]: destruction,
+                    self.column_names[2]: accumulated_destruction
+                },
+                copy=False
+            )
+        if len(result):
+            self.reset(
+                latest_destruction=result[self.column_names[2]].iloc[-1],
+                last_timestamp=result[self.column_names[0]].iloc[-1]
+            )
+        return result
+
+
+    def reset(
+        self,
+        latest_destruction: float,
+        last_timestamp: int | None,
+        reset_damage_model: bool = False
+    ):
+        """
+        Overwrites the running state, e.g. with values read from the results
+        database.
+
+        Parameters
+        ----------
+        latest_destruction : float
+            The cumulative destruction at `last_timestamp`.
+        last_timestamp : int | None
+            The timestamp of the last processed sensor reading.
+        reset_damage_model : bool, optional
+            If True, the state of the damage model (e.g. the rainflow
+            residual) is cleared too, as it does not belong to the new
+            position. Default is False.
+        """
+
+        self.latest_destruction = float(latest_destruction)
+        self.last_timestamp = (
+            None if last_timestamp is None else int(last_timestamp)
+        )
+        if reset_damage_model and self.damage_model is not None:
+            self.damage_model.reset()
+
+
+    def checkpoint(self) -> dict:
+        """
+        Returns the running state as a JSON serializable dictionary.
+
+        Returns
+        -------
+        dict
+            A dictionary with `latest_destruction` and `last_timestamp` keys
+            and the `damage_model` state if a damage model is used.
+        """
+
+        state = {
+            'latest_destruction': self.latest_destruction,
+            'last_timestamp': self.last_timestamp
         }
+        if self.damage_model is not None:
+            state['damage_model'] = self.damage_model.checkpoint()
+        return state
+
+
+    def restore(self, state: dict):
+        """
+        Restores the running state saved with `checkpoint`.
+
+        Parameters
+        ----------
+        state : dict
+            A dictionary with `latest_destruction` and `last_timestamp` keys
+            and optionally the `damage_model` state.
+        """
+
+        self.reset(
+            latest_destruction=state['latest_destruction'],
+            last_timestamp=state['last_timestamp']
+        )
+        if self.damage_model is not None and 'damage_model' in state:
+            self.damage_model.restore(state['damage_model'])
+
+
+    def save(self, checkpoint_path: Path):
+        """
+        Saves the running state to a JSON file. The file is replaced
+        atomically, so readers never see a partially written state.
+
+        Parameters
+        ----------
+        checkpoint_path : Path
+            The path of the checkpoint file.
+        """
+
+        checkpoint_path = Path(checkpoint_path)
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = checkpoint_path.with_suffix('.tmp')
+        with open(temporary_path, 'w') as checkpoint_json:
+            json.dump(self.checkpoint(), checkpoint_json, indent=4)
+        os.replace(temporary_path, checkpoint_path)
+
+
+    def load(self, checkpoint_path: Path) -> bool:
+        """
+        Restores the running state from a JSON file saved with `save`.
+
+        Parameters
+        ----------
+        checkpoint_path : Path
+            The path of the checkpoint file.
+
+        Returns
+        -------
+        bool
+            True if the state was restored, False if there is no file.
+        """
+
+        if not os.path.isfile(checkpoint_path):
+            return False
+        with open(checkpoint_path, 'r') as checkpoint_json:
+            self.restore(json.load(checkpoint_json))
+        return True
+
+
+def calculate_fleet_destruction(
+    column_names: list,
+    sensor_data: pd.DataFrame,
+    asset_column: str = 'asset_id',
+    latest_destruction: dict | None = None,
+    dtype: type = np.float64
+) -> pd.DataFrame:
+    """
+    Calculates the destruction of many assets in one vectorized pass and
+    returns the result as a DataFrame.
+
+    Parameters
+    ----------
+    column_names : list
+        A list containing the column names for the resulting DataFrame.
+    sensor_data : DataFrame
+        A DataFrame containing the sensor data of all assets with columns
+        'torque', 'speed', 'oli_temperature', 'timestamp' and the asset
+        column.
+    asset_column : str, optional
+        The name of the column identifying the assets. Default is 'asset_id'.
+    latest_destruction : dict | None, optional
+        The initial destruction value of every asset to be added to its
+        cumulative destruction. Assets without a value start from 0.
+        Default is None.
+    dtype : type, optional
+        The floating point type of the calculations. Default is np.float64.
+
+    Returns
+    -------
+    result : DataFrame
+        A DataFrame sorted by asset and timestamp with columns for
+        timestamps, assets, destruction percentage, and per-asset cumulative
+        destruction.
+    """
+
+    sensor_data = sensor_data.sort_values(
+        by=[asset_column, 'timestamp'],
+        ignore_index=True
     )
-    result[column_names[2]] = (
-            result[column_names[1]].cumsum() + latest_destruction
+    assets = sensor_data[asset_column]
+    destruction, _ = destruction_kernel(
+        torque=sensor_data['torque'].to_numpy(),
+        speed=sensor_data['speed'].to_numpy(),
+        oli_temperature=sensor_data['oli_temperature'].to_numpy(),
+        dtype=dtype
+    )
+    accumulated_destruction = (
+        pd.Series(destruction, copy=False)
+        .groupby(assets.to_numpy(), sort=False)
+        .cumsum()
+        .to_numpy()
+    )
+    if latest_destruction:
+        accumulated_destruction = accumulated_destruction + (
+            assets.map(latest_destruction).fillna(0).to_numpy(dtype=dtype)
+        )
+    result = pd.DataFrame(
+        {
+            column_names[0]: sensor_data['timestamp'].to_numpy(),
+            asset_column: assets.to_numpy(),
+            column_names[1]: destruction,
+            column_names[2]: accumulated_destruction
+        },
+        copy=False
     )
     return result
@@ -1,7 +1,15 @@
+# Python/third-party imports
+import asyncio
+import pandas as pd
+
 # Internal imports
 from settings import Settings
 from db_handler import DBHandler
-from calculate import calculate_destruction
+from async_db_handler import AsyncDBHandler, run_coroutine
+from sensor_cache import sensor_cache_from_settings
+from calculate import DestructionAccumulator, calculate_fleet_destruction
+from fixed_point import quantize_outputs
+from logger_handler import logger_handler
 from plotter_seaborn import three_separate_subplots, one_plot
 
 
@@ -9,7 +17,8 @@ def calculation_runner(
     start_timestamp: int,
     stop_timestamp: int,
     last_results_timestamp: int,
-    plot_data:bool = True
+    plot_data:bool = True,
+    accumulator: DestructionAccumulator | None = None
 ) -> tuple[float, str, int, int]:
     """
     Runs the calculations and saves the results to the database.
@@ -25,6 +34,11 @@ def calculation_runner(
         The latest timestamp of the results in the database.
     plot_data : bool, optional
         If True, plots the input data and results. Defaults to True.
+    accumulator : DestructionAccumulator | None, optional
+        The running destruction state. If its last timestamp matches
+        `last_results_timestamp`, the latest destruction is not read from
+        the database. Otherwise, it is reset with the database value.
+        Defaults to None (a new accumulator).
 
     Returns
     -------
@@ -37,46 +51,98 @@ def calculation_runner(
     server_name, settings, sensors_db_settings, results_db_settings, _ = (
         Settings().get_db_settings()
     )
+    bulk_insert_settings = Settings().get_bulk_insert_settings()
 
     # Get the objects of dbs
     sensors_db = DBHandler(
         server_name=server_name,
-        database_name=sensors_db_settings['database']
+        database_name=sensors_db_settings['database'],
+        use_watermarks=False,
+        cache=sensor_cache_from_settings(Settings().get_cache_settings())
     )
     results_db = DBHandler(
         server_name=server_name,
         database_name=results_db_settings['database']
     )
 
-    # Load sensor data batch
-    sensor_data = sensors_db.load_data(
+    # Check the batch in the coverage index before loading the data, the
+    # index of the sensors table is kept in the results database
+    coverage = sensors_db.get_coverage(
         table_name=sensors_db_settings['table'],
         schema_name=sensors_db_settings['schema'],
-        timestamps_list=[start_timestamp, stop_timestamp]
+        timestamps_list=[start_timestamp, stop_timestamp],
+        index_db=results_db
     )
-    sensor_data.sort_values(by='timestamp', inplace=True)
+    last_sensor_timestamp = coverage.last_timestamp()
+    if (
+        last_sensor_timestamp is None
+        or last_sensor_timestamp < start_timestamp
+    ):
+        raise ValueError('There is no sensor data in the batch.')
+    gaps = coverage.missing_ranges(
+        start_timestamp, min(stop_timestamp, last_sensor_timestamp)
+    )
+    if gaps:
+        logger_handler().warning(
+            f"Sensor data is missing for "
+            f"{sum(gap_stop - gap_start + 1 for gap_start, gap_stop in gaps)}"
+            f" s of the batch in {len(gaps)} gaps, the first one: "
+            f"{pd.to_datetime(gaps[0][0], unit='s')} - "
+            f"{pd.to_datetime(gaps[0][1], unit='s')}"
+        )
 
-    # Get the latest destruction
-    latest_destruction = check_last_destruction(
-        results_db=results_db,
-        results_db_settings=results_db_settings,
-        last_results_timestamp=last_results_timestamp
+    if accumulator is None:
+        accumulator = DestructionAccumulator(
+            column_names=results_db_settings['columns']
+        )
+    accumulator_in_sync = (
+        last_results_timestamp is not None
+        and accumulator.last_timestamp == last_results_timestamp
     )
 
+    # Load sensor data batch and the latest destruction concurrently
+    if accumulator_in_sync:
+        sensor_data = sensors_db.load_data(
+            table_name=sensors_db_settings['table'],
+            schema_name=sensors_db_settings['schema'],
+            timestamps_list=[start_timestamp, stop_timestamp]
+        )
+    else:
+        sensor_data, latest_destruction = run_coroutine(
+            load_calculation_inputs(
+                sensors_db=AsyncDBHandler(sensors_db),
+                results_db=AsyncDBHandler(results_db),
+                sensors_db_settings=sensors_db_settings,
+                results_db_settings=results_db_settings,
+                start_timestamp=start_timestamp,
+                stop_timestamp=stop_timestamp,
+                last_results_timestamp=last_results_timestamp
+            )
+        )
+        accumulator.reset(
+            latest_destruction=latest_destruction,
+            last_timestamp=last_results_timestamp,
+            reset_damage_model=True
+        )
+    sensor_data.sort_values(by='timestamp', inplace=True)
+
     # Calculate the destruction and save it to db
-    destruction = calculate_destruction(
-        column_names=results_db_settings['columns'],
-        sensor_data=sensor_data,
-        latest_destruction=latest_destruction
-    )
+    destruction = accumulator.update(sensor_data)
     destruction.sort_values(by='timestamp', inplace=True)
     latest_destruction = destruction["accumulated_destruction"].max()
     first_results_timestamp = destruction["timestamp"].min()
     latest_results_timestamp = destruction["timestamp"].max()
+    quantize_outputs(
+        data=destruction,
+        columns=results_db_settings['columns'][1:],
+        fixed_point_settings=Settings().get_fixed_point_settings()
+    )
     saving_message = results_db.insert_data(
         table_name=results_db_settings['table'],
         schema_name=results_db_settings['schema'],
-        data=destruction
+        data=destruction,
+        chunksize=bulk_insert_settings['chunksize'],
+        use_staging=bulk_insert_settings['use_staging']
     )
 
     # Plot the input data and results
@@ -112,6 +178,162 @@ def calculation_runner(
     )
 
 
+def fleet_calculation_runner(
+    start_timestamp: int,
+    stop_timestamp: int,
+    last_results_timestamp: int,
+    asset_column: str = 'asset_id'
+) -> tuple[dict, str, int, int]:
+    """
+    Runs the calculations for all assets of the fleet stored in one sensor
+    table and saves the results to the database in one pass.
+
+    Parameters
+    ----------
+    start_timestamp : int
+        The start timestamp of the data to be processed.
+    stop_timestamp : int
+        The end timestamp of the data to be processed.
+    last_results_timestamp : int
+        The latest timestamp of the results in the database.
+    asset_column : str, optional
+        The name of the column identifying the assets in the sensors and
+        results tables. Defaults to 'asset_id'.
+
+    Returns
+    -------
+    tuple[dict, str, int, int]
+        A tuple containing the latest destruction of every asset, a saving
+        message, the first timestamp of the results, and the last timestamp
+        of the results.
+    """
+    # Load settings
+    server_name, settings, sensors_db_settings, results_db_settings, _ = (
+        Settings().get_db_settings()
+    )
+    bulk_insert_settings = Settings().get_bulk_insert_settings()
+    column_names = results_db_settings['columns']
+
+    # Get the objects of dbs
+    sensors_db = DBHandler(
+        server_name=server_name,
+        database_name=sensors_db_settings['database'],
+        use_watermarks=False,
+        cache=sensor_cache_from_settings(Settings().get_cache_settings())
+    )
+    results_db = DBHandler(
+        server_name=server_name,
+        database_name=results_db_settings['database']
+    )
+
+    # Load the fleet sensor data and the latest destruction of every asset
+    sensor_data = sensors_db.load_data(
+        table_name=sensors_db_settings['table'],
+        schema_name=sensors_db_settings['schema'],
+        timestamps_list=[start_timestamp, stop_timestamp]
+    )
+    if sensor_data.empty:
+        raise ValueError('There is no sensor data in the batch.')
+    if last_results_timestamp is None:
+        latest_destruction = {}
+    else:
+        # The data of the assets may end at different timestamps
+        last_results = results_db.load_latest_rows(
+            table_name=results_db_settings['table'],
+            schema_name=results_db_settings['schema'],
+            group_column=asset_column,
+            columns=[asset_column, column_names[2]],
+            stop_timestamp=last_results_timestamp
+        )
+        latest_destruction = dict(zip(
+            last_results[asset_column],
+            last_results[column_names[2]]
+        ))
+
+    # Calculate the destruction of all assets and save it to db
+    destruction = calculate_fleet_destruction(
+        column_names=column_names,
+        sensor_data=sensor_data,
+        asset_column=asset_column,
+        latest_destruction=latest_destruction
+    )
+    quantize_outputs(
+        data=destruction,
+        columns=column_names[1:3],
+        fixed_point_settings=Settings().get_fixed_point_settings()
+    )
+    saving_message = results_db.insert_data(
+        table_name=results_db_settings['table'],
+        schema_name=results_db_settings['schema'],
+        data=destruction,
+        chunksize=bulk_insert_settings['chunksize'],
+        use_staging=bulk_insert_settings['use_staging'],
+        key_columns=[column_names[0], asset_column]
+    )
+    latest_destruction = (
+        destruction.groupby(asset_column)[column_names[2]].last().to_dict()
+    )
+    return (
+        latest_destruction,
+        saving_message,
+        destruction[column_names[0]].min(),
+        destruction[column_names[0]].max()
+    )
+
+
+async def load_calculation_inputs(
+    sensors_db: AsyncDBHandler,
+    results_db: AsyncDBHandler,
+    sensors_db_settings: dict,
+    results_db_settings: dict,
+    start_timestamp: int,
+    stop_timestamp: int,
+    last_results_timestamp: int = None
+) -> tuple[pd.DataFrame, float]:
+    """
+    Loads the sensor data batch and the latest destruction value
+    concurrently.
+
+    Parameters
+    ----------
+    sensors_db : AsyncDBHandler
+        Object for interacting with the sensors database.
+    results_db : AsyncDBHandler
+        Object for interacting with the results database.
+    sensors_db_settings : dict
+        Settings for the sensors database.
+    results_db_settings : dict
+        Settings for the results database.
+    start_timestamp : int
+        The start timestamp of the data to be processed.
+    stop_timestamp : int
+        The end timestamp of the data to be processed.
+    last_results_timestamp : int
+        The timestamp of the last recorded destruction value.
+        Defaults to None.
+
+    Returns
+    -------
+    tuple[pandas.DataFrame, float]
+        A tuple containing the sensor data and the latest destruction.
+    """
+
+    sensor_data, latest_destruction = await asyncio.gather(
+        sensors_db.load_data(
+            table_name=sensors_db_settings['table'],
+            schema_name=sensors_db_settings['schema'],
+            timestamps_list=[start_timestamp, stop_timestamp]
+        ),
+        results_db.run(
+            check_last_destruction,
+            results_db=results_db.db_handler,
+            results_db_settings=results_db_settings,
+            last_results_timestamp=last_results_timestamp
+        )
+    )
+    return sensor_data, latest_destruction
+
+
 def check_last_destruction(
     results_db: DBHandler,
     results_db_settings: dict,
@@ -52,6 +52,22 @@ def check_the_predictions(
         database_name=predictions_db_settings['database']
     )
 
+    # Compare the coverage of both tables before loading the data
+    predicted_seconds = predictions_db.get_coverage(
+        table_name=predictions_db_settings['table'],
+        schema_name=predictions_db_settings['schema'],
+        timestamps_list=[start_timestamp, stop_timestamp]
+    ).count(start_timestamp, stop_timestamp)
+    if predicted_seconds == 0:
+        return None
+    calculated_seconds = results_db.get_coverage(
+        table_name=results_db_settings['table'],
+        schema_name=results_db_settings['schema'],
+        timestamps_list=[start_timestamp, stop_timestamp]
+    ).count(start_timestamp, stop_timestamp)
+    if predicted_seconds != calculated_seconds:
+        raise ValueError("Prediction and results lengths does not match!")
+
     # Get the prediction and results data
     predictions_data = predictions_db.load_data(
         table_name=predictions_db_settings['table'],
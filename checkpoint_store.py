@@ -0,0 +1,183 @@
+# Python/third-party imports
+from pathlib import Path
+import json
+import os
+import pandas as pd
+
+
+class CheckpointStore:
+    def __init__(
+        self,
+        checkpoint_path: Path = Path('checkpoints/pipeline_state.json'),
+        schedule_path: Path = Path(
+            'prediction_models/prediction_schedule.json'
+        )
+    ):
+        """
+        Initialize the CheckpointStore object.
+
+        The store keeps the progress of the pipeline in one small JSON
+        record: the high-water marks of every stage, the running destruction
+        state and the last trained and predicted timestamps. The file is
+        replaced atomically, so a crash never leaves a partially written
+        record. Without a record, the progress of the old
+        `prediction_schedule.json` file is taken over.
+
+        Parameters
+        ----------
+        checkpoint_path : Path, optional
+            The path of the record.
+            Defaults to 'checkpoints/pipeline_state.json'.
+        schedule_path : Path, optional
+            The path of the old prediction schedule to migrate from.
+            Defaults to 'prediction_models/prediction_schedule.json'.
+
+        Attributes
+        ----------
+        state : dict
+            The record with `stages` (high-water marks by stage name) and
+            `accumulator` (the `DestructionAccumulator` checkpoint) keys.
+        """
+
+        self.checkpoint_path = Path(checkpoint_path)
+        self.state = {'stages': {}, 'accumulator': None}
+        if os.path.isfile(self.checkpoint_path):
+            with open(self.checkpoint_path, 'r') as checkpoint_json:
+                self.state.update(json.load(checkpoint_json))
+        elif os.path.isfile(schedule_path):
+            with open(schedule_path, 'r') as schedule_json:
+                prediction_schedule = json.load(schedule_json)
+            for stage, timestamps in (
+                ('training', prediction_schedule.get('model_trainings', [])),
+                ('prediction', prediction_schedule.get('predictions', []))
+            ):
+                if timestamps:
+                    self.update_stage(stage, last_timestamp=max(timestamps))
+
+
+    def get_stage(self, stage: str) -> dict | None:
+        """
+        Returns the high-water marks of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage ('calculation', 'training' or
+            'prediction').
+
+        Returns
+        -------
+        dict | None
+            A dictionary with `first_timestamp` and `last_timestamp` keys or
+            None if the stage has never been completed.
+        """
+
+        return self.state['stages'].get(stage)
+
+
+    def get_last_timestamp(self, stage: str) -> int | None:
+        """
+        Returns the last timestamp processed by a stage.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+
+        Returns
+        -------
+        int | None
+            The last timestamp or None if the stage has never been completed.
+        """
+
+        stage_state = self.get_stage(stage)
+        if stage_state is None:
+            return None
+        return stage_state['last_timestamp']
+
+
+    def update_stage(
+        self,
+        stage: str,
+        last_timestamp: int,
+        first_timestamp: int | None = None
+    ):
+        """
+        Moves the high-water mark of a stage. The first timestamp is kept
+        once recorded.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        last_timestamp : int
+            The last timestamp processed by the stage.
+        first_timestamp : int | None, optional
+            The first timestamp processed by the stage. Defaults to None.
+        """
+
+        stage_state = self.state['stages'].setdefault(
+            stage,
+            {'first_timestamp': None, 'last_timestamp': None}
+        )
+        if (
+            stage_state['first_timestamp'] is None
+            and first_timestamp is not None
+        ):
+            stage_state['first_timestamp'] = int(first_timestamp)
+        stage_state['last_timestamp'] = int(last_timestamp)
+
+
+    def reconcile(
+        self,
+        stage: str,
+        last_timestamp: int | None,
+        first_timestamp: int | None = None
+    ) -> bool:
+        """
+        Aligns the high-water mark of a stage with the data found in the
+        database, which is the source of truth. A crash between an insert
+        and the record save leaves the record behind the database.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        last_timestamp : int | None
+            The latest timestamp of the stage output in the database, None
+            if there is no output.
+        first_timestamp : int | None, optional
+            The first timestamp of the stage output in the database.
+            Defaults to None.
+
+        Returns
+        -------
+        bool
+            True if the record was changed. The record is not saved.
+        """
+
+        if last_timestamp is None or pd.isna(last_timestamp):
+            return self.state['stages'].pop(stage, None) is not None
+        if self.get_last_timestamp(stage) == int(last_timestamp):
+            return False
+        self.update_stage(
+            stage,
+            last_timestamp=last_timestamp,
+            first_timestamp=(
+                None if first_timestamp is None or pd.isna(first_timestamp)
+                else first_timestamp
+            )
+        )
+        return True
+
+
+    def save(self):
+        """
+        Saves the record. The file is replaced atomically.
+        """
+
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(temporary_path, 'w') as checkpoint_json:
+            json.dump(self.state, checkpoint_json, indent=4)
+        os.replace(temporary_path, self.checkpoint_path)
@@ -0,0 +1,190 @@
+# Python/third-party imports
+import numpy as np
+
+
+DAY_SIZE = 24 * 60 * 60
+
+
+class CoverageIndex:
+    def __init__(self, day_bitmaps: dict[int, bytes] | None = None):
+        """
+        Initialize the CoverageIndex object.
+
+        The index marks the seconds present in a 1 Hz table with one bit per
+        second, in one bitmap per UTC day (86 400 bits, 10 800 bytes). Days
+        without a bitmap have no data. Completeness and gaps of a range are
+        answered from the bitmaps alone, without loading the data.
+
+        Parameters
+        ----------
+        day_bitmaps : dict[int, bytes] | None, optional
+            The packed bitmaps by day number (timestamp // 86 400), as
+            stored in the `twin_coverage` table. Defaults to None (empty).
+
+        Attributes
+        ----------
+        day_bitmaps : dict[int, np.ndarray]
+            The packed bitmaps by day number.
+        """
+
+        self.day_bitmaps: dict[int, np.ndarray] = {}
+        for day, bitmap in (day_bitmaps or {}).items():
+            self.day_bitmaps[int(day)] = np.frombuffer(
+                bitmap, dtype=np.uint8
+            ).copy()
+
+
+    def add(self, timestamps: np.ndarray) -> list[int]:
+        """
+        Marks the timestamps as present.
+
+        Parameters
+        ----------
+        timestamps : np.ndarray
+            The timestamps in seconds.
+
+        Returns
+        -------
+        list[int]
+            The day numbers touched by the timestamps.
+        """
+
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        days, seconds = np.divmod(timestamps, DAY_SIZE)
+        touched_days = np.unique(days).tolist()
+        for day in touched_days:
+            bitmap = self.day_bitmaps.setdefault(
+                day, np.zeros(DAY_SIZE // 8, dtype=np.uint8)
+            )
+            day_seconds = seconds[days == day]
+            # Bit order of np.packbits, the first second is the highest bit
+            np.bitwise_or.at(
+                bitmap,
+                day_seconds >> 3,
+                (0x80 >> (day_seconds & 7)).astype(np.uint8)
+            )
+        return touched_days
+
+
+    def bits(self, start_timestamp: int, stop_timestamp: int) -> np.ndarray:
+        """
+        Returns the presence of every second of a range.
+
+        Parameters
+        ----------
+        start_timestamp : int
+            The start timestamp of the range.
+        stop_timestamp : int
+            The end timestamp of the range (inclusive).
+
+        Returns
+        -------
+        np.ndarray
+            A boolean array with one element per second of the range.
+        """
+
+        first_day = start_timestamp // DAY_SIZE
+        last_day = stop_timestamp // DAY_SIZE
+        day_bits = []
+        for day in range(first_day, last_day + 1):
+            if day in self.day_bitmaps:
+                day_bits.append(np.unpackbits(self.day_bitmaps[day]))
+            else:
+                day_bits.append(np.zeros(DAY_SIZE, dtype=np.uint8))
+        offset = start_timestamp - first_day * DAY_SIZE
+        length = stop_timestamp - start_timestamp + 1
+        return np.concatenate(day_bits)[offset:offset + length].astype(bool)
+
+
+    def count(self, start_timestamp: int, stop_timestamp: int) -> int:
+        """
+        Returns the number of present seconds in a range.
+
+        Parameters
+        ----------
+        start_timestamp : int
+            The start timestamp of the range.
+        stop_timestamp : int
+            The end timestamp of the range (inclusive).
+
+        Returns
+        -------
+        int
+            The number of present seconds.
+        """
+
+        if stop_timestamp < start_timestamp:
+            return 0
+        return int(
+            np.count_nonzero(self.bits(start_timestamp, stop_timestamp))
+        )
+
+
+    def is_complete(self, start_timestamp: int, stop_timestamp: int) -> bool:
+        """
+        Checks whether every second of a range is present.
+
+        Parameters
+        ----------
+        start_timestamp : int
+            The start timestamp of the range.
+        stop_timestamp : int
+            The end timestamp of the range (inclusive).
+
+        Returns
+        -------
+        bool
+            True if no second is missing.
+        """
+
+        return (
+            self.count(start_timestamp, stop_timestamp)
+            == stop_timestamp - start_timestamp + 1
+        )
+
+
+    def missing_ranges(
+        self,
+        start_timestamp: int,
+        stop_timestamp: int
+    ) -> list[tuple[int, int]]:
+        """
+        Returns the gaps of a range.
+
+        Parameters
+        ----------
+        start_timestamp : int
+            The start timestamp of the range.
+        stop_timestamp : int
+            The end timestamp of the range (inclusive).
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            The first and last missing timestamp of every gap.
+        """
+
+        if stop_timestamp < start_timestamp:
+            return []
+        missing = ~self.bits(start_timestamp, stop_timestamp)
+        edges = np.diff(np.concatenate(([0], missing.view(np.int8), [0])))
+        gap_starts = np.flatnonzero(edges == 1) + start_timestamp
+        gap_stops = np.flatnonzero(edges == -1) - 1 + start_timestamp
+        return list(zip(gap_starts.tolist(), gap_stops.tolist()))
+
+
+    def last_timestamp(self) -> int | None:
+        """
+        Returns the latest present timestamp.
+
+        Returns
+        -------
+        int | None
+            The latest present timestamp or None if the index is empty.
+        """
+
+        for day in sorted(self.day_bitmaps, reverse=True):
+            present = np.flatnonzero(np.unpackbits(self.day_bitmaps[day]))
+            if len(present):
+                return day * DAY_SIZE + int(present[-1])
+        return None
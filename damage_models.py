@@ -0,0 +1,316 @@
+# Python/third-party imports
+import numpy as np
+import pandas as pd
+
+# Internal imports
+from calculate import destruction_kernel
+
+
+class InstantaneousDamageModel:
+    def __init__(self, dtype: type = np.float64):
+        """
+        Initialize the InstantaneousDamageModel object.
+
+        The model calculates the destruction of every second directly from
+        the torque, speed and oil temperature readings (see
+        `calculate.destruction_kernel`). It has no state between batches.
+
+        Parameters
+        ----------
+        dtype : type, optional
+            The floating point type of the calculations.
+            Default is np.float64.
+        """
+
+        self.dtype = dtype
+
+
+    def calculate(self, sensor_data: pd.DataFrame) -> np.ndarray:
+        """
+        Calculates the destruction of every sensor reading.
+
+        Parameters
+        ----------
+        sensor_data : DataFrame
+            Sensor data sorted by timestamp with columns 'torque', 'speed'
+            and 'oli_temperature'.
+
+        Returns
+        -------
+        np.ndarray
+            The destruction percentage of every reading.
+        """
+
+        destruction, _ = destruction_kernel(
+            torque=sensor_data['torque'].to_numpy(),
+            speed=sensor_data['speed'].to_numpy(),
+            oli_temperature=sensor_data['oli_temperature'].to_numpy(),
+            dtype=self.dtype
+        )
+        return destruction
+
+
+    def checkpoint(self) -> dict:
+        """
+        Returns the model state (empty for this model).
+        """
+
+        return {}
+
+
+    def restore(self, state: dict):
+        """
+        Restores the model state (nothing to restore for this model).
+        """
+
+
+    def reset(self):
+        """
+        Clears the model state (nothing to clear for this model).
+        """
+
+
+class RainflowDamageModel:
+    def __init__(
+        self,
+        reference_range: float = 3000,
+        reference_cycles: float = 10_000_000,
+        slope: float = 5,
+        signal_column: str = 'torque'
+    ):
+        """
+        Initialize the RainflowDamageModel object.
+
+        The model counts the load cycles of the torque signal with the
+        streaming rainflow algorithm (ASTM E1049 three point method) and
+        accumulates the fatigue damage with Miner's rule, using a Basquin
+        S-N curve: a cycle of range S uses up
+        (S / reference_range) ** slope / reference_cycles of the life.
+
+        The samples are processed once, in a single pass: turning points
+        are extracted with vectorized NumPy operations and every turning
+        point is pushed to and popped from the residual stack at most once.
+        The residual (unclosed half-cycles) and the last sample are kept in
+        the model state, so batches can be processed one after another
+        without reprocessing the history.
+
+        Parameters
+        ----------
+        reference_range : float, optional
+            The cycle range of the reference point of the S-N curve [Nm].
+            Defaults to 3000.
+        reference_cycles : float, optional
+            The number of cycles to failure at the reference range.
+            Defaults to 10 000 000.
+        slope : float, optional
+            The inverse slope (Wohler exponent) of the S-N curve.
+            Defaults to 5.
+        signal_column : str, optional
+            The sensor column to count the cycles of. Defaults to 'torque'.
+        """
+
+        self.reference_range = reference_range
+        self.reference_cycles = reference_cycles
+        self.slope = slope
+        self.signal_column = signal_column
+        self.residual: list[float] = []
+        self.last_value: float | None = None
+        self.direction = 0
+
+
+    def cycle_damage(self, cycle_range: float) -> float:
+        """
+        Returns the destruction percentage of one full cycle.
+
+        Parameters
+        ----------
+        cycle_range : float
+            The range of the cycle.
+
+        Returns
+        -------
+        float
+            The destruction percentage.
+        """
+
+        return (
+            100 * (cycle_range / self.reference_range) ** self.slope
+            / self.reference_cycles
+        )
+
+
+    def find_reversals(
+        self,
+        values: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the turning points of the signal, continuing from the last
+        sample of the previous batch, and updates the last sample state.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            The signal samples of the batch.
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            The indices of the samples in `values` confirming the turning
+            points (the samples following them) and the turning point values.
+        """
+
+        if self.last_value is None:
+            signal = values
+            offset = 0
+        else:
+            signal = np.concatenate(([self.last_value], values))
+            offset = 1
+
+        # Direction into every sample, plateaus keep the previous direction
+        directions = np.concatenate(
+            ([self.direction], np.sign(np.diff(signal)))
+        )
+        last_move = np.where(directions != 0, np.arange(len(directions)), 0)
+        np.maximum.accumulate(last_move, out=last_move)
+        directions = directions[last_move]
+
+        reversals = np.flatnonzero(
+            (directions[:-1] != 0) & (directions[1:] != directions[:-1])
+        )
+        self.last_value = float(signal[-1])
+        self.direction = int(directions[-1])
+        return reversals + 1 - offset, signal[reversals]
+
+
+    def calculate(self, sensor_data: pd.DataFrame) -> np.ndarray:
+        """
+        Counts the cycles closed in the batch and returns their destruction,
+        assigned to the readings closing the cycles. A turning point is
+        known one reading after it, so the batch boundaries do not change
+        the result.
+
+        Parameters
+        ----------
+        sensor_data : DataFrame
+            Sensor data sorted by timestamp, following the already processed
+            batches.
+
+        Returns
+        -------
+        np.ndarray
+            The destruction percentage of every reading.
+        """
+
+        values = sensor_data[self.signal_column].to_numpy(dtype=np.float64)
+        destruction = np.zeros(len(values))
+        if not len(values):
+            return destruction
+
+        if self.last_value is None and not self.residual:
+            # The first sample of the history starts the first half-cycle
+            self.residual.append(float(values[0]))
+        positions, reversals = self.find_reversals(values)
+
+        residual = self.residual
+        for position, value in zip(positions, reversals):
+            residual.append(float(value))
+            while len(residual) >= 3:
+                current_range = abs(residual[-1] - residual[-2])
+                previous_range = abs(residual[-2] - residual[-3])
+                if current_range < previous_range:
+                    break
+                if len(residual) == 3:
+                    # The range contains the starting point, half-cycle
+                    destruction[position] += (
+                        0.5 * self.cycle_damage(previous_range)
+                    )
+                    del residual[0]
+                else:
+                    destruction[position] += self.cycle_damage(previous_range)
+                    del residual[-3:-1]
+        return destruction
+
+
+    def checkpoint(self) -> dict:
+        """
+        Returns the model state as a JSON serializable dictionary.
+
+        Returns
+        -------
+        dict
+            A dictionary with `residual`, `last_value` and `direction` keys.
+        """
+
+        return {
+            'residual': list(self.residual),
+            'last_value': self.last_value,
+            'direction': self.direction
+        }
+
+
+    def restore(self, state: dict):
+        """
+        Restores the model state saved with `checkpoint`.
+
+        Parameters
+        ----------
+        state : dict
+            A dictionary with `residual`, `last_value` and `direction` keys.
+        """
+
+        self.residual = [float(value) for value in state['residual']]
+        self.last_value = state['last_value']
+        self.direction = int(state['direction'])
+
+
+    def reset(self):
+        """
+        Clears the residual and the last sample, e.g. when the accumulated
+        destruction is read again from the results database. The half-cycles
+        open at that moment are not counted.
+        """
+
+        self.residual = []
+        self.last_value = None
+        self.direction = 0
+
+
+DAMAGE_MODELS = {
+    'instantaneous': InstantaneousDamageModel,
+    'rainflow': RainflowDamageModel
+}
+
+
+def build_damage_model(
+    damage_model_settings: dict,
+    dtype: type = np.float64
+):
+    """
+    Builds the damage model described by the settings.
+
+    Parameters
+    ----------
+    damage_model_settings : dict
+        The damage model settings with `type` and `parameters` keys.
+    dtype : type, optional
+        The floating point type of the instantaneous model, use the type of
+        the accumulator. Default is np.float64.
+
+    Returns
+    -------
+    InstantaneousDamageModel | RainflowDamageModel
+        The damage model object.
+
+    Raises
+    ------
+    ValueError
+        If an unknown damage model type is specified.
+    """
+
+    model_type = damage_model_settings['type']
+    if model_type not in DAMAGE_MODELS:
+        raise ValueError(f'Unknown damage model type: {model_type}')
+    parameters = dict(damage_model_settings['parameters'])
+    if model_type == 'instantaneous':
+        parameters.setdefault('dtype', dtype)
+    return DAMAGE_MODELS[model_type](**parameters)
@@ -1,6 +1,313 @@
 # Python/third-party imports
+from collections.abc import Iterator
+from contextlib import nullcontext
+from functools import lru_cache
+import time
+import uuid
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    case,
+    column,
+    insert,
+    literal_column,
+    select,
+    table,
+    text,
+    update
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import Select
+
+# Internal imports
+from engine_registry import engine_registry
+from coverage_index import DAY_SIZE, CoverageIndex
+
+
+# Timestamps boundaries of every table written with DBHandler.insert_data,
+# kept in the default schema of each database
+watermarks_metadata = MetaData()
+watermarks_table = Table(
+    'twin_watermarks',
+    watermarks_metadata,
+    Column('table_name', String(256), primary_key=True),
+    Column('min_timestamp', BigInteger),
+    Column('max_timestamp', BigInteger)
+)
+# Bitmaps of the seconds present in every table, one row per table and day
+coverage_table = Table(
+    'twin_coverage',
+    watermarks_metadata,
+    Column('table_name', String(256), primary_key=True),
+    Column('day', BigInteger, primary_key=True),
+    Column('bitmap', LargeBinary)
+)
+engines_with_watermarks = set()
+# Single statement upsert of a watermark on MS SQL Server, extending the
+# stored boundaries. HOLDLOCK keeps concurrent writers from both inserting.
+watermark_merge_query = text(
+    "MERGE twin_watermarks WITH (HOLDLOCK) AS target "
+    "USING (SELECT :table_name AS table_name, "
+    ":min_timestamp AS min_timestamp, "
+    ":max_timestamp AS max_timestamp) AS source "
+    "ON target.table_name = source.table_name "
+    "WHEN MATCHED THEN UPDATE SET "
+    "min_timestamp = CASE WHEN source.min_timestamp < target.min_timestamp "
+    "THEN source.min_timestamp ELSE target.min_timestamp END, "
+    "max_timestamp = CASE WHEN source.max_timestamp > target.max_timestamp "
+    "THEN source.max_timestamp ELSE target.max_timestamp END "
+    "WHEN NOT MATCHED THEN INSERT (table_name, min_timestamp, max_timestamp) "
+    "VALUES (source.table_name, source.min_timestamp, source.max_timestamp);"
+)
+
+
+@lru_cache(maxsize=128)
+def range_query(
+    qualified_table_name: str,
+    columns: str,
+    with_timestamps: bool
+) -> TextClause:
+    """
+    Builds (once per table and column set) the statement used by
+    `DBHandler.load_data`. Timestamps are passed as bound parameters
+    `start_timestamp` and `stop_timestamp`, so the server reuses one
+    execution plan for every batch.
+
+    Parameters
+    ----------
+    qualified_table_name : str
+        The name of the table to load data from, prefixed with the schema
+        name where the backend uses schemas.
+    columns : str
+        Comma separated columns to load.
+    with_timestamps : bool
+        If True, the statement is limited to the timestamps range.
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.TextClause
+        The compiled statement.
+    """
+
+    query = f"SELECT {columns} FROM {qualified_table_name}"
+    if with_timestamps:
+        query += (
+            " WHERE timestamp >= :start_timestamp"
+            " AND timestamp <= :stop_timestamp"
+        )
+    return text(query)
+
+
+@lru_cache(maxsize=128)
+def chunk_query(
+    schema_name: str | None,
+    table_name: str,
+    columns: tuple[str, ...] | str,
+    chunk_size: int
+) -> Select:
+    """
+    Builds (once per table, column set and chunk size) the keyset
+    pagination statement used by `DBHandler.iter_data`. The boundaries are
+    passed as bound parameters `last_timestamp` and `stop_timestamp`.
+
+    Parameters
+    ----------
+    schema_name : str | None
+        The name of the schema to load data from, None for backends without
+        schemas.
+    table_name : str
+        The name of the table to load data from.
+    columns : tuple[str, ...] | str
+        The columns to load or '*'.
+    chunk_size : int
+        The maximum number of rows returned by the statement.
+
+    Returns
+    -------
+    sqlalchemy.sql.selectable.Select
+        The compiled statement.
+    """
+
+    if isinstance(columns, tuple):
+        selected_columns = [column(name) for name in columns]
+    else:
+        selected_columns = [literal_column(columns)]
+    timestamp_column = column('timestamp')
+    return (
+        select(*selected_columns)
+        .select_from(table(table_name, schema=schema_name))
+        .where(timestamp_column > bindparam('last_timestamp'))
+        .where(timestamp_column <= bindparam('stop_timestamp'))
+        .order_by(timestamp_column)
+        .limit(chunk_size)
+    )
+
+
+@lru_cache(maxsize=128)
+def latest_rows_query(
+    qualified_table_name: str,
+    columns: str,
+    group_column: str
+) -> TextClause:
+    """
+    Builds (once per table, column set and group column) the statement used
+    by `DBHandler.load_latest_rows`. The upper timestamp is passed as the
+    bound parameter `stop_timestamp`.
+
+    Parameters
+    ----------
+    qualified_table_name : str
+        The name of the table to load data from, prefixed with the schema
+        name where the backend uses schemas.
+    columns : str
+        Comma separated columns to load.
+    group_column : str
+        The column identifying the groups (e.g. the assets).
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.TextClause
+        The compiled statement.
+    """
+
+    selected_columns = ', '.join(
+        f'target.{name.strip()}' for name in columns.split(',')
+    )
+    return text(
+        f"SELECT {selected_columns} "
+        f"FROM {qualified_table_name} AS target "
+        f"JOIN (SELECT {group_column}, MAX(timestamp) AS timestamp "
+        f"FROM {qualified_table_name} "
+        f"WHERE timestamp <= :stop_timestamp "
+        f"GROUP BY {group_column}) AS latest "
+        f"ON target.{group_column} = latest.{group_column} "
+        f"AND target.timestamp = latest.timestamp"
+    )
+
+
+@lru_cache(maxsize=128)
+def max_min_query(qualified_table_name: str) -> TextClause:
+    """
+    Builds (once per table) the statement used by
+    `DBHandler.get_max_and_min_time`.
+
+    Parameters
+    ----------
+    qualified_table_name : str
+        The name of the table to get the timestamps from, prefixed with the
+        database and schema names where the backend uses them.
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.TextClause
+        The compiled statement.
+    """
+
+    return text(
+        f"SELECT MAX(timestamp) as max_timestamp, "
+        f"MIN(timestamp) as min_timestamp "
+        f"FROM {qualified_table_name}"
+    )
+
+
+@lru_cache(maxsize=128)
+def max_query(qualified_table_name: str) -> TextClause:
+    """
+    Builds (once per table) the statement used by `DBHandler.get_max_time`.
+    The timestamps between the bound parameters `start_timestamp` and
+    `stop_timestamp` are searched, which is a single index seek on the
+    timestamp column.
+
+    Parameters
+    ----------
+    qualified_table_name : str
+        The name of the table to get the timestamp from, prefixed with the
+        database and schema names where the backend uses them.
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.TextClause
+        The compiled statement.
+    """
+
+    return text(
+        f"SELECT MAX(timestamp) as max_timestamp "
+        f"FROM {qualified_table_name} "
+        f"WHERE timestamp >= :start_timestamp "
+        f"AND timestamp <= :stop_timestamp"
+    )
+
+
+@lru_cache(maxsize=128)
+def coverage_count_query(qualified_table_name: str) -> TextClause:
+    """
+    Builds (once per table) the statement checking a coverage bitmap
+    against the table. Between the bound parameters `start_timestamp` and
+    `stop_timestamp`, it counts the distinct timestamps, the distinct
+    timestamps after the bound parameter `last_timestamp` and returns the
+    latest timestamp, which is one index range scan without reading the
+    rows.
+
+    Parameters
+    ----------
+    qualified_table_name : str
+        The name of the table to count the timestamps of, prefixed with the
+        database and schema names where the backend uses them.
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.TextClause
+        The compiled statement.
+    """
+
+    return text(
+        f"SELECT COUNT(DISTINCT timestamp) as present_seconds, "
+        f"COUNT(DISTINCT CASE WHEN timestamp > :last_timestamp "
+        f"THEN timestamp END) as new_seconds, "
+        f"MAX(timestamp) as max_timestamp "
+        f"FROM {qualified_table_name} "
+        f"WHERE timestamp >= :start_timestamp "
+        f"AND timestamp <= :stop_timestamp"
+    )
+
+
+@lru_cache(maxsize=128)
+def outside_watermark_query(qualified_table_name: str) -> TextClause:
+    """
+    Builds (once per table) the statement validating a watermark. It
+    returns the timestamps beyond the boundaries `max_timestamp` and
+    `min_timestamp` passed as bound parameters, which costs two index seeks
+    on the timestamp column.
+
+    Parameters
+    ----------
+    qualified_table_name : str
+        The name of the table to validate the watermark of, prefixed with
+        the database and schema names where the backend uses them.
+
+    Returns
+    -------
+    sqlalchemy.sql.elements.TextClause
+        The compiled statement.
+    """
+
+    return text(
+        f"SELECT "
+        f"(SELECT MAX(timestamp) FROM {qualified_table_name} "
+        f"WHERE timestamp > :max_timestamp) as max_timestamp, "
+        f"(SELECT MIN(timestamp) FROM {qualified_table_name} "
+        f"WHERE timestamp < :min_timestamp) as min_timestamp"
+    )
 
 
 class DBHandler:
@@ -8,6 +315,8 @@ class DBHandler:
         self,
         server_name: str,
         database_name: str,
+        use_watermarks: bool = True,
+        cache=None
     ):
         """
         Initialize the DBHandler object.
@@ -18,6 +327,18 @@ class DBHandler:
             The name of the server to connect to.
         database_name : str
             The name of the database to connect to.
+        use_watermarks : bool, optional
+            If True, the timestamps boundaries of the tables are kept in the
+            `twin_watermarks` table, updated by `insert_data` and read by
+            `get_max_and_min_time` instead of scanning the whole table. Rows
+            appended by other writers are picked up when the watermark is
+            read. The coverage bitmaps of the `twin_coverage` table read by
+            `get_coverage` are maintained the same way. Use False for tables
+            owned by other writers (e.g. the sensors database), so no
+            tables are created in their database. Defaults to True.
+        cache : SensorCache, optional
+            The read-through cache used by `load_data` for timestamps
+            ranges. Defaults to None (no cache).
 
         Attributes
         ----------
@@ -25,23 +346,124 @@ class DBHandler:
             The name of the server to connect to.
         database_name : str
             The name of the database to connect to.
+        use_watermarks : bool
+            Whether the `twin_watermarks` table is used.
+        cache : SensorCache | None
+            The read-through cache of `load_data`.
+        backend : str
+            The storage backend of the engine ('mssql', 'sqlite' or
+            'duckdb'), selected in the process-wide engine registry.
         engine : sqlalchemy.engine.Engine
-            The engine object to interact with the database.
+            The engine object to interact with the database. It is taken from
+            the process-wide engine registry, so handlers of the same
+            database share one connection pool.
         """
 
         self.server_name = server_name
         self.database_name = database_name
-        self.engine = create_engine(
-            f"mssql+pyodbc://{self.server_name}/{self.database_name}?"
-            f"driver=ODBC+Driver+17+for+SQL+Server&trusted_connection=yes"
+        self.use_watermarks = use_watermarks
+        self.cache = cache
+        self.backend = engine_registry.backend
+        self.engine = engine_registry.get_engine(
+            server_name=self.server_name,
+            database_name=self.database_name
         )
 
 
+    def schema_for(self, schema_name: str) -> str | None:
+        """
+        Returns the schema name to use with the current backend. Embedded
+        backends keep all tables in their default schema.
+
+        Parameters
+        ----------
+        schema_name : str
+            The name of the schema from the settings.
+
+        Returns
+        -------
+        str | None
+            The schema name or None for embedded backends.
+        """
+
+        if self.backend == 'mssql':
+            return schema_name
+        return None
+
+
+    def qualified_name(self, table_name: str, schema_name: str) -> str:
+        """
+        Returns the table name prefixed with the schema name where the
+        backend uses schemas.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table.
+        schema_name : str
+            The name of the schema from the settings.
+
+        Returns
+        -------
+        str
+            The name to use in SQL statements.
+        """
+
+        schema_name = self.schema_for(schema_name)
+        if schema_name is None:
+            return table_name
+        return f'{schema_name}.{table_name}'
+
+
+    def scan_name(self, table_name: str, schema_name: str) -> str:
+        """
+        Returns the table name used by the scanning statements, prefixed
+        with the database and schema names where the backend uses them.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table.
+        schema_name : str
+            The name of the schema from the settings.
+
+        Returns
+        -------
+        str
+            The name to use in SQL statements.
+        """
+
+        if self.backend == 'mssql':
+            return f'{self.database_name}.{schema_name}.{table_name}'
+        return table_name
+
+
+    def begin(self):
+        """
+        Begins a transaction, so several `insert_data` calls (e.g. the
+        chunks of a stream) are committed together or not at all.
+
+        Returns
+        -------
+        contextlib.AbstractContextManager[sqlalchemy.engine.Connection]
+            The connection of the transaction, committed on exit without an
+            exception and rolled back otherwise.
+        """
+
+        if self.use_watermarks:
+            self.create_watermarks_table()
+        return self.engine.begin()
+
+
     def insert_data(
         self,
         table_name: str,
         schema_name: str,
-        data: pd.DataFrame
+        data: pd.DataFrame,
+        chunksize: int | None = None,
+        use_staging: bool = False,
+        key_columns: list[str] | None = None,
+        connection: Connection | None = None
     ) -> str:
         """
         Inserts data into a specified table in a specified database.
@@ -54,26 +476,106 @@ class DBHandler:
             The name of the schema to insert data into.
         data : pandas.DataFrame
             The data to insert into the table.
+        chunksize : int | None, optional
+            The number of rows sent to the database in one batch. If None,
+            all rows are sent at once. Defaults to None.
+        use_staging : bool, optional
+            If True, the data is bulk loaded into a
+            `<table_name>_staging_<suffix>` table first and then merged into
+            the target table with one set-based INSERT, skipping rows whose
+            key is already present in the target table. The suffix is unique
+            per call, so concurrent writers do not share a staging table.
+            Defaults to False.
+        key_columns : list[str] | None, optional
+            The columns identifying a row in the staging merge. Defaults to
+            None (the `timestamp` column).
+        connection : sqlalchemy.engine.Connection | None, optional
+            The connection of a transaction opened with `begin`, committed
+            by the caller. Defaults to None (the data is committed in its own
+            transaction).
 
         Returns
         -------
         str
-            A message indicating that the data was inserted successfully.
+            A message indicating that the data was inserted successfully
+            together with the insert throughput.
+
+        Notes
+        -----
+        When watermarks are used, the table watermark and coverage bitmaps
+        are updated in the same transaction as the inserted data.
         """
 
-        data.to_sql(
-            name=table_name,
-            schema=schema_name,
-            con=self.engine,
-            if_exists='append',
-            index=False
-        )
+        start_time = time.perf_counter()
+        target_name = self.qualified_name(table_name, schema_name)
+        if self.use_watermarks:
+            self.create_watermarks_table()
+        if connection is None:
+            transaction = self.engine.begin()
+        else:
+            transaction = nullcontext(connection)
+        with transaction as connection:
+            if use_staging:
+                staging_table_name = (
+                    f'{table_name}_staging_{uuid.uuid4().hex[:12]}'
+                )
+                staging_name = self.qualified_name(
+                    staging_table_name, schema_name
+                )
+                data.to_sql(
+                    name=staging_table_name,
+                    schema=self.schema_for(schema_name),
+                    con=connection,
+                    if_exists='replace',
+                    index=False,
+                    chunksize=chunksize
+                )
+                columns = ', '.join(data.columns)
+                key_conditions = ' AND '.join(
+                    f'target.{key_column} = staging.{key_column}'
+                    for key_column in key_columns or ['timestamp']
+                )
+                connection.execute(text(
+                    f"INSERT INTO {target_name} ({columns}) "
+                    f"SELECT {columns} "
+                    f"FROM {staging_name} AS staging "
+                    f"WHERE NOT EXISTS ("
+                    f"SELECT 1 FROM {target_name} AS target "
+                    f"WHERE {key_conditions})"
+                ))
+                connection.execute(text(f"DROP TABLE {staging_name}"))
+            else:
+                data.to_sql(
+                    name=table_name,
+                    schema=self.schema_for(schema_name),
+                    con=connection,
+                    if_exists='append',
+                    index=False,
+                    chunksize=chunksize
+                )
+            if self.use_watermarks and 'timestamp' in data.columns:
+                timestamps = data['timestamp'].to_numpy()
+                self.update_watermark(
+                    connection=connection,
+                    table_name=table_name,
+                    schema_name=schema_name,
+                    timestamps=timestamps
+                )
+                self.update_coverage(
+                    connection=connection,
+                    table_name=table_name,
+                    schema_name=schema_name,
+                    timestamps=timestamps
+                )
+        elapsed_time = time.perf_counter() - start_time
         data_shape = data.shape
         data_rows = data_shape[0]
         data_columns = data_shape[1]
+        rows_per_second = data_rows / elapsed_time if elapsed_time else 0
         saving_message = (
             f'Data of shape {data_columns} columns and {data_rows} rows '
-            f'inserted into {self.database_name}.{schema_name}.{table_name}'
+            f'inserted into {self.database_name}.{schema_name}.{table_name} '
+            f'in {elapsed_time:.2f} s ({rows_per_second:.0f} rows/s)'
         )
         return saving_message
 
@@ -83,7 +585,8 @@ class DBHandler:
         table_name: str,
         schema_name: str,
         columns: list[str] | str = '*',
-        timestamps_list: list[int] = None
+        timestamps_list: list[int] = None,
+        use_cache: bool = True
     ):
         """
         Loads data from a specified table in a specified database.
@@ -98,6 +601,9 @@ class DBHandler:
             The columns to load from the table. Defaults to '*'.
         timestamps_list : list[int], optional
             The start and end timestamps to load data for. Defaults to None.
+        use_cache : bool, optional
+            If True and the handler has a cache, the data is read through
+            the cache. Defaults to True.
 
         Returns
         -------
@@ -105,23 +611,146 @@ class DBHandler:
             The loaded data.
         """
 
+        if use_cache and self.cache is not None and timestamps_list:
+            return self.cache.load_data(
+                db_handler=self,
+                table_name=table_name,
+                schema_name=schema_name,
+                columns=columns,
+                timestamps_list=timestamps_list
+            )
+
         if isinstance(columns, list):
             columns = ', '.join(columns)
 
+        qualified_table_name = self.qualified_name(table_name, schema_name)
         if timestamps_list:
-            where_clauses = (
-                f"WHERE timestamp >= {timestamps_list[0]}"
-                f" and timestamp <= {timestamps_list[1]}"
-            )
+            query = range_query(qualified_table_name, columns, True)
+            params = {
+                'start_timestamp': int(timestamps_list[0]),
+                'stop_timestamp': int(timestamps_list[1])
+            }
         else:
-            where_clauses = ""
-        query = (
-            f"SELECT {columns} "
-            f"FROM {schema_name}.{table_name} "
-            f"{where_clauses}"
+            query = range_query(qualified_table_name, columns, False)
+            params = {}
+
+        return pd.read_sql(query, con=self.engine, params=params)
+
+
+    def load_latest_rows(
+        self,
+        table_name: str,
+        schema_name: str,
+        group_column: str,
+        columns: list[str],
+        stop_timestamp: int
+    ) -> pd.DataFrame:
+        """
+        Loads the latest row of every group (e.g. asset) up to a timestamp,
+        so groups whose data ends at different timestamps are all found.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table to load data from.
+        schema_name : str
+            The name of the schema to load data from.
+        group_column : str
+            The column identifying the groups.
+        columns : list[str]
+            The columns to load from the table.
+        stop_timestamp : int
+            The latest timestamp considered.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The latest row of every group.
+        """
+
+        query = latest_rows_query(
+            self.qualified_name(table_name, schema_name),
+            ', '.join(columns),
+            group_column
+        )
+        return pd.read_sql(
+            query,
+            con=self.engine,
+            params={'stop_timestamp': int(stop_timestamp)}
         )
 
-        return pd.read_sql(query, con=self.engine)
+
+    def iter_data(
+        self,
+        table_name: str,
+        schema_name: str,
+        timestamps_list: list[int],
+        columns: list[str] | str = '*',
+        chunk_size: int = 86_400
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Lazily loads data from a specified table in bounded-size chunks.
+
+        Chunks are read with keyset pagination on the `timestamp` column, so
+        every query only asks for the next `chunk_size` rows after the last
+        timestamp already returned and the memory usage does not depend on
+        the length of the timestamp range.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table to load data from.
+        schema_name : str
+            The name of the schema to load data from.
+        timestamps_list : list[int]
+            The start and end timestamps to load data for (both inclusive).
+        columns : list[str] | str, optional
+            The columns to load from the table. The `timestamp` column is
+            always loaded. Defaults to '*'.
+        chunk_size : int, optional
+            The maximum number of rows in one chunk. Defaults to 86 400
+            (one day of 1 Hz data).
+
+        Yields
+        ------
+        pandas.DataFrame
+            Consecutive chunks of data sorted by timestamp.
+
+        Notes
+        -----
+        Timestamps have to be unique integers, the next chunk starts right
+        after the last timestamp of the previous one.
+        """
+
+        if isinstance(columns, list):
+            if 'timestamp' not in columns:
+                columns = ['timestamp'] + columns
+            columns = tuple(columns)
+        query = chunk_query(
+            self.schema_for(schema_name), table_name, columns, chunk_size
+        )
+        start_timestamp, stop_timestamp = (
+            int(timestamps_list[0]), int(timestamps_list[1])
+        )
+
+        last_timestamp = start_timestamp - 1
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(stream_results=True)
+            while last_timestamp < stop_timestamp:
+                chunk = pd.read_sql(
+                    query,
+                    con=connection,
+                    params={
+                        'last_timestamp': last_timestamp,
+                        'stop_timestamp': stop_timestamp
+                    }
+                )
+                if chunk.empty:
+                    break
+                last_timestamp = int(chunk['timestamp'].iloc[-1])
+                yield chunk
+                if len(chunk) < chunk_size:
+                    break
 
 
     def get_max_and_min_time(
@@ -133,6 +762,14 @@ class DBHandler:
         Gets the maximum and minimum timestamp from a specified table in a
         specified database.
 
+        When watermarks are used, the timestamps are read from the
+        `twin_watermarks` table. Tables without a watermark are scanned once
+        and their watermark is stored for the next calls. Every read also
+        looks for rows beyond the stored boundaries (two index seeks), so
+        rows appended by writers other than `insert_data` advance the
+        watermark. Rows deleted outside of `insert_data` still require
+        `repair_watermark`.
+
         Parameters
         ----------
         table_name : str
@@ -147,14 +784,560 @@ class DBHandler:
             Timestamps are integers in seconds.
         """
 
+        if not self.use_watermarks:
+            return self.scan_max_and_min_time(table_name, schema_name)
+
+        self.create_watermarks_table()
         query = (
-            f"SELECT MAX(timestamp) as max_timestamp, "
-            f"MIN(timestamp) as min_timestamp "
-            f"FROM {self.database_name}.{schema_name}.{table_name}"
+            select(
+                watermarks_table.c.max_timestamp,
+                watermarks_table.c.min_timestamp
+            )
+            .where(
+                watermarks_table.c.table_name
+                == self.qualified_name(table_name, schema_name)
+            )
         )
+        max_min_timestamps = pd.read_sql(query, con=self.engine)
+        if max_min_timestamps.empty:
+            return self.repair_watermark(table_name, schema_name)
+
+        # Validate the watermark against rows written by other writers
+        max_timestamp = int(max_min_timestamps.loc[0, 'max_timestamp'])
+        min_timestamp = int(max_min_timestamps.loc[0, 'min_timestamp'])
+        with self.engine.connect() as connection:
+            outside_timestamps = connection.execute(
+                outside_watermark_query(
+                    self.scan_name(table_name, schema_name)
+                ),
+                {
+                    'max_timestamp': max_timestamp,
+                    'min_timestamp': min_timestamp
+                }
+            ).one()
+        if (
+            outside_timestamps.max_timestamp is None
+            and outside_timestamps.min_timestamp is None
+        ):
+            return max_min_timestamps
+        if outside_timestamps.max_timestamp is not None:
+            max_timestamp = int(outside_timestamps.max_timestamp)
+        if outside_timestamps.min_timestamp is not None:
+            min_timestamp = int(outside_timestamps.min_timestamp)
+        with self.engine.begin() as connection:
+            self.upsert_watermark(
+                connection=connection,
+                watermark_name=self.qualified_name(table_name, schema_name),
+                min_timestamp=min_timestamp,
+                max_timestamp=max_timestamp
+            )
+        return pd.DataFrame({
+            'max_timestamp': [max_timestamp],
+            'min_timestamp': [min_timestamp]
+        })
+
+
+    def scan_max_and_min_time(
+        self,
+        table_name: str,
+        schema_name: str,
+    ) -> pd.DataFrame:
+        """
+        Gets the maximum and minimum timestamp by scanning the whole table.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table to get the timestamps from.
+        schema_name : str
+            The name of the schema to get the timestamps from.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A DataFrame containing the maximum and minimum timestamps.
+            Timestamps are integers in seconds.
+        """
+
+        query = max_min_query(self.scan_name(table_name, schema_name))
         return pd.read_sql(query, con=self.engine)
 
 
+    def get_max_time(
+        self,
+        table_name: str,
+        schema_name: str,
+        timestamps_list: list[int] | None = None
+    ) -> int | None:
+        """
+        Reads the real latest timestamp of a table, independent of the
+        watermarks.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table to get the timestamp from.
+        schema_name : str
+            The name of the schema to get the timestamp from.
+        timestamps_list : list[int] | None, optional
+            The start and end timestamps of the searched range. Defaults to
+            None (the whole table).
+
+        Returns
+        -------
+        int | None
+            The latest timestamp or None if there is no such row.
+        """
+
+        if timestamps_list is None:
+            timestamps_list = [
+                np.iinfo(np.int64).min, np.iinfo(np.int64).max
+            ]
+        with self.engine.connect() as connection:
+            max_timestamp = connection.execute(
+                max_query(self.scan_name(table_name, schema_name)),
+                {
+                    'start_timestamp': int(timestamps_list[0]),
+                    'stop_timestamp': int(timestamps_list[1])
+                }
+            ).scalar()
+        if max_timestamp is None:
+            return None
+        return int(max_timestamp)
+
+
+    def repair_watermark(
+        self,
+        table_name: str,
+        schema_name: str,
+    ) -> pd.DataFrame:
+        """
+        Rebuilds the watermark of a table with a full scan. Use it after
+        the table was modified outside of `insert_data`.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table to repair the watermark for.
+        schema_name : str
+            The name of the schema containing the table.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A DataFrame containing the scanned maximum and minimum
+            timestamps. Empty tables get no watermark.
+        """
+
+        self.create_watermarks_table()
+        max_min_timestamps = self.scan_max_and_min_time(
+            table_name=table_name,
+            schema_name=schema_name
+        )
+        max_timestamp = max_min_timestamps.loc[0, 'max_timestamp']
+        min_timestamp = max_min_timestamps.loc[0, 'min_timestamp']
+        watermark_name = self.qualified_name(table_name, schema_name)
+        with self.engine.begin() as connection:
+            connection.execute(
+                watermarks_table.delete()
+                .where(watermarks_table.c.table_name == watermark_name)
+            )
+            if not pd.isna(max_timestamp):
+                self.upsert_watermark(
+                    connection=connection,
+                    watermark_name=watermark_name,
+                    min_timestamp=int(min_timestamp),
+                    max_timestamp=int(max_timestamp)
+                )
+        return max_min_timestamps
+
+
+    def update_watermark(
+        self,
+        connection: Connection,
+        table_name: str,
+        schema_name: str,
+        timestamps: np.ndarray
+    ) -> None:
+        """
+        Extends the watermark of a table with the timestamps of newly
+        inserted data. Tables without a watermark are scanned once.
+
+        Parameters
+        ----------
+        connection : sqlalchemy.engine.Connection
+            The connection of the transaction inserting the data.
+        table_name : str
+            The name of the table the data was inserted into.
+        schema_name : str
+            The name of the schema containing the table.
+        timestamps : np.ndarray
+            The timestamps of the inserted data. Nothing is updated for an
+            empty array.
+        """
+
+        if len(timestamps) == 0:
+            return
+        watermark_name = self.qualified_name(table_name, schema_name)
+        min_timestamp = int(np.min(timestamps))
+        max_timestamp = int(np.max(timestamps))
+        stored_watermark = connection.execute(
+            select(watermarks_table.c.table_name)
+            .where(watermarks_table.c.table_name == watermark_name)
+        ).first()
+        if stored_watermark is None:
+            # The table existed before watermarks, scan it including the
+            # data inserted in this transaction
+            scanned_timestamps = connection.execute(
+                max_min_query(self.scan_name(table_name, schema_name))
+            ).one()
+            min_timestamp = int(scanned_timestamps.min_timestamp)
+            max_timestamp = int(scanned_timestamps.max_timestamp)
+        self.upsert_watermark(
+            connection=connection,
+            watermark_name=watermark_name,
+            min_timestamp=min_timestamp,
+            max_timestamp=max_timestamp
+        )
+
+
+    def upsert_watermark(
+        self,
+        connection: Connection,
+        watermark_name: str,
+        min_timestamp: int,
+        max_timestamp: int
+    ) -> None:
+        """
+        Extends a watermark with new boundaries, creating it if it does not
+        exist. It is one statement, so concurrent writers cannot both insert
+        the same watermark.
+
+        Parameters
+        ----------
+        connection : sqlalchemy.engine.Connection
+            The connection of the transaction.
+        watermark_name : str
+            The qualified name of the table of the watermark.
+        min_timestamp : int
+            The new minimum timestamp, kept if lower than the stored one.
+        max_timestamp : int
+            The new maximum timestamp, kept if higher than the stored one.
+        """
+
+        values = {
+            'table_name': watermark_name,
+            'min_timestamp': int(min_timestamp),
+            'max_timestamp': int(max_timestamp)
+        }
+        if self.backend == 'mssql':
+            connection.execute(watermark_merge_query, values)
+            return
+
+        if self.backend == 'sqlite':
+            statement = sqlite_insert(watermarks_table).values(**values)
+        else:
+            # duckdb_engine compiles the PostgreSQL ON CONFLICT clause
+            statement = postgresql_insert(watermarks_table).values(**values)
+        min_column = watermarks_table.c.min_timestamp
+        max_column = watermarks_table.c.max_timestamp
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=[watermarks_table.c.table_name],
+            set_={
+                'min_timestamp': case(
+                    (
+                        min_column > statement.excluded.min_timestamp,
+                        statement.excluded.min_timestamp
+                    ),
+                    else_=min_column
+                ),
+                'max_timestamp': case(
+                    (
+                        max_column < statement.excluded.max_timestamp,
+                        statement.excluded.max_timestamp
+                    ),
+                    else_=max_column
+                )
+            }
+        ))
+
+
+    def get_coverage(
+        self,
+        table_name: str,
+        schema_name: str,
+        timestamps_list: list[int],
+        index_db: 'DBHandler | None' = None
+    ) -> CoverageIndex:
+        """
+        Gets the coverage bitmaps of a table for a timestamps range, so the
+        gaps in the data can be found without loading it.
+
+        When watermarks are used, the bitmaps are read from the
+        `twin_coverage` table of `index_db`. Every day of the range is
+        checked against the table with one count of its distinct timestamps
+        (see `coverage_count_query`), so rows written by other writers
+        (e.g. the sensors acquisition) are found:
+         - an unchanged count keeps the stored bitmap,
+         - rows appended after the last present second are added without
+           reading them if they have no gaps, otherwise only the appended
+           timestamps are read,
+         - days seen for the first time and days whose rows were filled in
+           or deleted before their last present second are scanned.
+        The changed bitmaps are stored for the next calls.
+
+        Parameters
+        ----------
+        table_name : str
+            The name of the table to get the coverage of.
+        schema_name : str
+            The name of the schema containing the table.
+        timestamps_list : list[int]
+            The start and end timestamps of the range.
+        index_db : DBHandler | None, optional
+            The database keeping the bitmaps, e.g. the results database for
+            the sensors table, which is owned by the acquisition. The bitmaps
+            are keyed by the database, schema and table names there.
+            Defaults to None (the database of the table, keyed like the
+            bitmaps maintained by `insert_data`).
+
+        Returns
+        -------
+        CoverageIndex
+            The coverage of all days of the range.
+        """
+
+        start_timestamp = int(timestamps_list[0])
+        stop_timestamp = int(timestamps_list[1])
+        if index_db is None:
+            index_db = self
+            coverage_name = self.qualified_name(table_name, schema_name)
+        else:
+            coverage_name = f'{self.database_name}.{schema_name}.{table_name}'
+        if not index_db.use_watermarks:
+            coverage = CoverageIndex()
+            with self.engine.connect() as connection:
+                coverage.add(self.scan_timestamps(
+                    connection=connection,
+                    table_name=table_name,
+                    schema_name=schema_name,
+                    timestamps_list=[start_timestamp, stop_timestamp]
+                ))
+            return coverage
+
+        index_db.create_watermarks_table()
+        first_day = start_timestamp // DAY_SIZE
+        last_day = stop_timestamp // DAY_SIZE
+        with index_db.engine.connect() as connection:
+            stored_bitmaps = connection.execute(
+                select(coverage_table.c.day, coverage_table.c.bitmap)
+                .where(coverage_table.c.table_name == coverage_name)
+                .where(coverage_table.c.day.between(first_day, last_day))
+            ).all()
+        coverage = CoverageIndex(dict(stored_bitmaps))
+        stored_days = set(coverage.day_bitmaps)
+
+        changed_days = []
+        count_query = coverage_count_query(
+            self.scan_name(table_name, schema_name)
+        )
+        with self.engine.connect() as connection:
+            for day in range(first_day, last_day + 1):
+                day_start = day * DAY_SIZE
+                day_stop = day_start + DAY_SIZE - 1
+                if day in stored_days:
+                    present = np.flatnonzero(
+                        np.unpackbits(coverage.day_bitmaps[day])
+                    )
+                else:
+                    present = np.array([], dtype=np.int64)
+                last_present = (
+                    day_start + int(present[-1]) if len(present)
+                    else day_start - 1
+                )
+                counts = connection.execute(
+                    count_query,
+                    {
+                        'start_timestamp': day_start,
+                        'stop_timestamp': day_stop,
+                        'last_timestamp': last_present
+                    }
+                ).one()
+                if counts.present_seconds == len(present):
+                    continue
+                changed_days.append(day)
+                if (
+                    day in stored_days
+                    and counts.present_seconds - counts.new_seconds
+                    == len(present)
+                ):
+                    # Rows were only appended after the last present second
+                    max_timestamp = int(counts.max_timestamp)
+                    if counts.new_seconds == max_timestamp - last_present:
+                        coverage.add(
+                            np.arange(last_present + 1, max_timestamp + 1)
+                        )
+                        continue
+                    coverage.add(self.scan_timestamps(
+                        connection=connection,
+                        table_name=table_name,
+                        schema_name=schema_name,
+                        timestamps_list=[last_present + 1, day_stop]
+                    ))
+                    continue
+                # A new day, or rows filled in or deleted inside the day
+                coverage.day_bitmaps.pop(day, None)
+                coverage.add(self.scan_timestamps(
+                    connection=connection,
+                    table_name=table_name,
+                    schema_name=schema_name,
+                    timestamps_list=[day_start, day_stop]
+                ))
+
+        if not changed_days:
+            return coverage
+        with index_db.engine.begin() as connection:
+            for day in changed_days:
+                bitmap = coverage.day_bitmaps.setdefault(
+                    day, np.zeros(DAY_SIZE // 8, dtype=np.uint8)
+                ).tobytes()
+                if day in stored_days:
+                    connection.execute(
+                        update(coverage_table)
+                        .where(coverage_table.c.table_name == coverage_name)
+                        .where(coverage_table.c.day == day)
+                        .values(bitmap=bitmap)
+                    )
+                else:
+                    connection.execute(
+                        insert(coverage_table).values(
+                            table_name=coverage_name,
+                            day=day,
+                            bitmap=bitmap
+                        )
+                    )
+        return coverage
+
+
+    def scan_timestamps(
+        self,
+        connection: Connection,
+        table_name: str,
+        schema_name: str,
+        timestamps_list: list[int]
+    ) -> np.ndarray:
+        """
+        Reads the timestamps column of a table in a timestamps range.
+
+        Parameters
+        ----------
+        connection : sqlalchemy.engine.Connection
+            The connection to read with.
+        table_name : str
+            The name of the table to read.
+        schema_name : str
+            The name of the schema containing the table.
+        timestamps_list : list[int]
+            The start and end timestamps of the range.
+
+        Returns
+        -------
+        np.ndarray
+            The timestamps in the range.
+        """
+
+        query = range_query(
+            self.qualified_name(table_name, schema_name), 'timestamp', True
+        )
+        timestamps = connection.execute(
+            query,
+            {
+                'start_timestamp': int(timestamps_list[0]),
+                'stop_timestamp': int(timestamps_list[1])
+            }
+        ).scalars().all()
+        return np.array(timestamps, dtype=np.int64)
+
+
+    def update_coverage(
+        self,
+        connection: Connection,
+        table_name: str,
+        schema_name: str,
+        timestamps: np.ndarray
+    ) -> None:
+        """
+        Marks the timestamps of newly inserted data in the coverage bitmaps
+        of a table. Days without a bitmap are scanned once, so data written
+        before the coverage index is included.
+
+        Parameters
+        ----------
+        connection : sqlalchemy.engine.Connection
+            The connection of the transaction inserting the data.
+        table_name : str
+            The name of the table the data was inserted into.
+        schema_name : str
+            The name of the schema containing the table.
+        timestamps : np.ndarray
+            The timestamps of the inserted data. Nothing is updated for an
+            empty array.
+        """
+
+        if len(timestamps) == 0:
+            return
+        coverage_name = self.qualified_name(table_name, schema_name)
+        days = np.unique(
+            np.asarray(timestamps, dtype=np.int64) // DAY_SIZE
+        ).tolist()
+        stored_bitmaps = connection.execute(
+            select(coverage_table.c.day, coverage_table.c.bitmap)
+            .where(coverage_table.c.table_name == coverage_name)
+            .where(coverage_table.c.day.in_(days))
+        ).all()
+        coverage = CoverageIndex(dict(stored_bitmaps))
+        stored_days = set(coverage.day_bitmaps)
+        for day in days:
+            if day not in stored_days:
+                coverage.add(self.scan_timestamps(
+                    connection=connection,
+                    table_name=table_name,
+                    schema_name=schema_name,
+                    timestamps_list=[day * DAY_SIZE, (day + 1) * DAY_SIZE - 1]
+                ))
+        coverage.add(timestamps)
+
+        for day in days:
+            bitmap = coverage.day_bitmaps[day].tobytes()
+            if day in stored_days:
+                connection.execute(
+                    update(coverage_table)
+                    .where(coverage_table.c.table_name == coverage_name)
+                    .where(coverage_table.c.day == day)
+                    .values(bitmap=bitmap)
+                )
+            else:
+                connection.execute(
+                    insert(coverage_table).values(
+                        table_name=coverage_name,
+                        day=day,
+                        bitmap=bitmap
+                    )
+                )
+
+
+    def create_watermarks_table(self) -> None:
+        """
+        Creates the `twin_watermarks` and `twin_coverage` tables if they do
+        not exist yet. The check is performed once per engine.
+        """
+
+        if self.engine in engines_with_watermarks:
+            return
+        watermarks_metadata.create_all(self.engine, checkfirst=True)
+        engines_with_watermarks.add(self.engine)
+
+
     def check_table_timestamps(
         self,
         table_name: str,
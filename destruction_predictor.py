@@ -1,25 +1,51 @@
 # Python/third-party imports
+from collections.abc import Iterator
 import os.path
 from pathlib import Path
+import asyncio
+import time
 import pandas as pd
-import joblib
 
 # Internal imports
 from db_handler import DBHandler
+from async_db_handler import AsyncDBHandler, run_coroutine
+from batch_inference import predict_in_chunks
+from sensor_cache import sensor_cache_from_settings
+from fixed_point import quantize_outputs
+from lookup_table import LookupTable
+from model_cache import model_cache
+from model_registry import ModelRegistry
+from model_types import model_type_of, record_timing
+from logger_handler import logger_handler
 from settings import Settings
 
 
+# The registry model used by every inference backend
+INFERENCE_BACKENDS = {
+    'sklearn': 'destruction',
+    'flat_forest': 'flat_destruction',
+    'lookup_table': 'lookup_destruction'
+}
+
+
 def destruction_predictor(
     prediction_start: int,
     prediction_stop: int,
     latest_results_destruction: int| None = None,
-    model_path: Path = Path('prediction_models/rfr_destruction_model.joblib')
+    model_path: Path | None = None,
+    registry_path: Path = Path('prediction_models')
 ) -> str:
     """
     Predicts the destruction and accumulated destruction over a given time
     period using a pre-trained machine learning model, and saves the
     predictions to the database.
 
+    The sensor data is predicted in chunks on a thread pool (see the
+    `inference` settings) and every chunk is saved as soon as it is
+    predicted, so the memory usage does not grow with the prediction range.
+    All chunks are saved in one transaction, so a failed run leaves no
+    partial predictions behind.
+
     Parameters
     ----------
     prediction_start : int
@@ -30,9 +56,11 @@ def destruction_predictor(
         The latest destruction value from the results database to be added to
         the cumulative predictions. If None, the latest prediction destruction
         is used. Defaults to None.
-    model_path : Path, optional
-        Path to the pre-trained machine learning model file.
-        Defaults to 'prediction_models/rfr_destruction_model.joblib'.
+    model_path : Path | None, optional
+        Path to the pre-trained machine learning model file. Defaults to None
+        (the model of the inference backend in the active registry version).
+    registry_path : Path, optional
+        The path of the model registry. Defaults to 'prediction_models'.
 
     Returns
     -------
@@ -44,6 +72,9 @@ def destruction_predictor(
     ------
     FileNotFoundError
         If the specified model file does not exist.
+    ValueError
+        If there is no sensor data in the prediction range or an unknown
+        inference backend is specified.
     """
 
     # Load settings
@@ -54,71 +85,275 @@ def destruction_predictor(
         results_db_settings,
         predictions_db_settings
     ) = Settings().get_db_settings()
+    bulk_insert_settings = Settings().get_bulk_insert_settings()
+    inference_settings = Settings().get_inference_settings()
+    fixed_point_settings = Settings().get_fixed_point_settings()
 
     # Get the objects of dbs
     sensors_db = DBHandler(
         server_name=server_name,
-        database_name=sensors_db_settings['database']
+        database_name=sensors_db_settings['database'],
+        use_watermarks=False,
+        cache=sensor_cache_from_settings(Settings().get_cache_settings())
     )
     predictions_db = DBHandler(
         server_name=server_name,
         database_name=predictions_db_settings['database']
     )
 
-    # Load the sensor data for predictions
-    sensor_data = sensors_db.load_data(
-        table_name=sensors_db_settings['table'],
-        schema_name=sensors_db_settings['schema'],
-        timestamps_list=[prediction_start, prediction_stop]
+    # Load the model and the latest prediction concurrently
+    if model_path is None:
+        model_path = get_backend_model_path(
+            model_registry=ModelRegistry(registry_path),
+            backend=inference_settings['backend']
+        )
+    if not os.path.isfile(model_path):
+        raise FileNotFoundError('Model not found')
+    model, latest_predicted_destruction = run_coroutine(
+        load_prediction_inputs(
+            predictions_db=AsyncDBHandler(predictions_db),
+            predictions_db_settings=predictions_db_settings,
+            model_path=model_path,
+            load_latest_prediction=latest_results_destruction is None
+        )
     )
-    sensor_data.sort_values(by='timestamp', inplace=True)
-    input_prediction_data = sensor_data[[
-        'torque',
-        'speed',
-        'oli_temperature']
-    ]
-
-    # Load the model and predict the destruction
-    if os.path.isfile(model_path):
-        model = joblib.load(model_path)
+    if latest_results_destruction is not None:
+        accumulated_destruction = latest_results_destruction
     else:
-        raise FileNotFoundError('Model not found')
-    predictions = model.predict(input_prediction_data)
-    predictions_df = pd.DataFrame(
-        data=predictions,
-        columns=['destruction']
+        accumulated_destruction = latest_predicted_destruction
+
+    # Predict the destruction chunk by chunk, carrying the accumulated
+    # destruction over and saving every chunk in one transaction
+    saving_messages = []
+    predicted_rows = 0
+    outside_rows = 0
+    insert_time = 0.0
+    start_time = time.perf_counter()
+    with predictions_db.begin() as connection:
+        for sensor_chunk, predictions in predict_in_chunks(
+            model=model,
+            data_chunks=iter_sensor_data(
+                sensors_db=sensors_db,
+                sensors_db_settings=sensors_db_settings,
+                timestamps_list=[prediction_start, prediction_stop],
+                chunk_size=inference_settings['chunk_size']
+            ),
+            feature_columns=['torque', 'speed', 'oli_temperature'],
+            chunk_size=inference_settings['chunk_size'],
+            max_workers=inference_settings['max_workers']
+        ):
+            predictions_df = pd.DataFrame({
+                'destruction': predictions,
+                'accumulated_destruction': (
+                    predictions.cumsum() + accumulated_destruction
+                ),
+                'timestamp': sensor_chunk['timestamp'].to_numpy()
+            })
+            accumulated_destruction = (
+                predictions_df['accumulated_destruction'].iloc[-1]
+            )
+            quantize_outputs(
+                data=predictions_df,
+                columns=['destruction', 'accumulated_destruction'],
+                fixed_point_settings=fixed_point_settings
+            )
+            insert_start_time = time.perf_counter()
+            saving_messages.append(predictions_db.insert_data(
+                table_name=predictions_db_settings['table'],
+                schema_name=predictions_db_settings['schema'],
+                data=predictions_df,
+                chunksize=bulk_insert_settings['chunksize'],
+                use_staging=bulk_insert_settings['use_staging'],
+                connection=connection
+            ))
+            insert_time += time.perf_counter() - insert_start_time
+            predicted_rows += len(predictions_df)
+            if isinstance(model, LookupTable):
+                outside_rows += int(model.is_outside(sensor_chunk).sum())
+    if predicted_rows == 0:
+        raise ValueError('There is no sensor data in the prediction range.')
+    if outside_rows:
+        # The errors of the table hold inside its ranges only
+        logger_handler().warning(
+            f"{outside_rows} of {predicted_rows} rows are outside the "
+            f"lookup table ranges, their predictions are clamped to the grid"
+        )
+    record_timing(
+        model_type=model_type_of(model),
+        model_name='destruction',
+        operation='predict',
+        elapsed_time=time.perf_counter() - start_time - insert_time,
+        rows=predicted_rows,
+        timings_path=Path(registry_path) / 'model_timings.json'
     )
 
-    # Calculate predicted accumulated destruction
-    if latest_results_destruction is not None:
-        predictions_df['accumulated_destruction'] = (
-                predictions_df['destruction'].cumsum() +
-                latest_results_destruction
+    # Return the message
+    saving_message = '\n'.join(saving_messages)
+    return saving_message
+
+
+def get_backend_model_path(
+    model_registry: ModelRegistry,
+    backend: str
+) -> Path:
+    """
+    Returns the path of the destruction model of an inference backend in
+    the active registry version. Versions trained without the model of the
+    backend fall back to the scikit-learn model.
+
+    Parameters
+    ----------
+    model_registry : ModelRegistry
+        The model registry.
+    backend : str
+        The name of the inference backend in `INFERENCE_BACKENDS`.
+
+    Returns
+    -------
+    Path
+        The path of the model file.
+
+    Raises
+    ------
+    ValueError
+        If an unknown inference backend is specified.
+    """
+
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f'Unknown inference backend: {backend}')
+    try:
+        return model_registry.get_model_path(INFERENCE_BACKENDS[backend])
+    except FileNotFoundError:
+        if backend == 'sklearn':
+            raise
+        logger_handler().warning(
+            f"There is no {backend} model in the active version, "
+            f"the sklearn model is used."
         )
+        return model_registry.get_model_path(INFERENCE_BACKENDS['sklearn'])
+
+
+def iter_sensor_data(
+    sensors_db: DBHandler,
+    sensors_db_settings: dict,
+    timestamps_list: list[int],
+    chunk_size: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Loads the sensor data of the prediction range sorted by timestamp.
+    Ranges shorter than one chunk are loaded at once through the sensor
+    cache, longer ranges are streamed in chunks.
+
+    Parameters
+    ----------
+    sensors_db : DBHandler
+        Object for interacting with the sensors database.
+    sensors_db_settings : dict
+        Settings for the sensors database.
+    timestamps_list : list[int]
+        The start and end timestamps of the prediction data.
+    chunk_size : int
+        The maximum number of rows in one streamed chunk.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Consecutive chunks of the sensor data.
+    """
+
+    if timestamps_list[1] - timestamps_list[0] < chunk_size:
+        sensor_data = sensors_db.load_data(
+            table_name=sensors_db_settings['table'],
+            schema_name=sensors_db_settings['schema'],
+            timestamps_list=timestamps_list
+        )
+        sensor_data.sort_values(by='timestamp', inplace=True)
+        yield sensor_data
     else:
-        last_prediction_timestamp = predictions_db.get_max_and_min_time(
-            table_name=predictions_db_settings['table'],
-            schema_name=predictions_db_settings['schema']
-        ).loc[0, 'max_timestamp']
-        latest_predicted_destruction = predictions_db.load_data(
-            table_name=predictions_db_settings['table'],
-            schema_name=predictions_db_settings['schema'],
-            columns=['accumulated_destruction'],
-            timestamps_list=[
-                last_prediction_timestamp,
-                last_prediction_timestamp
-            ]
-        ).loc[0, 'accumulated_destruction']
-        predictions_df['accumulated_destruction'] = (
-            predictions_df['destruction'].cumsum() + latest_predicted_destruction
+        yield from sensors_db.iter_data(
+            table_name=sensors_db_settings['table'],
+            schema_name=sensors_db_settings['schema'],
+            timestamps_list=timestamps_list,
+            columns=['torque', 'speed', 'oli_temperature'],
+            chunk_size=chunk_size
         )
-    predictions_df['timestamp'] = sensor_data['timestamp']
-    predictions_df.sort_values(by='timestamp', inplace=True)
 
-    # Save the predictions and return the message
-    saving_message = predictions_db.insert_data(
+
+async def load_prediction_inputs(
+    predictions_db: AsyncDBHandler,
+    predictions_db_settings: dict,
+    model_path: Path,
+    load_latest_prediction: bool
+) -> tuple[object, float | None]:
+    """
+    Loads the model and optionally the latest predicted destruction
+    concurrently.
+
+    Parameters
+    ----------
+    predictions_db : AsyncDBHandler
+        Object for interacting with the predictions database.
+    predictions_db_settings : dict
+        Settings for the predictions database.
+    model_path : Path
+        Path to the pre-trained machine learning model file. The model is
+        taken from the process-wide `model_cache` unless the file changed.
+    load_latest_prediction : bool
+        If True, the latest predicted destruction is loaded as well.
+
+    Returns
+    -------
+    tuple[object, float | None]
+        A tuple containing the model and the latest predicted destruction
+        (None if it was not requested).
+    """
+
+    loads = [asyncio.to_thread(model_cache.get, model_path)]
+    if load_latest_prediction:
+        loads.append(predictions_db.run(
+            get_latest_predicted_destruction,
+            predictions_db=predictions_db.db_handler,
+            predictions_db_settings=predictions_db_settings
+        ))
+    loaded = await asyncio.gather(*loads)
+    if not load_latest_prediction:
+        loaded.append(None)
+    model, latest_predicted_destruction = loaded
+    return model, latest_predicted_destruction
+
+
+def get_latest_predicted_destruction(
+    predictions_db: DBHandler,
+    predictions_db_settings: dict
+) -> float:
+    """
+    Retrieves the latest accumulated destruction from the predictions
+    database.
+
+    Parameters
+    ----------
+    predictions_db : DBHandler
+        Object for interacting with the predictions database.
+    predictions_db_settings : dict
+        Settings for the predictions database.
+
+    Returns
+    -------
+    float
+        The latest predicted accumulated destruction.
+    """
+
+    last_prediction_timestamp = predictions_db.get_max_and_min_time(
+        table_name=predictions_db_settings['table'],
+        schema_name=predictions_db_settings['schema']
+    ).loc[0, 'max_timestamp']
+    latest_predicted_destruction = predictions_db.load_data(
         table_name=predictions_db_settings['table'],
         schema_name=predictions_db_settings['schema'],
-        data=predictions_df
-    )
-    return saving_message
+        columns=['accumulated_destruction'],
+        timestamps_list=[
+            last_prediction_timestamp,
+            last_prediction_timestamp
+        ]
+    ).loc[0, 'accumulated_destruction']
+    return latest_predicted_destruction
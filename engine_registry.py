@@ -0,0 +1,216 @@
+# Python/third-party imports
+from pathlib import Path
+import importlib.util
+import os
+import threading
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+# Internal imports
+from settings import Settings
+
+
+class EngineRegistry:
+    def __init__(
+        self,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_pre_ping: bool = True,
+        pool_recycle: int = 3600,
+        fast_executemany: bool = True
+    ):
+        """
+        Initialize the EngineRegistry object.
+
+        The registry keeps one SQLAlchemy engine (and therefore one
+        connection pool) per (backend, server, database), so every DBHandler
+        created in the process reuses the already opened connections instead
+        of building a new engine.
+
+        Supported backends are:
+         - 'mssql' - MS SQL Server reached with pyodbc and trusted connection,
+         - 'sqlite' - embedded SQLite file per database,
+         - 'duckdb' - embedded columnar DuckDB file per database (requires
+           the `duckdb_engine` package).
+        Embedded backends keep their files in `storage_path`.
+
+        Parameters
+        ----------
+        pool_size : int, optional
+            The number of connections kept open in each pool. Defaults to 5.
+        max_overflow : int, optional
+            The number of connections allowed above `pool_size`.
+            Defaults to 10.
+        pool_pre_ping : bool, optional
+            If True, connections are tested before being handed out.
+            Defaults to True.
+        pool_recycle : int, optional
+            The number of seconds after which a connection is recycled.
+            Defaults to 3600.
+        fast_executemany : bool, optional
+            If True, pyodbc sends parameter arrays in bulk instead of one
+            INSERT per row. Defaults to True.
+        """
+
+        self.pool_settings = {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_pre_ping': pool_pre_ping,
+            'pool_recycle': pool_recycle,
+            'fast_executemany': fast_executemany
+        }
+        self.backend = 'mssql'
+        self.storage_path = Path('local_storage')
+        self._engines: dict[tuple[str, str, str], Engine] = {}
+        self._lock = threading.Lock()
+
+
+    def configure(self, **pool_settings) -> None:
+        """
+        Updates the pool settings used for engines created from now on.
+
+        Parameters
+        ----------
+        **pool_settings
+            Keyword arguments passed to `sqlalchemy.create_engine`, e.g.
+            `pool_size`, `max_overflow`, `pool_pre_ping`, `pool_recycle`,
+            `fast_executemany`.
+
+        Notes
+        -----
+        Engines which are already in the registry are not rebuilt, call
+        `dispose_all` first to apply new settings to every connection.
+        """
+
+        with self._lock:
+            self.pool_settings.update(pool_settings)
+
+
+    def configure_backend(
+        self,
+        backend_type: str = 'mssql',
+        storage_path: Path = Path('local_storage')
+    ) -> None:
+        """
+        Selects the storage backend used for engines created from now on.
+
+        Parameters
+        ----------
+        backend_type : str, optional
+            One of 'mssql', 'sqlite' or 'duckdb'. Defaults to 'mssql'.
+        storage_path : Path, optional
+            The directory for files of the embedded backends.
+            Defaults to 'local_storage'.
+
+        Raises
+        ------
+        ValueError
+            If an unknown backend type is specified.
+        ImportError
+            If the 'duckdb' backend is selected without the `duckdb_engine`
+            package installed.
+        """
+
+        if backend_type not in ('mssql', 'sqlite', 'duckdb'):
+            raise ValueError(f'Unknown backend type: {backend_type}')
+        if (
+            backend_type == 'duckdb'
+            and importlib.util.find_spec('duckdb_engine') is None
+        ):
+            raise ImportError(
+                'The duckdb backend requires the duckdb_engine package '
+                '(pip install duckdb_engine)'
+            )
+        with self._lock:
+            self.backend = backend_type
+            self.storage_path = Path(storage_path)
+
+
+    def get_engine(self, server_name: str, database_name: str) -> Engine:
+        """
+        Returns the shared engine for the given server and database, creating
+        it on the first request.
+
+        Parameters
+        ----------
+        server_name : str
+            The name of the server to connect to.
+        database_name : str
+            The name of the database to connect to.
+
+        Returns
+        -------
+        sqlalchemy.engine.Engine
+            The engine object shared by all handlers of this database.
+        """
+
+        key = (self.backend, server_name, database_name)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                engine_settings = dict(self.pool_settings)
+                if self.backend == 'mssql':
+                    url = (
+                        f"mssql+pyodbc://{server_name}/{database_name}?"
+                        f"driver=ODBC+Driver+17+for+SQL+Server"
+                        f"&trusted_connection=yes"
+                    )
+                else:
+                    # fast_executemany is a pyodbc only option
+                    engine_settings.pop('fast_executemany', None)
+                    os.makedirs(self.storage_path, exist_ok=True)
+                    database_path = self.storage_path / database_name
+                    if self.backend == 'sqlite':
+                        url = f"sqlite:///{database_path}.db"
+                    else:
+                        url = f"duckdb:///{database_path}.duckdb"
+                engine = create_engine(url, **engine_settings)
+                self._engines[key] = engine
+        return engine
+
+
+    def configure_from_settings(self, settings: Settings) -> None:
+        """
+        Applies the engine and backend sections of the settings file.
+
+        Parameters
+        ----------
+        settings : Settings
+            The settings object of the pipeline.
+        """
+
+        self.configure(**settings.get_engine_settings())
+        backend_settings = settings.get_backend_settings()
+        self.configure_backend(
+            backend_type=backend_settings['type'],
+            storage_path=Path(backend_settings['path'])
+        )
+
+
+    def dispose_all(self, close: bool = True) -> int:
+        """
+        Closes all pooled connections and empties the registry.
+
+        Parameters
+        ----------
+        close : bool, optional
+            If False, the pooled connections are dropped without being
+            closed. Use it in a forked child process, where the connections
+            still belong to the parent. Defaults to True.
+
+        Returns
+        -------
+        int
+            The number of disposed engines.
+        """
+
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.dispose(close=close)
+        return len(engines)
+
+
+# Process-wide registry shared by all DBHandler objects
+engine_registry = EngineRegistry()
@@ -0,0 +1,90 @@
+# Python/third-party imports
+import numpy as np
+import pandas as pd
+
+
+def quantize(
+    values: np.ndarray | pd.Series,
+    decimals: int = 9
+) -> np.ndarray:
+    """
+    Rounds values to a fixed number of decimal places in one vectorized
+    pass. Halves are rounded to even, like `Decimal.quantize` with the
+    default context, and the result stays a float64 array.
+
+    Parameters
+    ----------
+    values : np.ndarray | pandas.Series
+        The values to round.
+    decimals : int, optional
+        The number of decimal places. Defaults to 9.
+
+    Returns
+    -------
+    np.ndarray
+        The rounded values as float64.
+    """
+
+    return np.round(np.asarray(values, dtype=np.float64), decimals)
+
+
+def quantize_columns(
+    data: pd.DataFrame,
+    columns: list[str],
+    decimals: int = 9
+) -> pd.DataFrame:
+    """
+    Rounds the columns of a DataFrame in place to a fixed number of decimal
+    places.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data to round.
+    columns : list[str]
+        The columns to round.
+    decimals : int, optional
+        The number of decimal places. Defaults to 9.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The same DataFrame with rounded columns.
+    """
+
+    for column_name in columns:
+        data[column_name] = quantize(data[column_name], decimals)
+    return data
+
+
+def quantize_outputs(
+    data: pd.DataFrame,
+    columns: list[str],
+    fixed_point_settings: dict
+) -> pd.DataFrame:
+    """
+    Rounds the columns of data to be saved, if rounding of the saved values
+    is enabled in the settings.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        The data to be saved.
+    columns : list[str]
+        The columns to round.
+    fixed_point_settings : dict
+        The fixed-point settings with `decimals` and `round_outputs` keys.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The same DataFrame, rounded in place if enabled.
+    """
+
+    if fixed_point_settings['round_outputs']:
+        quantize_columns(
+            data=data,
+            columns=columns,
+            decimals=fixed_point_settings['decimals']
+        )
+    return data
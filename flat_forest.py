@@ -0,0 +1,201 @@
+# Python/third-party imports
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+
+class FlatForest:
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children_left: np.ndarray,
+        children_right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        feature_names: list[str] | None = None,
+        missing_go_to_left: np.ndarray | None = None
+    ):
+        """
+        Initialize the FlatForest object.
+
+        The forest keeps the nodes of all trees in contiguous arrays, so it
+        is evaluated for all rows and trees at once with NumPy, one tree
+        level per step. It is not faster than the compiled traversal of
+        scikit-learn. Leaves point to themselves. Use `flatten_forest` to
+        build it from a fitted forest.
+
+        Parameters
+        ----------
+        feature : np.ndarray
+            The split feature of every node (0 for leaves).
+        threshold : np.ndarray
+            The split threshold of every node (+inf for leaves).
+        children_left : np.ndarray
+            The left child of every node (the node itself for leaves).
+        children_right : np.ndarray
+            The right child of every node (the node itself for leaves).
+        value : np.ndarray
+            The predicted value of every node.
+        roots : np.ndarray
+            The root node of every tree.
+        max_depth : int
+            The depth of the deepest tree.
+        feature_names : list[str] | None, optional
+            The feature names the forest was fitted with. Defaults to None.
+        missing_go_to_left : np.ndarray | None, optional
+            The direction of the rows with a missing (NaN) split feature at
+            every node, as in scikit-learn. Defaults to None (missing values
+            are rejected).
+        """
+
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.feature_names = feature_names
+        self.missing_go_to_left = missing_go_to_left
+
+
+    def predict(self, features: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """
+        Predicts the values of the rows, like
+        `RandomForestRegressor.predict`. The features are rounded to float32
+        before the comparison with the thresholds, and rows with a missing
+        (NaN) split feature follow `missing_go_to_left`, as in scikit-learn.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame | np.ndarray
+            The features, shape (rows, features).
+
+        Returns
+        -------
+        np.ndarray
+            The mean prediction of all trees for every row.
+
+        Raises
+        ------
+        ValueError
+            If the features contain NaN and the forest was flattened
+            without the missing value directions.
+        """
+
+        if isinstance(features, pd.DataFrame) and self.feature_names:
+            features = features[self.feature_names]
+        features = np.asarray(features, dtype=np.float32).astype(np.float64)
+        rows = len(features)
+        missing_go_to_left = getattr(self, 'missing_go_to_left', None)
+        has_missing = bool(np.isnan(features).any())
+        if has_missing and missing_go_to_left is None:
+            raise ValueError(
+                'The flat forest has no missing value directions, flatten '
+                'the forest again to predict rows with NaN'
+            )
+
+        # Move every (tree, row) pair down its tree one level per step. The
+        # features are stored column by column, so `feature * rows + row`
+        # addresses the feature of a row in one flat gather, and the
+        # children are interleaved, so `2 * node + go_right` is the next
+        # node. The pairs which reached a leaf are written out and dropped,
+        # so every step only processes the pairs still inside the trees.
+        flat_features = features.T.ravel()
+        children = np.column_stack(
+            [self.children_left, self.children_right]
+        ).ravel()
+        is_leaf = self.children_left == np.arange(len(self.children_left))
+        leaf_values = np.empty(len(self.roots) * rows)
+        nodes = np.repeat(self.roots, rows)
+        pairs = np.arange(len(nodes))
+        row_indices = pairs % rows
+        reached_leaf = is_leaf[nodes]
+        while nodes.size:
+            if reached_leaf.any():
+                leaf_values[pairs[reached_leaf]] = self.value[
+                    nodes[reached_leaf]
+                ]
+                inside = ~reached_leaf
+                nodes = nodes[inside]
+                pairs = pairs[inside]
+                row_indices = row_indices[inside]
+            values = flat_features[self.feature[nodes] * rows + row_indices]
+            go_right = values > self.threshold[nodes]
+            if has_missing:
+                is_missing = np.isnan(values)
+                go_right[is_missing] = (
+                    missing_go_to_left[nodes[is_missing]] == 0
+                )
+            nodes = children[2 * nodes + go_right]
+            reached_leaf = is_leaf[nodes]
+
+        # Average the leaves tree by tree, in the order of scikit-learn
+        predictions = np.zeros(rows)
+        for tree_values in leaf_values.reshape(len(self.roots), rows):
+            predictions += tree_values
+        return predictions / len(self.roots)
+
+
+def flatten_forest(model: RandomForestRegressor) -> FlatForest:
+    """
+    Exports a fitted random forest to contiguous node arrays.
+
+    Parameters
+    ----------
+    model : RandomForestRegressor
+        The fitted forest with a single output.
+
+    Returns
+    -------
+    FlatForest
+        The flattened forest.
+
+    Raises
+    ------
+    ValueError
+        If the model is not a single output random forest regressor.
+    """
+
+    if not isinstance(model, RandomForestRegressor) or model.n_outputs_ != 1:
+        raise ValueError(
+            'Only single output RandomForestRegressor can be flattened'
+        )
+
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    node_counts = np.array([tree.node_count for tree in trees])
+    offsets = np.concatenate([[0], np.cumsum(node_counts)[:-1]])
+    nodes = np.arange(node_counts.sum())
+
+    is_leaf = np.concatenate([tree.children_left == -1 for tree in trees])
+    feature = np.concatenate([tree.feature for tree in trees])
+    threshold = np.concatenate([tree.threshold for tree in trees])
+    children_left = np.concatenate([
+        tree.children_left + offset for tree, offset in zip(trees, offsets)
+    ])
+    children_right = np.concatenate([
+        tree.children_right + offset for tree, offset in zip(trees, offsets)
+    ])
+    feature[is_leaf] = 0
+    threshold[is_leaf] = np.inf
+    children_left[is_leaf] = nodes[is_leaf]
+    children_right[is_leaf] = nodes[is_leaf]
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    return FlatForest(
+        feature=feature.astype(np.intp),
+        threshold=threshold.astype(np.float64),
+        children_left=children_left.astype(np.intp),
+        children_right=children_right.astype(np.intp),
+        value=np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+        roots=offsets.astype(np.intp),
+        max_depth=max(tree.max_depth for tree in trees),
+        feature_names=(
+            None if feature_names is None else list(feature_names)
+        ),
+        missing_go_to_left=np.concatenate([
+            tree.missing_go_to_left for tree in trees
+        ]).astype(np.uint8)
+    )
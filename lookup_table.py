@@ -0,0 +1,265 @@
+# Python/third-party imports
+import itertools
+import numpy as np
+import pandas as pd
+
+# Internal imports
+from batch_inference import predict_in_chunks
+
+
+class LookupTable:
+    def __init__(
+        self,
+        minimums: np.ndarray,
+        maximums: np.ndarray,
+        values: np.ndarray,
+        feature_names: list[str]
+    ):
+        """
+        Initialize the LookupTable object.
+
+        The table keeps the outputs of a model on a regular grid spanning
+        the ranges of its features, and predicts by multilinear
+        (for three features trilinear) interpolation between the grid
+        points. Features outside the ranges are clamped to the grid, rows
+        with missing (NaN) features are predicted as NaN. Use
+        `build_lookup_table` to sample a fitted model.
+
+        Parameters
+        ----------
+        minimums : np.ndarray
+            The lowest grid point of every feature.
+        maximums : np.ndarray
+            The highest grid point of every feature.
+        values : np.ndarray
+            The model outputs with one axis per feature, at least two grid
+            points per axis.
+        feature_names : list[str]
+            The features of the axes.
+        """
+
+        self.minimums = np.asarray(minimums, dtype=np.float64)
+        self.maximums = np.asarray(maximums, dtype=np.float64)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.feature_names = list(feature_names)
+        spans = self.maximums - self.minimums
+        self.steps = np.where(
+            spans > 0,
+            spans / (np.array(self.values.shape) - 1),
+            1.0
+        )
+
+
+    def is_outside(self, features: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """
+        Finds the rows which are not inside the grid ranges, i.e. the rows
+        which are clamped or have missing (NaN) features.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame | np.ndarray
+            The features, shape (rows, features).
+
+        Returns
+        -------
+        np.ndarray
+            True for every row outside the grid.
+        """
+
+        if isinstance(features, pd.DataFrame):
+            features = features[self.feature_names]
+        features = np.asarray(features, dtype=np.float64)
+        return ~np.all(
+            (features >= self.minimums) & (features <= self.maximums),
+            axis=1
+        )
+
+
+    def predict(self, features: pd.DataFrame | np.ndarray) -> np.ndarray:
+        """
+        Predicts the values of the rows by interpolation between the grid
+        points around them.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame | np.ndarray
+            The features, shape (rows, features).
+
+        Returns
+        -------
+        np.ndarray
+            The interpolated predictions, NaN for rows with missing
+            features.
+        """
+
+        if isinstance(features, pd.DataFrame):
+            features = features[self.feature_names]
+        features = np.asarray(features, dtype=np.float64)
+        grid_shape = np.array(self.values.shape)
+
+        # Interpolate the rows with missing features at the grid origin and
+        # replace their predictions, NaN positions are no valid grid points
+        is_missing = np.isnan(features).any(axis=1)
+        if is_missing.any():
+            features = np.where(
+                np.isnan(features), self.minimums, features
+            )
+
+        # Find the lower grid point and the position between the grid points
+        positions = np.clip(
+            (features - self.minimums) / self.steps,
+            0,
+            grid_shape - 1
+        )
+        lower_points = np.minimum(positions.astype(np.intp), grid_shape - 2)
+        weights = positions - lower_points
+
+        # Sum the grid values of all corners of the surrounding cell
+        strides = np.array(self.values.strides) // self.values.itemsize
+        lower_indices = lower_points @ strides
+        flat_values = self.values.ravel()
+        predictions = np.zeros(len(features))
+        for corner in itertools.product((0, 1), repeat=len(grid_shape)):
+            corner = np.array(corner)
+            corner_weights = np.prod(
+                np.where(corner, weights, 1 - weights),
+                axis=1
+            )
+            predictions += corner_weights * np.take(
+                flat_values, lower_indices + corner @ strides
+            )
+        predictions[is_missing] = np.nan
+        return predictions
+
+
+def build_lookup_table(
+    model: object,
+    feature_ranges: dict[str, tuple[float, float]],
+    grid_size: int | list[int] = 64
+) -> LookupTable:
+    """
+    Samples a fitted model on a regular grid.
+
+    Parameters
+    ----------
+    model : object
+        The fitted model with a `predict` method.
+    feature_ranges : dict[str, tuple[float, float]]
+        The minimum and maximum of every feature, in the order of the
+        model features.
+    grid_size : int | list[int], optional
+        The number of grid points of every feature (at least 2).
+        Defaults to 64.
+
+    Returns
+    -------
+    LookupTable
+        The lookup table of the model.
+
+    Raises
+    ------
+    ValueError
+        If a grid has less than two points.
+    """
+
+    feature_names = list(feature_ranges)
+    if isinstance(grid_size, int):
+        grid_size = [grid_size] * len(feature_names)
+    if min(grid_size) < 2:
+        raise ValueError('The lookup table needs at least 2 grid points')
+    minimums = np.array([feature_ranges[name][0] for name in feature_names])
+    maximums = np.array([feature_ranges[name][1] for name in feature_names])
+
+    grid_points = np.meshgrid(
+        *[
+            np.linspace(minimum, maximum, size)
+            for minimum, maximum, size in zip(minimums, maximums, grid_size)
+        ],
+        indexing='ij'
+    )
+    grid = pd.DataFrame({
+        name: points.ravel()
+        for name, points in zip(feature_names, grid_points)
+    })
+    values = np.concatenate([
+        predictions for _, predictions in predict_in_chunks(
+            model=model,
+            data_chunks=[grid],
+            feature_columns=feature_names
+        )
+    ])
+    return LookupTable(
+        minimums=minimums,
+        maximums=maximums,
+        values=values.reshape(grid_size),
+        feature_names=feature_names
+    )
+
+
+def lookup_error_report(
+    lookup_table: LookupTable,
+    model: object,
+    samples: int = 100_000,
+    seed: int = 0,
+    features: pd.DataFrame | None = None
+) -> dict:
+    """
+    Compares the lookup table with the full model on random points of the
+    grid ranges. The errors hold inside the ranges only, so the share of
+    real inputs outside the grid is reported as well.
+
+    Parameters
+    ----------
+    lookup_table : LookupTable
+        The lookup table of the model.
+    model : object
+        The fitted model.
+    samples : int, optional
+        The number of compared points. Defaults to 100 000.
+    seed : int, optional
+        The seed of the random points. Defaults to 0.
+    features : pandas.DataFrame | None, optional
+        The real inputs of the model, e.g. the training features.
+        Defaults to None (the share outside the grid is not reported).
+
+    Returns
+    -------
+    dict
+        A dictionary with `samples`, `max_abs_error`, `mean_abs_error`,
+        `rmse`, `max_relative_error` and `outside_share` keys. The relative
+        error is related to the range of the model outputs on the grid. The
+        `outside_share` is the share of the `features` rows outside the
+        grid ranges (None without `features`).
+    """
+
+    rng = np.random.default_rng(seed)
+    points = pd.DataFrame({
+        name: rng.uniform(minimum, maximum, samples)
+        for name, minimum, maximum in zip(
+            lookup_table.feature_names,
+            lookup_table.minimums,
+            lookup_table.maximums
+        )
+    })
+    model_predictions = np.concatenate([
+        predictions for _, predictions in predict_in_chunks(
+            model=model,
+            data_chunks=[points],
+            feature_columns=lookup_table.feature_names
+        )
+    ])
+    errors = np.abs(lookup_table.predict(points) - model_predictions)
+    output_range = np.ptp(lookup_table.values)
+    return {
+        'samples': samples,
+        'max_abs_error': float(errors.max()),
+        'mean_abs_error': float(errors.mean()),
+        'rmse': float(np.sqrt(np.mean(errors ** 2))),
+        'max_relative_error': (
+            float(errors.max() / output_range) if output_range else None
+        ),
+        'outside_share': (
+            None if features is None or len(features) == 0
+            else float(lookup_table.is_outside(features).mean())
+        )
+    }
@@ -1,14 +1,24 @@
 # Python/third-party imports
-from pathlib import Path
+import atexit
+import sys
 import math
-import json
 import pandas as pd
 
 # Internal imports
 from settings import Settings
+from engine_registry import engine_registry
 from logger_handler import logger_handler
-from time_handler import get_timestamps
-from calculation_runner import calculation_runner
+from time_handler import (
+    get_timestamps,
+    get_last_prediction_timestamp,
+    get_last_sensor_timestamp
+)
+from calculation_runner import calculation_runner, fleet_calculation_runner
+from backfill_runner import backfill_runner
+from checkpoint_store import CheckpointStore
+from model_registry import ModelRegistry
+from calculate import DestructionAccumulator
+from damage_models import build_damage_model
 from model_trainer import model_trainer
 from destruction_predictor import destruction_predictor
 from check_the_predictions import check_the_predictions
@@ -21,167 +31,285 @@ from check_the_predictions import check_the_predictions
 # 4. If we have 1 day of results - make a prediction
 # 5. Check the predictions
 # 6. When the predictions are bad, train the model after next day
+# The pipeline is guarded, so worker processes of the backfill can import
+# this module without running it.
 
-# Load settings and prediction scheduler
-calculation_batch_size, training_batch_size, predictions_batch_size =(
-    Settings().get_batch_settings()
-)
-with (
-    open(
-        Path('prediction_models/prediction_schedule.json'),
-        'r'
-    ) as schedule_json
-):
-    prediction_schedule = json.load(schedule_json)
+if __name__ == '__main__':
+    # Load settings and prediction scheduler
+    calculation_batch_size, training_batch_size, predictions_batch_size =(
+        Settings().get_batch_settings()
+    )
+    engine_registry.configure_from_settings(Settings())
+    atexit.register(engine_registry.dispose_all)
+    checkpoint_store = CheckpointStore()
 
-# Get the timestamps and start calcualtion.
-(
-    sensor_initial_timestamp,
-    very_first_results_timestamp,
-    last_results_timestamp
- ) = (
-    get_timestamps()
-)
-sensor_final_timestamp = sensor_initial_timestamp + calculation_batch_size
-logger_handler().info(
-    '------------------------------------------'
-    '------------------------------------------'
-)
-logger_handler().info('Pipeline started!')
-logger_handler().info(f'Stage 1: calculating the destruction...')
-logger_handler().info(
-    f"Calculating the destruction for the batch: "
-    f"{pd.to_datetime(sensor_initial_timestamp, unit='s')} - "
-    f"{pd.to_datetime(sensor_final_timestamp, unit='s')}"
-)
-(
-    latest_destruction,
-    calculations_saving_message,
-    first_results_timestamp,
-    last_results_timestamp
-) = (
-    calculation_runner(
-        start_timestamp=sensor_initial_timestamp,
-        stop_timestamp=sensor_final_timestamp,
-        last_results_timestamp=last_results_timestamp
+    # Get the timestamps and start calcualtion.
+    (
+        sensor_initial_timestamp,
+        very_first_results_timestamp,
+        last_results_timestamp
+     ) = (
+        get_timestamps(checkpoint_store=checkpoint_store)
     )
-)
-if type(latest_destruction) == float:
-    logger_handler().info('Calculations performed successfully!')
+    if checkpoint_store.reconcile(
+        'prediction',
+        last_timestamp=get_last_prediction_timestamp()
+    ):
+        # The predictions were saved without the record (or are gone)
+        checkpoint_store.save()
+    sensor_final_timestamp = sensor_initial_timestamp + calculation_batch_size
+    damage_model_settings = Settings().get_damage_model_settings()
+    accumulator = DestructionAccumulator(
+        column_names=Settings().get_db_settings()[3]['columns'],
+        damage_model=build_damage_model(damage_model_settings)
+    )
+    if checkpoint_store.state['accumulator'] is not None:
+        accumulator.restore(checkpoint_store.state['accumulator'])
     logger_handler().info(
-        f'Actual destruction: '
-        f'{round(latest_destruction, 3)}%'
+        '------------------------------------------'
+        '------------------------------------------'
     )
-    logger_handler().info(calculations_saving_message)
-else:
-    logger_handler().error('Calculations failed!')
-    raise EOFError
-
-# Stage 2
-logger_handler().info(f'Stage 2: training the model...')
-if very_first_results_timestamp is None:
-    results_time_amount = 0
-else:
-    results_time_amount = last_results_timestamp - very_first_results_timestamp
-if results_time_amount >= training_batch_size:
-
-    # Training the model
-    full_days = math.floor(results_time_amount / training_batch_size)
-    training_start = very_first_results_timestamp
-    training_stop = training_start + full_days * training_batch_size
-    if training_stop not in prediction_schedule["model_trainings"]:
+    logger_handler().info('Pipeline started!')
+    logger_handler().info(f'Stage 1: calculating the destruction...')
+    fleet_settings = Settings().get_fleet_settings()
+    if fleet_settings['enabled']:
+        if damage_model_settings['type'] != 'instantaneous':
+            raise ValueError(
+                'Fleet mode calculates the instantaneous destruction only, '
+                'set the damage model type to "instantaneous" or disable '
+                'the fleet mode'
+            )
+        # One scan calculates all assets, the models are trained per asset
         logger_handler().info(
-            f"Training the model for the batch: "
-            f"{pd.to_datetime(training_start, unit='s')} - "
-            f"{pd.to_datetime(training_stop, unit='s')}"
+            f"Calculating the fleet destruction for the batch: "
+            f"{pd.to_datetime(sensor_initial_timestamp, unit='s')} - "
+            f"{pd.to_datetime(sensor_final_timestamp, unit='s')}"
         )
-        model_message = model_trainer(
-            start_results_timestamp=very_first_results_timestamp,
-            stop_results_timestamp=last_results_timestamp
+        (
+            fleet_destruction,
+            calculations_saving_message,
+            first_results_timestamp,
+            last_results_timestamp
+        ) = (
+            fleet_calculation_runner(
+                start_timestamp=sensor_initial_timestamp,
+                stop_timestamp=sensor_final_timestamp,
+                last_results_timestamp=last_results_timestamp,
+                asset_column=fleet_settings['asset_column']
+            )
         )
-        logger_handler().info(model_message)
-        prediction_schedule["model_trainings"].append(int(training_stop))
-        with (
-            open(
-                Path('prediction_models/prediction_schedule.json'),
-                'w'
-            ) as schedule_json
-        ):
-            json.dump(prediction_schedule, schedule_json, indent=4)
-    else:
+        for asset, asset_destruction in fleet_destruction.items():
+            logger_handler().info(
+                f'Actual destruction of {asset}: '
+                f'{round(asset_destruction, 3)}%'
+            )
+        logger_handler().info(calculations_saving_message)
+        checkpoint_store.update_stage(
+            'calculation',
+            last_timestamp=last_results_timestamp,
+            first_timestamp=(
+                first_results_timestamp
+                if very_first_results_timestamp is None
+                else very_first_results_timestamp
+            )
+        )
+        checkpoint_store.save()
         logger_handler().info(
-            'Model will be trained only for the full days '
-            'of processed results.'
+            'Fleet mode performs the calculations only, training and '
+            'predictions are skipped.'
         )
-
-    # Predicting the destruction
-    prediction_start = last_results_timestamp + 1
-    prediction_stop = prediction_start + predictions_batch_size
-    try:
-        last_performed_prediction = prediction_schedule["predictions"][-1]
-        latest_results_destruction = None
-    except IndexError:
-        last_performed_prediction = 0
-        latest_results_destruction = latest_destruction
+        sys.exit(0)
+    backfill_settings = Settings().get_backfill_settings()
     if (
-            prediction_stop not in prediction_schedule["predictions"]
-            and prediction_stop - last_performed_prediction
-            > predictions_batch_size
+            backfill_settings['enabled']
+            and damage_model_settings['type'] == 'instantaneous'
     ):
+        # Shards are independent only without a state carried between them
+        last_sensor_timestamp = get_last_sensor_timestamp()
+    else:
+        last_sensor_timestamp = None
+    if (
+            last_sensor_timestamp is not None
+            and last_sensor_timestamp > sensor_final_timestamp
+    ):
+        # More than one batch is pending, calculate all of it in parallel
         logger_handler().info(
-            f"Predicting the destruction for: "
-            f"{pd.to_datetime(prediction_start, unit='s')} - "
-            f"{pd.to_datetime(prediction_stop,unit='s')}"
+            f"Backfilling the destruction for: "
+            f"{pd.to_datetime(sensor_initial_timestamp, unit='s')} - "
+            f"{pd.to_datetime(last_sensor_timestamp, unit='s')}"
         )
-        prediction_saving_message = destruction_predictor(
-            prediction_start=prediction_start,
-            prediction_stop=prediction_stop,
-            latest_results_destruction=latest_results_destruction
+        (
+            latest_destruction,
+            calculations_saving_message,
+            first_results_timestamp,
+            last_results_timestamp
+        ) = (
+            backfill_runner(
+                start_timestamp=sensor_initial_timestamp,
+                stop_timestamp=last_sensor_timestamp,
+                last_results_timestamp=last_results_timestamp,
+                accumulator=accumulator,
+                shard_size=backfill_settings['shard_size'],
+                max_workers=backfill_settings['max_workers']
+            )
         )
-        if type(prediction_saving_message) == str:
-            logger_handler().info('Predictions performed successfully!')
-            logger_handler().info(prediction_saving_message)
-        else:
-            logger_handler().error('Predictions failed!')
-            raise EOFError
-        prediction_schedule["predictions"].append(int(prediction_stop))
-        with (
-            open(
-                Path('prediction_models/prediction_schedule.json'),
-                'w'
-            ) as schedule_json
-        ):
-            json.dump(prediction_schedule, schedule_json, indent=4)
     else:
         logger_handler().info(
-            'Predictions will be performed only for full hours '
-            'of processed results.'
+            f"Calculating the destruction for the batch: "
+            f"{pd.to_datetime(sensor_initial_timestamp, unit='s')} - "
+            f"{pd.to_datetime(sensor_final_timestamp, unit='s')}"
         )
-
-    # Check the predictions
-    if results_time_amount - training_batch_size >= calculation_batch_size:
-        check_start = first_results_timestamp
-        check_stop = check_start + predictions_batch_size
+        (
+            latest_destruction,
+            calculations_saving_message,
+            first_results_timestamp,
+            last_results_timestamp
+        ) = (
+            calculation_runner(
+                start_timestamp=sensor_initial_timestamp,
+                stop_timestamp=sensor_final_timestamp,
+                last_results_timestamp=last_results_timestamp,
+                accumulator=accumulator
+            )
+        )
+    if type(latest_destruction) == float:
+        checkpoint_store.update_stage(
+            'calculation',
+            last_timestamp=last_results_timestamp,
+            first_timestamp=(
+                first_results_timestamp
+                if very_first_results_timestamp is None
+                else very_first_results_timestamp
+            )
+        )
+        checkpoint_store.state['accumulator'] = accumulator.checkpoint()
+        checkpoint_store.save()
+        logger_handler().info('Calculations performed successfully!')
         logger_handler().info(
-            f"Checking the destruction prediction for: "
-            f"{pd.to_datetime(check_start, unit='s')} - "
-            f"{pd.to_datetime(check_stop, unit='s')}"
+            f'Actual destruction: '
+            f'{round(latest_destruction, 3)}%'
         )
-        result = check_the_predictions(
-            start_timestamp=check_start,
-            stop_timestamp=check_stop
+        logger_handler().info(calculations_saving_message)
+    else:
+        logger_handler().error('Calculations failed!')
+        raise EOFError
+
+    # Stage 2
+    logger_handler().info(f'Stage 2: training the model...')
+    if very_first_results_timestamp is None:
+        results_time_amount = 0
+    else:
+        results_time_amount = (
+            last_results_timestamp - very_first_results_timestamp
+        )
+    if results_time_amount >= training_batch_size:
+
+        # Training the model
+        full_days = math.floor(results_time_amount / training_batch_size)
+        training_start = very_first_results_timestamp
+        training_stop = training_start + full_days * training_batch_size
+        last_training = checkpoint_store.get_last_timestamp('training')
+        if last_training is None or training_stop > last_training:
+            logger_handler().info(
+                f"Training the model for the batch: "
+                f"{pd.to_datetime(training_start, unit='s')} - "
+                f"{pd.to_datetime(training_stop, unit='s')}"
+            )
+            model_message = model_trainer(
+                start_results_timestamp=very_first_results_timestamp,
+                stop_results_timestamp=training_stop,
+                previous_stop_timestamp=last_training
+            )
+            logger_handler().info(model_message)
+            checkpoint_store.update_stage(
+                'training',
+                last_timestamp=training_stop,
+                first_timestamp=training_start
+            )
+            checkpoint_store.save()
+        else:
+            logger_handler().info(
+                'Model will be trained only for the full days '
+                'of processed results.'
+            )
+
+        # Predicting the destruction
+        prediction_start = last_results_timestamp + 1
+        prediction_stop = prediction_start + predictions_batch_size
+        last_performed_prediction = (
+            checkpoint_store.get_last_timestamp('prediction')
         )
-        if result is not None:
+        if last_performed_prediction is None:
+            last_performed_prediction = 0
+            latest_results_destruction = latest_destruction
+        else:
+            latest_results_destruction = None
+        if (
+                prediction_stop - last_performed_prediction
+                > predictions_batch_size
+        ):
             logger_handler().info(
-                "Model performance check results:"
-                f"\n - Mean square error value = {result[0]}"
-                f"\n - Root square mean error value = {result[1]}"
-                f"\n - Mean absolute error value = {result[2]}"
-                f"\n - Coefficient of determination value = {result[3]}"
+                f"Predicting the destruction for: "
+                f"{pd.to_datetime(prediction_start, unit='s')} - "
+                f"{pd.to_datetime(prediction_stop,unit='s')}"
+            )
+            prediction_saving_message = destruction_predictor(
+                prediction_start=prediction_start,
+                prediction_stop=prediction_stop,
+                latest_results_destruction=latest_results_destruction
             )
+            if type(prediction_saving_message) == str:
+                logger_handler().info('Predictions performed successfully!')
+                logger_handler().info(prediction_saving_message)
+            else:
+                logger_handler().error('Predictions failed!')
+                raise EOFError
+            checkpoint_store.update_stage(
+                'prediction',
+                last_timestamp=prediction_stop,
+                first_timestamp=prediction_start
+            )
+            checkpoint_store.save()
         else:
             logger_handler().info(
-                f"Predictions was not performed, there's nothing to check."
+                'Predictions will be performed only for full hours '
+                'of processed results.'
+            )
+
+        # Check the predictions
+        if results_time_amount - training_batch_size >= calculation_batch_size:
+            check_start = first_results_timestamp
+            check_stop = check_start + predictions_batch_size
+            logger_handler().info(
+                f"Checking the destruction prediction for: "
+                f"{pd.to_datetime(check_start, unit='s')} - "
+                f"{pd.to_datetime(check_stop, unit='s')}"
+            )
+            result = check_the_predictions(
+                start_timestamp=check_start,
+                stop_timestamp=check_stop
             )
-else:
-    logger_handler().info("There's not enough data for predictions...")
+            if result is not None:
+                logger_handler().info(
+                    "Model performance check results:"
+                    f"\n - Mean square error value = {result[0]}"
+                    f"\n - Root square mean error value = {result[1]}"
+                    f"\n - Mean absolute error value = {result[2]}"
+                    f"\n - Coefficient of determination value = {result[3]}"
+                )
+                model_registry = ModelRegistry()
+                if model_registry.get_active_version() is not None:
+                    model_registry.update_metadata({'check_metrics': {
+                        'start_timestamp': int(check_start),
+                        'stop_timestamp': int(check_stop),
+                        'mse': float(result[0]),
+                        'rmse': float(result[1]),
+                        'mae': float(result[2]),
+                        'r2': float(result[3])
+                    }})
+            else:
+                logger_handler().info(
+                    f"Predictions was not performed, there's nothing to check."
+                )
+    else:
+        logger_handler().info("There's not enough data for predictions...")
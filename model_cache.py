@@ -0,0 +1,134 @@
+# Python/third-party imports
+from collections import OrderedDict
+from pathlib import Path
+import os
+import threading
+import time
+import joblib
+
+
+class ModelCache:
+    def __init__(self, max_models: int = 4, mmap_mode: str | None = 'r'):
+        """
+        Initialize the ModelCache object.
+
+        The cache keeps loaded models in memory keyed by the file path. A
+        cached model is returned as long as the modification time and the
+        size of its file are unchanged, so a long-running process pays the
+        deserialization only once per retrain. A new registry version has a
+        new path and is loaded on its first request.
+
+        The cache only pays off in a long-running host which predicts
+        several times (e.g. a service calling `destruction_predictor`). The
+        scheduler-driven `main_runner.py` starts a new process per run and
+        always loads the model once.
+
+        Parameters
+        ----------
+        max_models : int, optional
+            The number of models kept in memory, the least recently used
+            model is dropped first. Defaults to 4.
+        mmap_mode : str | None, optional
+            The memory-mapping mode passed to `joblib.load`.
+            Defaults to 'r' (read-only).
+        """
+
+        self.max_models = max_models
+        self.mmap_mode = mmap_mode
+        self._models: OrderedDict[str, tuple[tuple[int, int], object]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.load_seconds = 0.0
+        self.last_load_seconds = None
+
+
+    def get(self, model_path: Path) -> object:
+        """
+        Returns the model of a file, loading it if it is not cached or the
+        file has changed since it was loaded.
+
+        Parameters
+        ----------
+        model_path : Path
+            The path of the model file.
+
+        Returns
+        -------
+        object
+            The model.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the model file does not exist.
+        """
+
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError('Model not found')
+        path_key = os.path.abspath(model_path)
+        file_stat = os.stat(path_key)
+        file_key = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self._lock:
+            cached = self._models.get(path_key)
+            if cached is not None and cached[0] == file_key:
+                self._models.move_to_end(path_key)
+                self.hits += 1
+                return cached[1]
+
+            # Load under the lock, so concurrent requests load only once
+            start_time = time.perf_counter()
+            model = joblib.load(path_key, mmap_mode=self.mmap_mode)
+            self.last_load_seconds = time.perf_counter() - start_time
+            self.load_seconds += self.last_load_seconds
+            self.misses += 1
+            self._models[path_key] = (file_key, model)
+            self._models.move_to_end(path_key)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+        return model
+
+
+    def get_stats(self) -> dict:
+        """
+        Returns the usage statistics of the cache.
+
+        Returns
+        -------
+        dict
+            A dictionary with `hits`, `misses`, `hit_rate`, `load_seconds`
+            (total), `last_load_seconds` and `cached_models` keys.
+        """
+
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else None,
+                'load_seconds': self.load_seconds,
+                'last_load_seconds': self.last_load_seconds,
+                'cached_models': len(self._models)
+            }
+
+
+    def clear(self) -> int:
+        """
+        Drops all cached models. The statistics are kept.
+
+        Returns
+        -------
+        int
+            The number of dropped models.
+        """
+
+        with self._lock:
+            dropped_models = len(self._models)
+            self._models.clear()
+        return dropped_models
+
+
+# Process-wide cache shared by all predictions
+model_cache = ModelCache()
@@ -0,0 +1,298 @@
+# Python/third-party imports
+from pathlib import Path
+import json
+import os
+import re
+import shutil
+import time
+import joblib
+
+
+# The model files written before the registry, used until the first
+# registered version
+LEGACY_MODEL_FILES = {
+    'destruction': 'rfr_destruction_model.joblib',
+    'acc_destruction': 'rfr_acc_destruction_model.joblib'
+}
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        registry_path: Path = Path('prediction_models'),
+        keep_versions: int | None = 5
+    ):
+        """
+        Initialize the ModelRegistry object.
+
+        Every training is saved as a new version directory with the model
+        files and a `metadata.json` record. The models are stored
+        uncompressed, so they can be loaded with `mmap_mode` and their
+        arrays are paged in from the disk on demand. The active version is
+        switched by atomically replacing the `active.json` pointer after the
+        version is completely written, so readers never see a half-written
+        model.
+
+        Parameters
+        ----------
+        registry_path : Path, optional
+            The directory of the registry.
+            Defaults to 'prediction_models'.
+        keep_versions : int | None, optional
+            The number of the newest versions kept on activation, older
+            versions are removed. Defaults to 5 (None keeps all versions).
+        """
+
+        self.registry_path = Path(registry_path)
+        self.versions_path = self.registry_path / 'versions'
+        self.active_path = self.registry_path / 'active.json'
+        self.keep_versions = keep_versions
+
+
+    def get_versions(self) -> list[str]:
+        """
+        Returns the completely written versions, oldest first. The versions
+        are sorted by their numbers, so 'v10000' comes after 'v9999'.
+
+        Returns
+        -------
+        list[str]
+            The names of the versions.
+        """
+
+        if not os.path.isdir(self.versions_path):
+            return []
+        return sorted(
+            (
+                version for version in os.listdir(self.versions_path)
+                if re.fullmatch(r'v\d+', version)
+            ),
+            key=lambda version: int(version[1:])
+        )
+
+
+    def get_active_version(self) -> str | None:
+        """
+        Returns the active version.
+
+        Returns
+        -------
+        str | None
+            The name of the active version or None if no version has been
+            activated.
+        """
+
+        if not os.path.isfile(self.active_path):
+            return None
+        with open(self.active_path, 'r') as active_json:
+            return json.load(active_json)['version']
+
+
+    def register(self, models: dict[str, object], metadata: dict) -> str:
+        """
+        Saves the models as a new version. The version is not activated.
+
+        Parameters
+        ----------
+        models : dict[str, object]
+            The models by name (e.g. 'destruction' and 'acc_destruction').
+        metadata : dict
+            The metadata of the training (e.g. the training range, the fit
+            times and the model type). The creation time and the file sizes
+            are added.
+
+        Returns
+        -------
+        str
+            The name of the new version.
+        """
+
+        versions = self.get_versions()
+        version = f'v{int(versions[-1][1:]) + 1 if versions else 1:04d}'
+        self.versions_path.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.versions_path / f'.{version}.tmp'
+        shutil.rmtree(temporary_path, ignore_errors=True)
+        temporary_path.mkdir()
+
+        files = {}
+        for name, model in models.items():
+            model_file = f'{name}.joblib'
+            joblib.dump(model, temporary_path / model_file, compress=0)
+            files[name] = {
+                'file': model_file,
+                'size_bytes': os.path.getsize(temporary_path / model_file)
+            }
+        version_metadata = {
+            **metadata,
+            'version': version,
+            'created_at': int(time.time()),
+            'files': files
+        }
+        with open(temporary_path / 'metadata.json', 'w') as metadata_json:
+            json.dump(version_metadata, metadata_json, indent=4)
+        os.replace(temporary_path, self.versions_path / version)
+        return version
+
+
+    def activate(self, version: str):
+        """
+        Makes a version active. The pointer is replaced atomically, then the
+        old versions above `keep_versions` are removed.
+
+        Parameters
+        ----------
+        version : str
+            The name of the version.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the version does not exist.
+        """
+
+        if not os.path.isdir(self.versions_path / version):
+            raise FileNotFoundError('Model version not found')
+        temporary_path = self.active_path.with_suffix('.tmp')
+        with open(temporary_path, 'w') as active_json:
+            json.dump({'version': version}, active_json, indent=4)
+        os.replace(temporary_path, self.active_path)
+        self.prune()
+
+
+    def prune(self):
+        """
+        Removes the oldest versions above `keep_versions`. The active
+        version is always kept. Versions which cannot be removed (e.g.
+        memory-mapped by another process on Windows) are left for the next
+        pruning.
+        """
+
+        if self.keep_versions is None:
+            return
+        active_version = self.get_active_version()
+        old_versions = self.get_versions()[:-self.keep_versions or None]
+        for version in old_versions:
+            if version != active_version:
+                shutil.rmtree(self.versions_path / version, ignore_errors=True)
+
+
+    def get_metadata(self, version: str | None = None) -> dict:
+        """
+        Returns the metadata of a version.
+
+        Parameters
+        ----------
+        version : str | None, optional
+            The name of the version. Defaults to None (the active version).
+
+        Returns
+        -------
+        dict
+            The metadata of the version.
+
+        Raises
+        ------
+        FileNotFoundError
+            If there is no such version.
+        """
+
+        version = version or self.get_active_version()
+        metadata_path = self.versions_path / str(version) / 'metadata.json'
+        if version is None or not os.path.isfile(metadata_path):
+            raise FileNotFoundError('Model version not found')
+        with open(metadata_path, 'r') as metadata_json:
+            return json.load(metadata_json)
+
+
+    def update_metadata(self, updates: dict, version: str | None = None):
+        """
+        Adds entries (e.g. the metrics of the prediction checks) to the
+        metadata of a version. The record is replaced atomically.
+
+        Parameters
+        ----------
+        updates : dict
+            The entries to add.
+        version : str | None, optional
+            The name of the version. Defaults to None (the active version).
+        """
+
+        metadata = self.get_metadata(version)
+        metadata.update(updates)
+        metadata_path = (
+            self.versions_path / metadata['version'] / 'metadata.json'
+        )
+        temporary_path = metadata_path.with_suffix('.tmp')
+        with open(temporary_path, 'w') as metadata_json:
+            json.dump(metadata, metadata_json, indent=4)
+        os.replace(temporary_path, metadata_path)
+
+
+    def get_model_path(self, name: str, version: str | None = None) -> Path:
+        """
+        Returns the path of a model file. Without an active version, the
+        model file written before the registry is used.
+
+        Parameters
+        ----------
+        name : str
+            The name of the model.
+        version : str | None, optional
+            The name of the version. Defaults to None (the active version).
+
+        Returns
+        -------
+        Path
+            The path of the model file.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the model does not exist.
+        """
+
+        version = version or self.get_active_version()
+        if version is not None:
+            files = self.get_metadata(version)['files']
+            if name not in files:
+                raise FileNotFoundError('Model not found')
+            model_path = self.versions_path / version / files[name]['file']
+        else:
+            model_path = self.registry_path / LEGACY_MODEL_FILES.get(
+                name, f'{name}.joblib'
+            )
+        if not os.path.isfile(model_path):
+            raise FileNotFoundError('Model not found')
+        return model_path
+
+
+    def load(
+        self,
+        name: str,
+        version: str | None = None,
+        mmap_mode: str | None = 'r'
+    ) -> object:
+        """
+        Loads a model.
+
+        Parameters
+        ----------
+        name : str
+            The name of the model.
+        version : str | None, optional
+            The name of the version. Defaults to None (the active version).
+        mmap_mode : str | None, optional
+            The memory-mapping mode of the model arrays, passed to
+            `joblib.load`. Defaults to 'r' (read-only). Use None to load a
+            model which will be modified.
+
+        Returns
+        -------
+        object
+            The model.
+        """
+
+        return joblib.load(
+            self.get_model_path(name, version),
+            mmap_mode=mmap_mode
+        )
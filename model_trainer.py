@@ -1,39 +1,76 @@
 # Python/third-party imports
-from decimal import Decimal
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import asyncio
 import os
-import joblib
+import time
+import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 
 # Internal imports
 from db_handler import DBHandler
+from async_db_handler import AsyncDBHandler, run_coroutine
+from sensor_cache import sensor_cache_from_settings
+from fixed_point import quantize_columns
+from flat_forest import flatten_forest
+from lookup_table import build_lookup_table, lookup_error_report
+from model_registry import ModelRegistry
+from model_types import (
+    build_model,
+    partial_fit_models,
+    record_timing,
+    set_n_jobs,
+    supports_partial_fit,
+    timed_fit
+)
 from settings import Settings
 
 
 def model_trainer(
     start_results_timestamp: int,
     stop_results_timestamp: int,
-    model_type: str = 'RandomForestRegressor',
+    model_type: str | None = None,
     save_model: bool = True,
-    save_path: Path = Path('prediction_models')
+    save_path: Path = Path('prediction_models'),
+    previous_stop_timestamp: int | None = None
 ) -> str:
     """
     Trains machine learning models on sensor and results data and optionally
     saves them.
 
+    The training data range depends on the `training` settings mode:
+     - "full": the whole history from `start_results_timestamp`,
+     - "sliding_window": the last `window_size` seconds,
+     - "warm_start": only the data after `previous_stop_timestamp`, used to
+       add `estimators_per_update` trees to the previously saved forests
+       (the oldest trees are dropped above `max_estimators`). Without a
+       previous model, the forests are trained like in "sliding_window",
+     - "streaming": the whole history, streamed in `chunk_size` rows into
+       models supporting `partial_fit` (e.g. "SGDRegressor") in `epochs`
+       passes, so the memory usage does not grow with the history.
+    The training cost of the incremental modes does not grow with the
+    history.
+
     Parameters
     ----------
     start_results_timestamp : int
-        The start timestamp for retrieving results data.
+        The start timestamp of the results data. It is also the origin of
+        the `time_amount` feature of the accumulated destruction model.
     stop_results_timestamp : int
         The stop timestamp for retrieving results data.
-    model_type : str, optional
-        The type of model to train. Defaults to 'RandomForestRegressor'.
+    model_type : str | None, optional
+        The type of model to train, one of `model_types.MODEL_TYPES`.
+        Defaults to None (the `model_type` of the training settings).
     save_model : bool, optional
         If True, saves the trained models to the specified path. Defaults to
         True.
     save_path : Path, optional
-        The path where models should be saved. Defaults to 'prediction_models'.
+        The path of the model registry where models should be saved as a
+        new active version. Defaults to 'prediction_models'.
+    previous_stop_timestamp : int | None, optional
+        The stop timestamp of the previous training, used by the
+        "warm_start" mode. Defaults to None.
 
     Returns
     -------
@@ -44,13 +81,26 @@ def model_trainer(
     Raises
     ------
     ValueError
-        If an unknown model type is specified.
+        If an unknown model type or training mode is specified, if the
+        model type does not support `partial_fit` in the "streaming" mode,
+        if the lookup table ranges are missing in the "streaming" mode, or
+        if there is no training data in the "streaming" mode.
 
     Notes
     -----
     This function loads sensor and results data from databases, processes it,
-    and trains two RandomForestRegressor models: one for destruction and one
-    for accumulated destruction.
+    and trains two models: one for destruction and one for accumulated
+    destruction. Both models are fitted at the same time, each using half
+    of the `cpu_budget` cores, as jobs or as OpenMP and BLAS threads. When
+    the models are saved, the fit times are recorded per model type and
+    model in `model_timings.json` next to them.
+    With the "flat_forest" inference backend, a flattened copy of the
+    destruction forest is saved as well. With the "lookup_table" backend,
+    the destruction model is sampled on a regular grid of the
+    `lookup_table` settings and the ranges and errors of the table are
+    saved in the version metadata. Without explicit ranges, the grid spans
+    the training data and the ranges of the previous table, so the
+    incremental modes do not shrink it.
     """
 
     # Get the settings and db objects
@@ -59,90 +109,443 @@ def model_trainer(
     )
     sensors_db = DBHandler(
         server_name=server_name,
-        database_name=sensors_db_settings['database']
+        database_name=sensors_db_settings['database'],
+        use_watermarks=False,
+        cache=sensor_cache_from_settings(Settings().get_cache_settings())
     )
     results_db = DBHandler(
         server_name=server_name,
         database_name=results_db_settings['database']
     )
-    days = (stop_results_timestamp - start_results_timestamp)/ (24*60*60)
+    training_settings = Settings().get_training_settings()
+    model_registry = ModelRegistry(save_path)
 
-    # Load the whole results
-    results_data = results_db.load_data(
-        table_name=results_db_settings['table'],
-        schema_name=results_db_settings['schema'],
-        timestamps_list=[start_results_timestamp, stop_results_timestamp]
-    )
-    results_data.sort_values('timestamp', inplace=True)
-    results_data['destruction'] = (
-        results_data['destruction'].apply(
-            lambda x: Decimal(x).quantize(
-            Decimal('1.000000000'))
+    if model_type is None:
+        model_type = training_settings['model_type']
+
+    # Choose the training data range
+    training_mode = training_settings['mode']
+    if training_mode not in (
+        'full', 'sliding_window', 'warm_start', 'streaming'
+    ):
+        raise ValueError('Unknown training mode')
+    if training_mode == 'streaming' and not supports_partial_fit(
+        build_model(model_type, training_settings['model_parameters'])
+    ):
+        raise ValueError(
+            f'The streaming mode requires a model type supporting '
+            f'partial_fit (e.g. "SGDRegressor"), got "{model_type}"'
         )
-    )
-    results_data['accumulated_destruction'] = (
-        results_data['accumulated_destruction'].apply(
-            lambda x: Decimal(x).quantize(
-                Decimal('1.000000000'))
+    inference_backend = Settings().get_inference_settings()['backend']
+    lookup_table_settings = Settings().get_lookup_table_settings()
+    if (
+        inference_backend == 'lookup_table'
+        and training_mode == 'streaming'
+        and lookup_table_settings['ranges'] is None
+    ):
+        raise ValueError(
+            'The lookup table ranges are required in the streaming mode'
         )
-    )
+    warm_start = False
+    if (
+        training_mode == 'warm_start'
+        and model_type == 'RandomForestRegressor'
+        and previous_stop_timestamp is not None
+        and previous_stop_timestamp < stop_results_timestamp
+    ):
+        try:
+            destruction_model = model_registry.load(
+                'destruction', mmap_mode=None
+            )
+            acc_destruction_model = model_registry.load(
+                'acc_destruction', mmap_mode=None
+            )
+        except FileNotFoundError:
+            pass
+        else:
+            warm_start = all(
+                isinstance(model, RandomForestRegressor)
+                for model in (destruction_model, acc_destruction_model)
+            )
+    if warm_start:
+        training_start = previous_stop_timestamp + 1
+    elif (
+        training_mode in ('sliding_window', 'warm_start')
+        and training_settings['window_size']
+    ):
+        training_start = max(
+            start_results_timestamp,
+            stop_results_timestamp - training_settings['window_size']
+        )
+    else:
+        training_start = start_results_timestamp
+    days = (stop_results_timestamp - training_start + 1)/ (24*60*60)
 
-    # Load the corresponding sensors data for the loaded results
-    sensors_data = sensors_db.load_data(
-        table_name=sensors_db_settings['table'],
-        schema_name=sensors_db_settings['schema'],
-        timestamps_list=[start_results_timestamp, stop_results_timestamp]
-    )
-    sensors_data.sort_values('timestamp', inplace=True)
-
-    # Prepare data for destruction model and acc destruction model
-    training_features = sensors_data
-    training_features['time_amount'] = (
-            training_features['timestamp'] - training_features[
-        'timestamp'].iloc[0])
-    destruction_features = training_features[[
-        'torque',
-        'speed',
-        'oli_temperature']
-    ]
-    destruction_results = results_data[['destruction']].values.ravel()
-    acc_destruction_features = training_features[[
-        'time_amount'
-    ]]
-    acc_destruction_results = (
-        results_data[['accumulated_destruction']].values.ravel()
-    )
-    if model_type == 'RandomForestRegressor':
-        destruction_model = RandomForestRegressor()
-        acc_destruction_model = RandomForestRegressor()
+    # Stream the data chunk by chunk into the models
+    if training_mode == 'streaming':
+        destruction_model = build_model(
+            model_type, training_settings['model_parameters']
+        )
+        acc_destruction_model = build_model(
+            model_type, training_settings['model_parameters']
+        )
+        start_time = time.perf_counter()
+        training_rows = partial_fit_models(
+            models=[
+                (
+                    destruction_model,
+                    ['torque', 'speed', 'oli_temperature'],
+                    'destruction'
+                ),
+                (
+                    acc_destruction_model,
+                    ['time_amount'],
+                    'accumulated_destruction'
+                )
+            ],
+            chunks=lambda: iter_training_chunks(
+                results_db=results_db,
+                sensors_db=sensors_db,
+                results_db_settings=results_db_settings,
+                sensors_db_settings=sensors_db_settings,
+                timestamps_list=[training_start, stop_results_timestamp],
+                time_origin=start_results_timestamp,
+                chunk_size=training_settings['chunk_size']
+            ),
+            epochs=training_settings['epochs']
+        )
+        fit_times = [time.perf_counter() - start_time] * 2
+        if training_rows == 0:
+            raise ValueError('There is no training data in the range.')
     else:
-        raise ValueError('Unknown model type')
-    destruction_model.fit(destruction_features, destruction_results)
-    acc_destruction_model.fit(acc_destruction_features, acc_destruction_results)
+        # Load the results and the corresponding sensors data concurrently
+        results_data, sensors_data = run_coroutine(
+            load_training_data(
+                results_db=AsyncDBHandler(results_db),
+                sensors_db=AsyncDBHandler(sensors_db),
+                results_db_settings=results_db_settings,
+                sensors_db_settings=sensors_db_settings,
+                timestamps_list=[training_start, stop_results_timestamp]
+            )
+        )
+        results_data.sort_values('timestamp', inplace=True)
+        quantize_columns(
+            data=results_data,
+            columns=['destruction', 'accumulated_destruction'],
+            decimals=Settings().get_fixed_point_settings()['decimals']
+        )
+
+        sensors_data.sort_values('timestamp', inplace=True)
+
+        # Prepare data for destruction model and acc destruction model
+        training_features = sensors_data
+        training_features['time_amount'] = (
+            training_features['timestamp'] - start_results_timestamp
+        )
+        destruction_features = training_features[[
+            'torque',
+            'speed',
+            'oli_temperature']
+        ]
+        destruction_results = results_data[['destruction']].values.ravel()
+        acc_destruction_features = training_features[[
+            'time_amount'
+        ]]
+        acc_destruction_results = (
+            results_data[['accumulated_destruction']].values.ravel()
+        )
+        if warm_start:
+            for model in (destruction_model, acc_destruction_model):
+                grow_forest(
+                    model=model,
+                    estimators_per_update=(
+                        training_settings['estimators_per_update']
+                    ),
+                    max_estimators=training_settings['max_estimators']
+                )
+        else:
+            destruction_model = build_model(
+                model_type, training_settings['model_parameters']
+            )
+            acc_destruction_model = build_model(
+                model_type, training_settings['model_parameters']
+            )
+
+        # Fit both models concurrently, splitting the CPU budget between them
+        cpu_budget = training_settings['cpu_budget'] or os.cpu_count() or 1
+        fit_threads = max(cpu_budget // 2, 1)
+        for model in (destruction_model, acc_destruction_model):
+            set_n_jobs(model, fit_threads)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fits = [
+                executor.submit(
+                    timed_fit,
+                    destruction_model,
+                    destruction_features,
+                    destruction_results,
+                    fit_threads
+                ),
+                executor.submit(
+                    timed_fit,
+                    acc_destruction_model,
+                    acc_destruction_features,
+                    acc_destruction_results,
+                    fit_threads
+                )
+            ]
+            fit_times = [fit.result() for fit in fits]
+        training_rows = len(destruction_features)
 
     # Save the models if necessary
-    final_basic_message = (
-        f"{model_type} models was trained based on "
-        f"{int(days)} days of data."
-    )
-    if save_model:
-        os.makedirs(save_path, exist_ok=True)
-        destruction_model_path = os.path.join(
-            save_path, Path('rfr_destruction_model.joblib')
+    if warm_start:
+        final_basic_message = (
+            f"{training_settings['estimators_per_update']} trees were added "
+            f"to the {model_type} models based on {int(days)} days of data."
         )
-        acc_destruction_model_path = os.path.join(
-            save_path, Path('rfr_acc_destruction_model.joblib')
+    else:
+        final_basic_message = (
+            f"{model_type} models was trained based on "
+            f"{int(days)} days of data in "
+            f"{fit_times[0]:.2f} s and {fit_times[1]:.2f} s."
         )
-        joblib.dump(destruction_model, destruction_model_path )
-        joblib.dump(acc_destruction_model, acc_destruction_model_path)
+    if save_model:
+        for model_name, fit_time in zip(
+            ['destruction', 'acc_destruction'], fit_times
+        ):
+            record_timing(
+                model_type=model_type,
+                model_name=model_name,
+                operation='fit',
+                elapsed_time=fit_time,
+                rows=training_rows,
+                timings_path=Path(save_path) / 'model_timings.json'
+            )
+        models = {
+            'destruction': destruction_model,
+            'acc_destruction': acc_destruction_model
+        }
+        metadata = {
+            'model_type': model_type,
+            'training_mode': training_mode,
+            'warm_start': warm_start,
+            'training_start': int(training_start),
+            'training_stop': int(stop_results_timestamp),
+            'training_rows': int(training_rows),
+            'fit_seconds': {
+                'destruction': fit_times[0],
+                'acc_destruction': fit_times[1]
+            }
+        }
+        if (
+            inference_backend == 'flat_forest'
+            and isinstance(destruction_model, RandomForestRegressor)
+        ):
+            models['flat_destruction'] = flatten_forest(destruction_model)
+        if inference_backend == 'lookup_table':
+            feature_ranges = lookup_table_settings['ranges']
+            if feature_ranges is None:
+                # Extend the ranges of the previous table, the incremental
+                # modes train on a part of the history only
+                feature_ranges = {
+                    name: (
+                        float(destruction_features[name].min()),
+                        float(destruction_features[name].max())
+                    )
+                    for name in destruction_features.columns
+                }
+                try:
+                    previous_ranges = model_registry.get_metadata().get(
+                        'lookup_table_ranges', {}
+                    )
+                except FileNotFoundError:
+                    previous_ranges = {}
+                for name, (minimum, maximum) in previous_ranges.items():
+                    if name in feature_ranges:
+                        feature_ranges[name] = (
+                            min(feature_ranges[name][0], minimum),
+                            max(feature_ranges[name][1], maximum)
+                        )
+            metadata['lookup_table_ranges'] = {
+                name: list(feature_ranges[name])
+                for name in ['torque', 'speed', 'oli_temperature']
+            }
+            models['lookup_destruction'] = build_lookup_table(
+                model=destruction_model,
+                feature_ranges=metadata['lookup_table_ranges'],
+                grid_size=lookup_table_settings['grid_size']
+            )
+            metadata['lookup_table_errors'] = lookup_error_report(
+                lookup_table=models['lookup_destruction'],
+                model=destruction_model,
+                samples=lookup_table_settings['error_samples'],
+                features=(
+                    None if training_mode == 'streaming'
+                    else destruction_features
+                )
+            )
+        version = model_registry.register(models=models, metadata=metadata)
+        model_registry.activate(version)
         additional_message = (
-            f"\nModels were saved to:"
-            f"\n - {destruction_model_path}"
-            f"\n - {acc_destruction_model_path}"
+            f"\nModels were saved as version {version} to:"
+            f"\n - {model_registry.get_model_path('destruction')}"
+            f"\n - {model_registry.get_model_path('acc_destruction')}"
         )
+        if inference_backend == 'lookup_table':
+            additional_message += (
+                f"\nLookup table max absolute error: "
+                f"{metadata['lookup_table_errors']['max_abs_error']:.3g}"
+            )
+            outside_share = metadata['lookup_table_errors']['outside_share']
+            if outside_share:
+                additional_message += (
+                    f"\n{outside_share:.2%} of the training rows are outside "
+                    f"the lookup table ranges"
+                )
     else:
         additional_message = ""
 
     # Build the final message and return it
     final_message = final_basic_message + additional_message
     return final_message
+
+
+def grow_forest(
+    model: RandomForestRegressor,
+    estimators_per_update: int,
+    max_estimators: int | None = None
+) -> None:
+    """
+    Prepares a fitted forest for adding trees with warm start. The next
+    `fit` call keeps the existing trees and fits `estimators_per_update`
+    new ones. Above `max_estimators`, the oldest trees are dropped first.
+
+    Parameters
+    ----------
+    model : RandomForestRegressor
+        The fitted forest.
+    estimators_per_update : int
+        The number of trees to add.
+    max_estimators : int | None, optional
+        The maximum number of trees after the update. Defaults to None
+        (no limit).
+    """
+
+    if max_estimators is not None:
+        kept_estimators = max(max_estimators - estimators_per_update, 0)
+        model.estimators_ = model.estimators_[
+            max(len(model.estimators_) - kept_estimators, 0):
+        ]
+    model.set_params(
+        warm_start=True,
+        n_estimators=len(model.estimators_) + estimators_per_update
+    )
+
+
+def iter_training_chunks(
+    results_db: DBHandler,
+    sensors_db: DBHandler,
+    results_db_settings: dict,
+    sensors_db_settings: dict,
+    timestamps_list: list[int],
+    time_origin: int,
+    chunk_size: int = 86_400
+) -> Iterator[pd.DataFrame]:
+    """
+    Lazily loads the training data in bounded-size chunks. Every chunk of
+    sensors data is joined with the results of the same timestamps.
+
+    Parameters
+    ----------
+    results_db : DBHandler
+        Object for interacting with the results database.
+    sensors_db : DBHandler
+        Object for interacting with the sensors database.
+    results_db_settings : dict
+        Settings for the results database.
+    sensors_db_settings : dict
+        Settings for the sensors database.
+    timestamps_list : list[int]
+        The start and end timestamps of the training data.
+    time_origin : int
+        The origin of the `time_amount` feature.
+    chunk_size : int, optional
+        The maximum number of sensors rows in one chunk. Defaults to 86 400.
+
+    Yields
+    ------
+    pandas.DataFrame
+        Chunks with the features, the `time_amount` feature and the rounded
+        targets, sorted by timestamp.
+    """
+
+    decimals = Settings().get_fixed_point_settings()['decimals']
+    for sensors_chunk in sensors_db.iter_data(
+        table_name=sensors_db_settings['table'],
+        schema_name=sensors_db_settings['schema'],
+        timestamps_list=timestamps_list,
+        columns=['torque', 'speed', 'oli_temperature'],
+        chunk_size=chunk_size
+    ):
+        results_chunk = results_db.load_data(
+            table_name=results_db_settings['table'],
+            schema_name=results_db_settings['schema'],
+            columns=['timestamp', 'destruction', 'accumulated_destruction'],
+            timestamps_list=[
+                int(sensors_chunk['timestamp'].iloc[0]),
+                int(sensors_chunk['timestamp'].iloc[-1])
+            ]
+        )
+        quantize_columns(
+            data=results_chunk,
+            columns=['destruction', 'accumulated_destruction'],
+            decimals=decimals
+        )
+        training_chunk = sensors_chunk.merge(results_chunk, on='timestamp')
+        training_chunk['time_amount'] = (
+            training_chunk['timestamp'] - time_origin
+        )
+        yield training_chunk
+
+
+async def load_training_data(
+    results_db: AsyncDBHandler,
+    sensors_db: AsyncDBHandler,
+    results_db_settings: dict,
+    sensors_db_settings: dict,
+    timestamps_list: list[int]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Loads the results and sensors data of the training range concurrently.
+
+    Parameters
+    ----------
+    results_db : AsyncDBHandler
+        Object for interacting with the results database.
+    sensors_db : AsyncDBHandler
+        Object for interacting with the sensors database.
+    results_db_settings : dict
+        Settings for the results database.
+    sensors_db_settings : dict
+        Settings for the sensors database.
+    timestamps_list : list[int]
+        The start and end timestamps of the training data.
+
+    Returns
+    -------
+    tuple[pandas.DataFrame, pandas.DataFrame]
+        A tuple containing the results data and the sensors data.
+    """
+
+    results_data, sensors_data = await asyncio.gather(
+        results_db.load_data(
+            table_name=results_db_settings['table'],
+            schema_name=results_db_settings['schema'],
+            timestamps_list=timestamps_list
+        ),
+        sensors_db.load_data(
+            table_name=sensors_db_settings['table'],
+            schema_name=sensors_db_settings['schema'],
+            timestamps_list=timestamps_list
+        )
+    )
+    return results_data, sensors_data
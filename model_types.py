@@ -0,0 +1,451 @@
+# Python/third-party imports
+from collections.abc import Callable, Iterable
+from pathlib import Path
+import json
+import os
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator
+from sklearn.ensemble import (
+    HistGradientBoostingRegressor,
+    RandomForestRegressor
+)
+from sklearn.exceptions import NotFittedError
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sklearn.metrics import r2_score
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.preprocessing import PolynomialFeatures, StandardScaler
+from sklearn.utils.validation import check_is_fitted
+from threadpoolctl import threadpool_limits
+
+
+def polynomial_regression(degree: int = 2, **parameters) -> Pipeline:
+    """
+    Builds a linear regression on polynomial features.
+
+    Parameters
+    ----------
+    degree : int, optional
+        The degree of the polynomial features. Defaults to 2, which covers
+        the torque * speed product of the destruction formula.
+    **parameters
+        Keyword arguments passed to `LinearRegression`.
+
+    Returns
+    -------
+    sklearn.pipeline.Pipeline
+        The unfitted model.
+    """
+
+    return make_pipeline(
+        PolynomialFeatures(degree=degree),
+        LinearRegression(**parameters)
+    )
+
+
+def sgd_regression(degree: int = 2, **parameters) -> Pipeline:
+    """
+    Builds a stochastic gradient descent regression on standardized
+    polynomial features. Every step can be fitted chunk by chunk, so the
+    model can be trained out-of-core with `partial_fit_models`.
+
+    Parameters
+    ----------
+    degree : int, optional
+        The degree of the polynomial features. Defaults to 2.
+    **parameters
+        Keyword arguments passed to `SGDRegressor`.
+
+    Returns
+    -------
+    sklearn.pipeline.Pipeline
+        The unfitted model.
+    """
+
+    return make_pipeline(
+        PolynomialFeatures(degree=degree, include_bias=False),
+        StandardScaler(),
+        SGDRegressor(**parameters)
+    )
+
+
+MODEL_TYPES: dict[str, Callable[..., BaseEstimator]] = {
+    'RandomForestRegressor': RandomForestRegressor,
+    'HistGradientBoostingRegressor': HistGradientBoostingRegressor,
+    'LinearRegression': LinearRegression,
+    'PolynomialRegression': polynomial_regression,
+    'SGDRegressor': sgd_regression
+}
+
+
+def build_model(
+    model_type: str,
+    parameters: dict | None = None,
+    n_jobs: int | None = None
+) -> BaseEstimator:
+    """
+    Builds an unfitted model of a registered type.
+
+    Parameters
+    ----------
+    model_type : str
+        The name of the model type in `MODEL_TYPES`.
+    parameters : dict | None, optional
+        Keyword arguments passed to the model. Defaults to None.
+    n_jobs : int | None, optional
+        The number of parallel jobs, set on models supporting it.
+        Defaults to None.
+
+    Returns
+    -------
+    sklearn.base.BaseEstimator
+        The unfitted model.
+
+    Raises
+    ------
+    ValueError
+        If an unknown model type is specified.
+    """
+
+    if model_type not in MODEL_TYPES:
+        raise ValueError('Unknown model type')
+    model = MODEL_TYPES[model_type](**(parameters or {}))
+    set_n_jobs(model, n_jobs)
+    return model
+
+
+def set_n_jobs(model: BaseEstimator, n_jobs: int | None) -> None:
+    """
+    Sets the number of parallel jobs of a model and its pipeline steps.
+    Models without the `n_jobs` parameter are left as they are.
+
+    Parameters
+    ----------
+    model : sklearn.base.BaseEstimator
+        The model.
+    n_jobs : int | None
+        The number of parallel jobs.
+    """
+
+    model.set_params(**{
+        name: n_jobs
+        for name in model.get_params()
+        if name == 'n_jobs' or name.endswith('__n_jobs')
+    })
+
+
+def model_type_of(model: BaseEstimator) -> str:
+    """
+    Returns the registered type name of a model.
+
+    Parameters
+    ----------
+    model : sklearn.base.BaseEstimator
+        The model.
+
+    Returns
+    -------
+    str
+        The name of the model type.
+    """
+
+    if isinstance(model, Pipeline):
+        if 'sgdregressor' in model.named_steps:
+            return 'SGDRegressor'
+        if 'polynomialfeatures' in model.named_steps:
+            return 'PolynomialRegression'
+    return type(model).__name__
+
+
+def timed_fit(
+    model: BaseEstimator,
+    features: pd.DataFrame,
+    targets: np.ndarray,
+    threads: int | None = None
+) -> float:
+    """
+    Fits a model and returns the fitting time.
+
+    Parameters
+    ----------
+    model : sklearn.base.BaseEstimator
+        The model to fit.
+    features : pandas.DataFrame
+        The training features.
+    targets : np.ndarray
+        The training targets.
+    threads : int | None, optional
+        The maximum number of OpenMP and BLAS threads of the fit, which
+        bounds models without `n_jobs` (e.g. HistGradientBoostingRegressor).
+        OpenMP limits belong to the calling thread, so the limit is set
+        here. Defaults to None, which keeps the library defaults.
+
+    Returns
+    -------
+    float
+        The fitting time in seconds.
+    """
+
+    with threadpool_limits(limits=threads):
+        start_time = time.perf_counter()
+        model.fit(features, targets)
+        return time.perf_counter() - start_time
+
+
+def supports_partial_fit(model: BaseEstimator) -> bool:
+    """
+    Checks if a model can be fitted chunk by chunk with
+    `partial_fit_models`, i.e. if its final estimator has `partial_fit`.
+
+    Parameters
+    ----------
+    model : sklearn.base.BaseEstimator
+        The model (estimator or pipeline).
+
+    Returns
+    -------
+    bool
+        True if the model supports `partial_fit`.
+    """
+
+    if isinstance(model, Pipeline):
+        model = model.steps[-1][1]
+    return hasattr(model, 'partial_fit')
+
+
+def partial_fit_models(
+    models: list[tuple[BaseEstimator, list[str], str]],
+    chunks: Callable[[], Iterable[pd.DataFrame]],
+    epochs: int = 1
+) -> int:
+    """
+    Fits models chunk by chunk, so the memory usage is bounded by the
+    chunk size and not by the length of the training data.
+
+    Every step with `partial_fit` (e.g. a scaler) gets its own pass over
+    the chunks, after the steps before it are fitted, and the final
+    estimator gets `epochs` passes. Stateless steps without `partial_fit`
+    (e.g. polynomial features) are fitted on the first chunk. All models
+    are fitted from the same passes.
+
+    Parameters
+    ----------
+    models : list[tuple[BaseEstimator, list[str], str]]
+        The models (estimators or pipelines) with their feature columns and
+        target column.
+    chunks : Callable[[], Iterable[pandas.DataFrame]]
+        A function returning a new iterable of the training data chunks,
+        called once per pass.
+    epochs : int, optional
+        The number of passes of the final estimators over the chunks.
+        Defaults to 1.
+
+    Returns
+    -------
+    int
+        The number of training rows.
+
+    Raises
+    ------
+    ValueError
+        If the final estimator of a model does not support `partial_fit`
+        or if `epochs` is lower than 1.
+    """
+
+    if epochs < 1:
+        raise ValueError('The number of epochs must be at least 1')
+    plans = []
+    for model, feature_columns, target_column in models:
+        if not supports_partial_fit(model):
+            raise ValueError(
+                f'{model_type_of(model)} does not support partial_fit'
+            )
+        if isinstance(model, Pipeline):
+            steps = [step for _, step in model.steps]
+        else:
+            steps = [model]
+        passes = [
+            index for index, step in enumerate(steps[:-1])
+            if hasattr(step, 'partial_fit')
+        ] + [len(steps) - 1] * epochs
+        plans.append((steps, passes, feature_columns, target_column))
+
+    rows = 0
+    for pass_number in range(max(len(plan[1]) for plan in plans)):
+        rows = 0
+        for chunk in chunks():
+            rows += len(chunk)
+            for steps, passes, feature_columns, target_column in plans:
+                if pass_number >= len(passes):
+                    continue
+                fitted_step = passes[pass_number]
+                features = chunk[feature_columns]
+                for step in steps[:fitted_step]:
+                    try:
+                        check_is_fitted(step)
+                    except NotFittedError:
+                        step.fit(features)
+                    features = step.transform(features)
+                if fitted_step == len(steps) - 1:
+                    steps[fitted_step].partial_fit(
+                        features, chunk[target_column].to_numpy()
+                    )
+                else:
+                    steps[fitted_step].partial_fit(features)
+    return rows
+
+
+def record_timing(
+    model_type: str,
+    model_name: str,
+    operation: str,
+    elapsed_time: float,
+    rows: int,
+    timings_path: Path = Path('prediction_models/model_timings.json'),
+    lock_timeout: float = 10.0
+) -> None:
+    """
+    Records the latest fit or predict time of a model, so model types can
+    be compared on the real data. The timings are keyed by the model type,
+    the model name and the operation.
+
+    The file is updated under a lock file, so concurrent runs (e.g. the
+    trainer and the predictor) do not lose each other's timings, and it is
+    replaced atomically, so readers never see a partial file.
+
+    Parameters
+    ----------
+    model_type : str
+        The name of the model type.
+    model_name : str
+        The name of the model, e.g. 'destruction' or 'acc_destruction'.
+    operation : str
+        The timed operation, 'fit' or 'predict'.
+    elapsed_time : float
+        The duration of the operation in seconds.
+    rows : int
+        The number of processed rows.
+    timings_path : Path, optional
+        The JSON file with the timings of all model types.
+        Defaults to 'prediction_models/model_timings.json'.
+    lock_timeout : float, optional
+        The maximum time in seconds to wait for the lock file. A lock file
+        older than the timeout is considered stale (left by a killed run)
+        and is taken over. The lock file holds a token of its owner, so a
+        run whose lock was taken over does not remove the new owner's lock.
+        Defaults to 10.
+
+    Raises
+    ------
+    TimeoutError
+        If the lock file cannot be created within `lock_timeout`.
+    """
+
+    timings_path = Path(timings_path)
+    timings_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = timings_path.with_name(timings_path.name + '.lock')
+    lock_token = f'{os.getpid()}.{uuid.uuid4().hex}'
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        try:
+            lock_file = os.open(
+                lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY
+            )
+            os.write(lock_file, lock_token.encode())
+            break
+        except FileExistsError:
+            try:
+                stale = (
+                    time.time() - os.path.getmtime(lock_path) > lock_timeout
+                )
+            except FileNotFoundError:
+                continue
+            if stale:
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Could not lock {timings_path}')
+            time.sleep(0.01)
+    try:
+        timings = {}
+        if os.path.isfile(timings_path):
+            with open(timings_path, 'r') as timings_json:
+                timings = json.load(timings_json)
+        timings.setdefault(model_type, {}).setdefault(model_name, {})[
+            operation
+        ] = {
+            'seconds': elapsed_time,
+            'rows': rows,
+            'rows_per_second': rows / elapsed_time if elapsed_time else None
+        }
+        temporary_path = timings_path.with_name(
+            f'{timings_path.name}.{uuid.uuid4().hex}.tmp'
+        )
+        try:
+            with open(temporary_path, 'w') as timings_json:
+                json.dump(timings, timings_json, indent=4)
+            os.replace(temporary_path, timings_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+    finally:
+        os.close(lock_file)
+        # A slow update may have lost the lock to a stale takeover, only
+        # remove the lock file if it is still ours
+        try:
+            with open(lock_path, 'r') as lock_text:
+                is_owner = lock_text.read() == lock_token
+            if is_owner:
+                os.remove(lock_path)
+        except FileNotFoundError:
+            pass
+
+
+def compare_model_types(
+    features: pd.DataFrame,
+    targets: np.ndarray,
+    model_types: list[str] | None = None,
+    test_size: float = 0.2
+) -> pd.DataFrame:
+    """
+    Fits every model type on the first part of the data and evaluates it on
+    the rest, to pick the fastest model type meeting the accuracy.
+
+    Parameters
+    ----------
+    features : pandas.DataFrame
+        The features sorted by timestamp.
+    targets : np.ndarray
+        The targets.
+    model_types : list[str] | None, optional
+        The model types to compare. Defaults to None (all registered types).
+    test_size : float, optional
+        The share of the data used for the evaluation. Defaults to 0.2.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The fit time, predict time and R^2 score of every model type,
+        sorted by the predict time.
+    """
+
+    split = int(len(features) * (1 - test_size))
+    comparison = []
+    for model_type in model_types or list(MODEL_TYPES):
+        model = build_model(model_type)
+        fit_time = timed_fit(model, features[:split], targets[:split])
+        start_time = time.perf_counter()
+        predictions = model.predict(features[split:])
+        predict_time = time.perf_counter() - start_time
+        comparison.append({
+            'model_type': model_type,
+            'fit_seconds': fit_time,
+            'predict_seconds': predict_time,
+            'r2': r2_score(targets[split:], predictions)
+        })
+    return pd.DataFrame(comparison).sort_values('predict_seconds')
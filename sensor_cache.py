@@ -0,0 +1,337 @@
+# Python/third-party imports
+from collections import OrderedDict
+from pathlib import Path
+import os
+import re
+import threading
+import zipfile
+import numpy as np
+import pandas as pd
+
+
+class SensorCache:
+    def __init__(
+        self,
+        cache_path: Path = Path('cache'),
+        max_bytes: int = 2 * 1024 ** 3,
+        partition_size: int = 24 * 60 * 60
+    ):
+        """
+        Initialize the SensorCache object.
+
+        The cache keeps day-aligned partitions of sensor tables as `.npz`
+        files. Sensor history never changes once written, so every partition
+        which ends before the latest timestamp of the table is read from the
+        database only once. The least recently used partitions are removed
+        when the cache grows above `max_bytes`.
+
+        Parameters
+        ----------
+        cache_path : Path, optional
+            The directory to store the partitions in. Defaults to 'cache'.
+        max_bytes : int, optional
+            The maximum size of all stored partitions. Defaults to 2 GiB.
+        partition_size : int, optional
+            The number of seconds in one partition. Defaults to one day.
+
+        Attributes
+        ----------
+        hits : int
+            The number of partitions read from the cache.
+        misses : int
+            The number of partitions read from the database and stored.
+        """
+
+        self.cache_path = Path(cache_path)
+        self.max_bytes = max_bytes
+        self.partition_size = partition_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # Rebuild the LRU order of already stored partitions
+        self._entries: OrderedDict[Path, int] = OrderedDict()
+        os.makedirs(self.cache_path, exist_ok=True)
+        stored_files = sorted(
+            self.cache_path.glob('*/*.npz'),
+            key=lambda file_path: file_path.stat().st_mtime
+        )
+        for file_path in stored_files:
+            self._entries[file_path] = file_path.stat().st_size
+
+
+    def load_data(
+        self,
+        db_handler,
+        table_name: str,
+        schema_name: str,
+        columns: list[str] | str = '*',
+        timestamps_list: list[int] = None
+    ) -> pd.DataFrame:
+        """
+        Loads data like `DBHandler.load_data`, reading complete partitions
+        from the cache and storing the missing ones.
+
+        Parameters
+        ----------
+        db_handler : DBHandler
+            The handler of the database containing the table.
+        table_name : str
+            The name of the table to load data from.
+        schema_name : str
+            The name of the schema to load data from.
+        columns : list[str] | str, optional
+            The columns to load from the table. Defaults to '*'.
+        timestamps_list : list[int], optional
+            The start and end timestamps to load data for. Without the
+            timestamps the cache is bypassed. Defaults to None.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The loaded data.
+        """
+
+        if not timestamps_list:
+            return db_handler.load_data(
+                table_name=table_name,
+                schema_name=schema_name,
+                columns=columns,
+                timestamps_list=timestamps_list,
+                use_cache=False
+            )
+
+        start_timestamp = int(timestamps_list[0])
+        stop_timestamp = int(timestamps_list[1])
+        max_timestamp = db_handler.get_max_time(
+            table_name=table_name,
+            schema_name=schema_name
+        )
+        # Servers sharing the cache directory must not share partitions
+        table_path = self.cache_path / re.sub(
+            r'[^\w.-]',
+            '_',
+            f'{db_handler.backend}.{db_handler.server_name}.'
+            f'{db_handler.database_name}.{schema_name}.{table_name}'
+        )
+
+        partitions = []
+        partition_start = (
+            start_timestamp // self.partition_size * self.partition_size
+        )
+        while partition_start <= stop_timestamp:
+            partition_stop = partition_start + self.partition_size - 1
+            if max_timestamp is None or partition_stop > max_timestamp:
+                # The partition may still grow, read it directly
+                partitions.append(db_handler.load_data(
+                    table_name=table_name,
+                    schema_name=schema_name,
+                    timestamps_list=[
+                        max(partition_start, start_timestamp),
+                        min(partition_stop, stop_timestamp)
+                    ],
+                    use_cache=False
+                ))
+            else:
+                partitions.append(self.get_partition(
+                    db_handler=db_handler,
+                    table_name=table_name,
+                    schema_name=schema_name,
+                    partition_path=table_path / f'{partition_start}.npz',
+                    timestamps_list=[partition_start, partition_stop]
+                ))
+            partition_start += self.partition_size
+
+        # Empty partitions carry no column types, keep them out of the concat
+        data = pd.concat(
+            [partition for partition in partitions if not partition.empty]
+            or partitions[:1],
+            ignore_index=True
+        )
+        data = data[
+            (data['timestamp'] >= start_timestamp)
+            & (data['timestamp'] <= stop_timestamp)
+        ].reset_index(drop=True)
+        if isinstance(columns, list):
+            data = data[columns]
+        return data
+
+
+    def get_partition(
+        self,
+        db_handler,
+        table_name: str,
+        schema_name: str,
+        partition_path: Path,
+        timestamps_list: list[int]
+    ) -> pd.DataFrame:
+        """
+        Returns one complete partition, reading it from the database and
+        storing it in the cache on a miss.
+
+        Parameters
+        ----------
+        db_handler : DBHandler
+            The handler of the database containing the table.
+        table_name : str
+            The name of the table to load data from.
+        schema_name : str
+            The name of the schema to load data from.
+        partition_path : Path
+            The file of the partition in the cache.
+        timestamps_list : list[int]
+            The start and end timestamps of the partition.
+
+        Returns
+        -------
+        pandas.DataFrame
+            All columns of the partition.
+        """
+
+        with self._lock:
+            is_cached = partition_path in self._entries
+            if is_cached:
+                self._entries.move_to_end(partition_path)
+                self.hits += 1
+        if is_cached:
+            try:
+                # Keep the LRU order between runs
+                os.utime(partition_path)
+                with np.load(partition_path, allow_pickle=False) as arrays:
+                    return pd.DataFrame(
+                        {name: arrays[name] for name in arrays.files}
+                    )
+            except (OSError, EOFError, ValueError, zipfile.BadZipFile):
+                # Evicted meanwhile or unreadable, count it as a miss
+                with self._lock:
+                    self._entries.pop(partition_path, None)
+                    self.hits -= 1
+
+        partition = db_handler.load_data(
+            table_name=table_name,
+            schema_name=schema_name,
+            timestamps_list=timestamps_list,
+            use_cache=False
+        )
+        partition.sort_values(by='timestamp', inplace=True)
+        arrays = {}
+        for name in partition:
+            arrays[name] = typed_array(partition[name])
+            if arrays[name] is None:
+                # Not storable without pickling, always read it directly
+                return partition
+        os.makedirs(partition_path.parent, exist_ok=True)
+        temporary_path = partition_path.with_suffix(
+            f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        )
+        with open(temporary_path, 'wb') as partition_file:
+            np.savez(partition_file, **arrays)
+        os.replace(temporary_path, partition_path)
+        with self._lock:
+            self.misses += 1
+            self._entries[partition_path] = partition_path.stat().st_size
+            self.evict()
+        # Return the stored types, so hits and misses read the same frame
+        return pd.DataFrame(arrays)
+
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used partitions until the cache fits in
+        `max_bytes`. The most recent partition is always kept.
+        """
+
+        while (
+            len(self._entries) > 1
+            and sum(self._entries.values()) > self.max_bytes
+        ):
+            file_path, _ = self._entries.popitem(last=False)
+            if os.path.isfile(file_path):
+                os.remove(file_path)
+
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns
+        -------
+        dict
+            A dictionary with `hits`, `misses`, `hit_rate`, `partitions`
+            and `bytes` keys.
+        """
+
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'partitions': len(self._entries),
+                'bytes': sum(self._entries.values())
+            }
+
+
+def typed_array(values: pd.Series) -> np.ndarray | None:
+    """
+    Converts a partition column to an array stored without pickling.
+
+    Columns read without a database type (empty partitions or columns
+    holding only NULLs) come as objects and are stored as numbers, the
+    timestamps as int64 and the other columns as float64 with NaN for NULL.
+    Text columns without NULLs (e.g. asset ids) are stored as fixed width
+    strings.
+
+    Parameters
+    ----------
+    values : pandas.Series
+        The column of the partition.
+
+    Returns
+    -------
+    np.ndarray | None
+        The typed array or None if the column mixes text and NULLs, which
+        cannot be stored without pickling.
+    """
+
+    array = values.to_numpy()
+    if array.dtype != object:
+        return array
+    if values.name == 'timestamp':
+        return values.to_numpy(dtype=np.int64)
+    is_text = values.map(lambda value: isinstance(value, str))
+    if not is_text.any():
+        return pd.to_numeric(values).to_numpy(dtype=np.float64)
+    if is_text.all():
+        return array.astype(np.str_)
+    return None
+
+
+# Process-wide caches by directory, shared by all stages
+sensor_caches: dict[Path, SensorCache] = {}
+
+
+def sensor_cache_from_settings(cache_settings: dict) -> SensorCache | None:
+    """
+    Returns the process-wide sensor cache described by the settings.
+
+    Parameters
+    ----------
+    cache_settings : dict
+        The cache settings with `enabled`, `path` and `max_bytes` keys.
+
+    Returns
+    -------
+    SensorCache | None
+        The shared cache or None if the cache is disabled.
+    """
+
+    if not cache_settings['enabled']:
+        return None
+    cache_path = Path(cache_settings['path'])
+    if cache_path not in sensor_caches:
+        sensor_caches[cache_path] = SensorCache(
+            cache_path=cache_path,
+            max_bytes=cache_settings['max_bytes']
+        )
+    return sensor_caches[cache_path]
@@ -33,8 +33,70 @@ class Settings:
             "calculations_batch_size": CALC_BATCH_SIZE (int),
             "training_batch_size": TRAINING_BATCH_SIZE (int),
             "predictions_batch_size": PREDICTIONS_BATCH_SIZE (int)
+          },
+          "engine": {
+            "pool_size": POOL_SIZE (int),
+            "max_overflow": MAX_OVERFLOW (int),
+            "pool_pre_ping": POOL_PRE_PING (bool),
+            "pool_recycle": POOL_RECYCLE_SECONDS (int),
+            "fast_executemany": FAST_EXECUTEMANY (bool)
+          },
+          "bulk_insert": {
+            "chunksize": ROWS_PER_CHUNK (int),
+            "use_staging": USE_STAGING_TABLE (bool)
+          },
+          "backend": {
+            "type": "mssql" | "sqlite" | "duckdb",
+            "path": LOCAL_STORAGE_DIRECTORY (str)
+          },
+          "cache": {
+            "enabled": USE_SENSOR_CACHE (bool),
+            "path": CACHE_DIRECTORY (str),
+            "max_bytes": MAX_CACHE_SIZE_BYTES (int)
+          },
+          "backfill": {
+            "enabled": USE_BACKFILL (bool),
+            "shard_size": SHARD_SIZE_SECONDS (int),
+            "max_workers": MAX_WORKER_PROCESSES (int | null)
+          },
+          "fleet": {
+            "enabled": USE_FLEET_MODE (bool),
+            "asset_column": ASSET_ID_COLUMN (str)
+          },
+          "damage_model": {
+            "type": "instantaneous" | "rainflow",
+            "parameters": DAMAGE_MODEL_PARAMETERS (dict)
+          },
+          "training": {
+            "mode": "full" | "sliding_window" | "warm_start" | "streaming",
+            "window_size": TRAINING_WINDOW_SECONDS (int | null),
+            "chunk_size": STREAMING_CHUNK_ROWS (int),
+            "epochs": STREAMING_PASSES (int),
+            "estimators_per_update": TREES_ADDED_PER_TRAINING (int),
+            "max_estimators": MAX_TREES (int | null),
+            "cpu_budget": CPU_CORES_FOR_TRAINING (int | null),
+            "model_type": MODEL_TYPE_NAME (str),
+            "model_parameters": MODEL_PARAMETERS (dict)
+          },
+          "fixed_point": {
+            "decimals": DECIMAL_PLACES (int),
+            "round_outputs": ROUND_SAVED_RESULTS_AND_PREDICTIONS (bool)
+          },
+          "inference": {
+            "chunk_size": PREDICTION_CHUNK_ROWS (int),
+            "max_workers": MAX_PREDICTION_THREADS (int | null),
+            "backend": "sklearn" | "flat_forest" | "lookup_table"
+          },
+          "lookup_table": {
+            "grid_size": GRID_POINTS_PER_FEATURE (int | list[int]),
+            "ranges": {FEATURE_NAME: [MIN, MAX], ...} | null,
+            "error_samples": ERROR_REPORT_POINTS (int)
           }
         }
+        The "engine", "bulk_insert", "backend", "cache", "backfill", "fleet",
+        "damage_model", "training", "fixed_point", "inference" and
+        "lookup_table" sections are optional, missing keys fall back to
+        defaults.
 
         Parameters
         ----------
@@ -115,3 +177,240 @@ class Settings:
             training_batch_size,
             predictions_batch_size
         )
+
+
+    def get_engine_settings(self) -> dict:
+        """
+        Retrieve connection pool settings for the database engines from
+        self.settings. Missing keys are filled with default values.
+
+        Returns
+        -------
+        dict
+            A dictionary with `pool_size`, `max_overflow`, `pool_pre_ping`,
+            `pool_recycle` and `fast_executemany` keys.
+        """
+
+        engine_settings = {
+            "pool_size": 5,
+            "max_overflow": 10,
+            "pool_pre_ping": True,
+            "pool_recycle": 3600,
+            "fast_executemany": True
+        }
+        engine_settings.update(self.settings.get("engine", {}))
+        return engine_settings
+
+
+    def get_bulk_insert_settings(self) -> dict:
+        """
+        Retrieve settings for bulk inserts of results and predictions from
+        self.settings. Missing keys are filled with default values.
+
+        Returns
+        -------
+        dict
+            A dictionary with `chunksize` and `use_staging` keys.
+        """
+
+        bulk_insert_settings = {
+            "chunksize": 10_000,
+            "use_staging": False
+        }
+        bulk_insert_settings.update(self.settings.get("bulk_insert", {}))
+        return bulk_insert_settings
+
+
+    def get_backend_settings(self) -> dict:
+        """
+        Retrieve the storage backend settings from self.settings.
+        Missing keys are filled with default values (MS SQL Server).
+
+        Returns
+        -------
+        dict
+            A dictionary with `type` and `path` keys.
+        """
+
+        backend_settings = {
+            "type": "mssql",
+            "path": "local_storage"
+        }
+        backend_settings.update(self.settings.get("backend", {}))
+        return backend_settings
+
+
+    def get_cache_settings(self) -> dict:
+        """
+        Retrieve the sensor data cache settings from self.settings.
+        Missing keys are filled with default values (cache disabled).
+
+        Returns
+        -------
+        dict
+            A dictionary with `enabled`, `path` and `max_bytes` keys.
+        """
+
+        cache_settings = {
+            "enabled": False,
+            "path": "cache",
+            "max_bytes": 2 * 1024 ** 3
+        }
+        cache_settings.update(self.settings.get("cache", {}))
+        return cache_settings
+
+
+    def get_backfill_settings(self) -> dict:
+        """
+        Retrieve the settings of the parallel backfill of the calculations
+        from self.settings. Missing keys are filled with default values
+        (backfill disabled).
+
+        Returns
+        -------
+        dict
+            A dictionary with `enabled`, `shard_size` and `max_workers` keys.
+        """
+
+        backfill_settings = {
+            "enabled": False,
+            "shard_size": 24 * 60 * 60,
+            "max_workers": None
+        }
+        backfill_settings.update(self.settings.get("backfill", {}))
+        return backfill_settings
+
+
+    def get_fleet_settings(self) -> dict:
+        """
+        Retrieve the fleet mode settings from self.settings. Missing keys
+        are filled with default values (single asset). The fleet mode
+        requires the "instantaneous" damage model.
+
+        Returns
+        -------
+        dict
+            A dictionary with `enabled` and `asset_column` keys.
+        """
+
+        fleet_settings = {
+            "enabled": False,
+            "asset_column": "asset_id"
+        }
+        fleet_settings.update(self.settings.get("fleet", {}))
+        return fleet_settings
+
+
+    def get_damage_model_settings(self) -> dict:
+        """
+        Retrieve the damage model settings from self.settings. Missing keys
+        are filled with default values (the instantaneous formula).
+
+        Returns
+        -------
+        dict
+            A dictionary with `type` and `parameters` keys.
+        """
+
+        damage_model_settings = {
+            "type": "instantaneous",
+            "parameters": {}
+        }
+        damage_model_settings.update(self.settings.get("damage_model", {}))
+        return damage_model_settings
+
+
+    def get_training_settings(self) -> dict:
+        """
+        Retrieve the model training settings from self.settings. Missing
+        keys are filled with default values (training on the whole history).
+
+        Returns
+        -------
+        dict
+            A dictionary with `mode`, `window_size`, `chunk_size`,
+            `epochs`, `estimators_per_update`, `max_estimators`,
+            `cpu_budget`, `model_type` and `model_parameters` keys. A null
+            `cpu_budget` means all cores. The "streaming" mode requires a
+            `model_type` supporting `partial_fit` (e.g. "SGDRegressor"),
+            which gets `epochs` passes over the data.
+        """
+
+        training_settings = {
+            "mode": "full",
+            "window_size": 7 * 24 * 60 * 60,
+            "chunk_size": 24 * 60 * 60,
+            "epochs": 1,
+            "estimators_per_update": 10,
+            "max_estimators": 200,
+            "cpu_budget": None,
+            "model_type": "RandomForestRegressor",
+            "model_parameters": {}
+        }
+        training_settings.update(self.settings.get("training", {}))
+        return training_settings
+
+
+    def get_fixed_point_settings(self) -> dict:
+        """
+        Retrieve the fixed-point rounding settings from self.settings.
+        Missing keys are filled with default values (9 decimal places for
+        the training targets, saved values are not rounded).
+
+        Returns
+        -------
+        dict
+            A dictionary with `decimals` and `round_outputs` keys.
+        """
+
+        fixed_point_settings = {
+            "decimals": 9,
+            "round_outputs": False
+        }
+        fixed_point_settings.update(self.settings.get("fixed_point", {}))
+        return fixed_point_settings
+
+
+    def get_inference_settings(self) -> dict:
+        """
+        Retrieve the batch inference settings from self.settings. Missing
+        keys are filled with default values.
+
+        Returns
+        -------
+        dict
+            A dictionary with `chunk_size`, `max_workers` and `backend`
+            keys. A null `max_workers` means all cores. The default
+            "sklearn" backend is the fastest exact one, "flat_forest" is a
+            pure NumPy evaluation of the same forest and is not faster.
+        """
+
+        inference_settings = {
+            "chunk_size": 16_384,
+            "max_workers": None,
+            "backend": "sklearn"
+        }
+        inference_settings.update(self.settings.get("inference", {}))
+        return inference_settings
+
+
+    def get_lookup_table_settings(self) -> dict:
+        """
+        Retrieve the settings of the lookup table inference backend from
+        self.settings. Missing keys are filled with default values.
+
+        Returns
+        -------
+        dict
+            A dictionary with `grid_size`, `ranges` and `error_samples`
+            keys. Null `ranges` means the ranges of the training data,
+            extended by the ranges of the previous table.
+        """
+
+        lookup_table_settings = {
+            "grid_size": 64,
+            "ranges": None,
+            "error_samples": 100_000
+        }
+        lookup_table_settings.update(self.settings.get("lookup_table", {}))
+        return lookup_table_settings
@@ -0,0 +1,83 @@
+# Python/third-party imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import asyncio
+import pandas as pd
+
+# Internal imports
+from async_db_handler import AsyncDBHandler, run_coroutine
+from db_handler import DBHandler
+from engine_registry import engine_registry
+from unittest import TestCase
+
+
+class TestAsyncDBHandler(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with an embedded SQLite backend holding a small
+        batch of sensor data.
+        """
+        self.storage_dir = TemporaryDirectory()
+        engine_registry.configure_backend(
+            backend_type='sqlite',
+            storage_path=Path(self.storage_dir.name)
+        )
+        self.db_object = AsyncDBHandler(DBHandler(
+            server_name='local',
+            database_name='Sensor_readings'
+        ))
+        self.db_object.db_handler.insert_data(
+            table_name='sensor_readings',
+            schema_name='dbo',
+            data=pd.DataFrame({
+                'timestamp': range(1705199900, 1705200100),
+                'torque': 1500.0
+            })
+        )
+
+
+    def tearDown(self):
+        """
+        Dispose the embedded engines and restore the default backend.
+        """
+        engine_registry.dispose_all()
+        engine_registry.configure_backend()
+        self.storage_dir.cleanup()
+
+
+    async def load_both_halves(self) -> list[pd.DataFrame]:
+        """
+        Loads two halves of the sensor data concurrently.
+        """
+        return await asyncio.gather(
+            self.db_object.load_data(
+                table_name='sensor_readings',
+                schema_name='dbo',
+                timestamps_list=[1705199900, 1705199999]
+            ),
+            self.db_object.load_data(
+                table_name='sensor_readings',
+                schema_name='dbo',
+                timestamps_list=[1705200000, 1705200099]
+            )
+        )
+
+
+    def test_run_coroutine(self):
+        """
+        Test that `run_coroutine` runs the loads from synchronous code.
+        """
+        halves = run_coroutine(self.load_both_halves())
+        self.assertEqual([len(half) for half in halves], [100, 100])
+
+
+    def test_run_coroutine_in_running_loop(self):
+        """
+        Test that `run_coroutine` also works when called by synchronous code
+        inside a running event loop, where `asyncio.run` raises.
+        """
+        async def caller():
+            return run_coroutine(self.load_both_halves())
+
+        halves = asyncio.run(caller())
+        self.assertEqual([len(half) for half in halves], [100, 100])
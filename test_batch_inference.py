@@ -0,0 +1,71 @@
+# Python/third-party imports
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+# Internal imports
+from batch_inference import predict_in_chunks, single_threaded
+from unittest import TestCase
+
+
+class TestBatchInference(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with a forest fitted on two cores and the data
+        split into uneven chunks.
+        """
+        generator = np.random.default_rng(0)
+        self.data = pd.DataFrame(
+            generator.uniform(0, 1, size=(1_000, 2)),
+            columns=['x1', 'x2']
+        )
+        self.model = RandomForestRegressor(
+            n_estimators=5, random_state=0, n_jobs=2
+        )
+        self.model.fit(self.data, self.data['x1'] + self.data['x2'])
+        self.data_chunks = [self.data[:300], self.data[300:]]
+
+
+    def test_predict_in_chunks(self):
+        """
+        Test that the predictions are yielded in the input order and match
+        the predictions of the whole data.
+        """
+        results = list(predict_in_chunks(
+            model=self.model,
+            data_chunks=self.data_chunks,
+            feature_columns=['x1', 'x2'],
+            chunk_size=128,
+            max_workers=2
+        ))
+        self.assertEqual(
+            [len(chunk) for chunk, _ in results],
+            [128, 128, 44, 128, 128, 128, 128, 128, 60]
+        )
+        # The threads of the reference forest sum the trees in any order
+        np.testing.assert_allclose(
+            np.concatenate([predictions for _, predictions in results]),
+            self.model.predict(self.data),
+            rtol=1e-12
+        )
+
+
+    def test_single_threaded(self):
+        """
+        Test that the single-threaded copy leaves the shared model and its
+        pipeline steps unchanged.
+        """
+        model = single_threaded(self.model)
+        self.assertEqual(model.n_jobs, 1)
+        self.assertEqual(self.model.n_jobs, 2)
+        self.assertIs(model.estimators_, self.model.estimators_)
+
+        pipeline = make_pipeline(StandardScaler(), self.model)
+        single_threaded(pipeline)
+        self.assertIs(pipeline.steps[-1][1], self.model)
+        self.assertEqual(self.model.n_jobs, 2)
+
+        lookup = object()
+        self.assertIs(single_threaded(lookup), lookup)
@@ -0,0 +1,43 @@
+# Python/third-party imports
+import pandas as pd
+
+# Internal imports
+from calculation_runner import fleet_calculation_runner
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestFleetCalculationRunner(TestCase):
+    def test_empty_batch(self):
+        """
+        Test that a fleet batch without sensor data is refused before
+        anything is written, so the checkpoint is never moved to NaN.
+        """
+        table_settings = {
+            'database': 'Fleet',
+            'schema': 'dbo',
+            'table': 'fleet',
+            'columns': ['timestamp', 'destruction', 'accumulated_destruction']
+        }
+        with (
+            patch('calculation_runner.Settings') as settings,
+            patch('calculation_runner.DBHandler') as db_handler
+        ):
+            settings.return_value.get_db_settings.return_value = (
+                'local', {}, table_settings, table_settings, table_settings
+            )
+            settings.return_value.get_cache_settings.return_value = {
+                'enabled': False
+            }
+            db_handler.return_value.load_data.return_value = pd.DataFrame(
+                columns=['timestamp', 'asset_id']
+            )
+            with self.assertRaisesRegex(
+                ValueError, 'There is no sensor data in the batch.'
+            ):
+                fleet_calculation_runner(
+                    start_timestamp=1704067200,
+                    stop_timestamp=1704153599,
+                    last_results_timestamp=None
+                )
+        db_handler.return_value.insert_data.assert_not_called()
@@ -0,0 +1,75 @@
+# Python/third-party imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+# Internal imports
+from checkpoint_store import CheckpointStore
+from unittest import TestCase
+
+
+class TestCheckpointStore(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with a record of a completed calculation stage
+        in a temporary directory.
+        """
+        self.storage_dir = TemporaryDirectory()
+        self.checkpoint_path = Path(self.storage_dir.name) / 'state.json'
+        self.checkpoint_store = CheckpointStore(
+            checkpoint_path=self.checkpoint_path,
+            schedule_path=Path(self.storage_dir.name) / 'schedule.json'
+        )
+        self.checkpoint_store.update_stage(
+            'calculation',
+            last_timestamp=200,
+            first_timestamp=100
+        )
+        self.checkpoint_store.save()
+
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.storage_dir.cleanup()
+
+
+    def test_reconcile(self):
+        """
+        Test that `reconcile` aligns the stage with the database and keeps
+        the first timestamp.
+        """
+        self.assertFalse(
+            self.checkpoint_store.reconcile('calculation', last_timestamp=200)
+        )
+        self.assertTrue(
+            self.checkpoint_store.reconcile('calculation', last_timestamp=300)
+        )
+        self.assertEqual(
+            self.checkpoint_store.get_stage('calculation'),
+            {'first_timestamp': 100, 'last_timestamp': 300}
+        )
+        self.assertTrue(
+            self.checkpoint_store.reconcile('calculation', last_timestamp=None)
+        )
+        self.assertIsNone(self.checkpoint_store.get_stage('calculation'))
+        self.assertFalse(
+            self.checkpoint_store.reconcile('prediction', last_timestamp=None)
+        )
+
+
+    def test_save(self):
+        """
+        Test that a saved record is read back by a new store.
+        """
+        self.checkpoint_store.reconcile('prediction', last_timestamp=400)
+        self.checkpoint_store.save()
+        checkpoint_store = CheckpointStore(
+            checkpoint_path=self.checkpoint_path
+        )
+        self.assertEqual(
+            checkpoint_store.get_last_timestamp('prediction'), 400
+        )
+        self.assertEqual(
+            checkpoint_store.get_last_timestamp('calculation'), 200
+        )
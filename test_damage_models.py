@@ -0,0 +1,121 @@
+# Python/third-party imports
+import numpy as np
+import pandas as pd
+
+# Internal imports
+from calculate import DestructionAccumulator, calculate_destruction
+from damage_models import RainflowDamageModel, build_damage_model
+from unittest import TestCase
+
+
+class TestRainflowDamageModel(TestCase):
+    def test_astm_example(self):
+        """
+        Test the cycles of the ASTM E1049 example, with a linear S-N curve
+        the destruction equals the counted ranges.
+        """
+        model = RainflowDamageModel(
+            reference_range=1,
+            reference_cycles=100,
+            slope=1
+        )
+        destruction = model.calculate(
+            pd.DataFrame({'torque': [-2, 1, -3, 5, -1, 3, -4, 4, -2]})
+        )
+        self.assertEqual(
+            destruction.tolist(),
+            [0, 0, 0, 1.5, 2, 0, 0, 8, 0]
+        )
+        self.assertEqual(model.residual, [5, -4, 4])
+
+
+    def test_batches(self):
+        """
+        Test that processing the signal in batches, with the state restored
+        from a checkpoint, gives the same destruction as one pass.
+        """
+        torque = np.round(
+            np.cumsum(np.random.default_rng(0).normal(size=10_000)), 1
+        )
+        sensor_data = pd.DataFrame({'torque': torque})
+        destruction = RainflowDamageModel().calculate(sensor_data)
+
+        model = RainflowDamageModel()
+        batches = []
+        for start in range(0, len(torque), 977):
+            batches.append(
+                model.calculate(sensor_data.iloc[start:start + 977])
+            )
+            state = model.checkpoint()
+            model = RainflowDamageModel()
+            model.restore(state)
+        np.testing.assert_array_equal(np.concatenate(batches), destruction)
+
+
+class TestDestructionAccumulator(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with a random sensor batch.
+        """
+        rng = np.random.default_rng(0)
+        self.column_names = [
+            'timestamp', 'destruction', 'accumulated_destruction'
+        ]
+        self.sensor_data = pd.DataFrame({
+            'timestamp': np.arange(1000),
+            'torque': np.round(rng.uniform(0, 3000, 1000), 1),
+            'speed': rng.uniform(0, 300, 1000),
+            'oli_temperature': rng.uniform(-20, 100, 1000)
+        })
+
+
+    def test_dtype(self):
+        """
+        Test that the instantaneous damage model built from the default
+        settings follows the dtype of the accumulator.
+        """
+        accumulator = DestructionAccumulator(
+            column_names=self.column_names,
+            latest_destruction=1.5,
+            dtype=np.float32,
+            damage_model=build_damage_model(
+                {'type': 'instantaneous', 'parameters': {}},
+                dtype=np.float32
+            )
+        )
+        result = accumulator.update(self.sensor_data)
+        expected = calculate_destruction(
+            column_names=self.column_names,
+            sensor_data=self.sensor_data,
+            latest_destruction=1.5,
+            dtype=np.float32
+        )
+        for column_name in self.column_names[1:]:
+            self.assertEqual(result[column_name].dtype, np.float32)
+        pd.testing.assert_frame_equal(result, expected)
+
+
+    def test_reset_damage_model(self):
+        """
+        Test that resetting the accumulator from the results database also
+        clears the rainflow residual.
+        """
+        accumulator = DestructionAccumulator(
+            column_names=self.column_names,
+            damage_model=RainflowDamageModel()
+        )
+        accumulator.update(self.sensor_data)
+        self.assertTrue(accumulator.damage_model.residual)
+
+        accumulator.reset(latest_destruction=0, last_timestamp=999)
+        self.assertTrue(accumulator.damage_model.residual)
+        accumulator.reset(
+            latest_destruction=0,
+            last_timestamp=999,
+            reset_damage_model=True
+        )
+        self.assertEqual(accumulator.damage_model.checkpoint(), {
+            'residual': [],
+            'last_value': None,
+            'direction': 0
+        })
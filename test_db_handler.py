@@ -1,10 +1,16 @@
 # Python/third-party imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import importlib.util
 import json
 import pandas as pd
+from sqlalchemy import inspect, text
 
 # Internal imports
 from db_handler import DBHandler
-from unittest import TestCase
+from engine_registry import engine_registry
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
 
 
 class TestDBHandler(TestCase):
@@ -65,3 +71,409 @@ class TestDBHandler(TestCase):
         self.assertTrue(len(data), 101)
         self.assertTrue('torque' in data.columns)
         self.assertTrue('speed' in data.columns)
+
+
+class TestEmbeddedDBHandler(TestCase):
+    backend_type = 'sqlite'
+
+
+    def setUp(self):
+        """
+        Set up the test case by switching the engine registry to an embedded
+        backend in a temporary directory and inserting a small batch of
+        sensor data.
+        """
+        self.storage_dir = TemporaryDirectory()
+        engine_registry.configure_backend(
+            backend_type=self.backend_type,
+            storage_path=Path(self.storage_dir.name)
+        )
+        self.schema_name = 'dbo'
+        self.table_name = 'sensor_readings'
+        self.db_object = DBHandler(
+            server_name='local',
+            database_name='Sensor_readings'
+        )
+        self.data = pd.DataFrame({
+            'timestamp': range(1705199900, 1705200100),
+            'torque': 1500.0,
+            'speed': 150.0,
+            'oli_temperature': 50.0
+        })
+        self.db_object.insert_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            data=self.data
+        )
+
+
+    def tearDown(self):
+        """
+        Dispose the embedded engines and restore the default backend.
+        """
+        engine_registry.dispose_all()
+        engine_registry.configure_backend()
+        self.storage_dir.cleanup()
+
+
+    def test_load_data(self):
+        """
+        Test that `load_data` reads back the inserted rows of the requested
+        timestamps range from the embedded backend.
+        """
+        data = self.db_object.load_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            columns=['torque', 'speed'],
+            timestamps_list=[1705199900, 1705200000]
+        )
+        self.assertEqual(len(data), 101)
+        self.assertEqual(list(data.columns), ['torque', 'speed'])
+
+
+    def test_iter_data(self):
+        """
+        Test that `iter_data` yields bounded chunks covering the whole
+        timestamps range.
+        """
+        chunks = list(self.db_object.iter_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            timestamps_list=[1705199900, 1705200099],
+            chunk_size=64
+        ))
+        self.assertEqual([len(chunk) for chunk in chunks], [64, 64, 64, 8])
+        self.assertEqual(
+            pd.concat(chunks)['timestamp'].tolist(),
+            self.data['timestamp'].tolist()
+        )
+
+
+    def test_get_max_and_min_time(self):
+        """
+        Test that `get_max_and_min_time` returns the timestamps boundaries
+        of the inserted data.
+        """
+        max_min_timestamps = self.db_object.get_max_and_min_time(
+            table_name=self.table_name,
+            schema_name=self.schema_name
+        )
+        self.assertEqual(max_min_timestamps.loc[0, 'max_timestamp'], 1705200099)
+        self.assertEqual(max_min_timestamps.loc[0, 'min_timestamp'], 1705199900)
+
+
+    def test_insert_data_with_staging(self):
+        """
+        Test that the staging insert skips timestamps already present in the
+        table and drops its uniquely named staging table.
+        """
+        self.db_object.insert_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            data=self.data.iloc[-10:],
+            use_staging=True
+        )
+        data = self.db_object.load_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name
+        )
+        self.assertEqual(len(data), len(self.data))
+        self.assertFalse([
+            table_name
+            for table_name in inspect(self.db_object.engine).get_table_names()
+            if '_staging' in table_name
+        ])
+
+
+    def test_insert_data_in_transaction(self):
+        """
+        Test that the chunks inserted in one transaction are rolled back
+        together with the watermark.
+        """
+        new_data = self.data.assign(
+            timestamp=self.data['timestamp'] + len(self.data)
+        )
+        with self.assertRaises(RuntimeError):
+            with self.db_object.begin() as connection:
+                for start in range(0, len(new_data), 100):
+                    self.db_object.insert_data(
+                        table_name=self.table_name,
+                        schema_name=self.schema_name,
+                        data=new_data.iloc[start:start + 100],
+                        use_staging=True,
+                        connection=connection
+                    )
+                raise RuntimeError('The stream failed')
+        max_min_timestamps = self.db_object.get_max_and_min_time(
+            table_name=self.table_name,
+            schema_name=self.schema_name
+        )
+        self.assertEqual(
+            max_min_timestamps.loc[0, 'max_timestamp'], 1705200099
+        )
+        self.assertEqual(
+            len(self.db_object.load_data(
+                table_name=self.table_name,
+                schema_name=self.schema_name
+            )),
+            len(self.data)
+        )
+
+        with self.db_object.begin() as connection:
+            for start in range(0, len(new_data), 100):
+                self.db_object.insert_data(
+                    table_name=self.table_name,
+                    schema_name=self.schema_name,
+                    data=new_data.iloc[start:start + 100],
+                    connection=connection
+                )
+        self.assertEqual(
+            self.db_object.get_max_and_min_time(
+                table_name=self.table_name,
+                schema_name=self.schema_name
+            ).loc[0, 'max_timestamp'],
+            1705200299
+        )
+
+
+    def test_watermarks(self):
+        """
+        Test that `insert_data` extends the table watermark and that
+        `repair_watermark` picks up rows written outside of `insert_data`.
+        """
+        self.db_object.insert_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            data=self.data.assign(timestamp=self.data['timestamp'] + 200)
+        )
+        max_min_timestamps = self.db_object.get_max_and_min_time(
+            table_name=self.table_name,
+            schema_name=self.schema_name
+        )
+        self.assertEqual(max_min_timestamps.loc[0, 'max_timestamp'], 1705200299)
+        self.assertEqual(max_min_timestamps.loc[0, 'min_timestamp'], 1705199900)
+
+        self.data.iloc[:1].assign(timestamp=1705100000).to_sql(
+            name=self.table_name,
+            con=self.db_object.engine,
+            if_exists='append',
+            index=False
+        )
+        max_min_timestamps = self.db_object.repair_watermark(
+            table_name=self.table_name,
+            schema_name=self.schema_name
+        )
+        self.assertEqual(max_min_timestamps.loc[0, 'min_timestamp'], 1705100000)
+        max_min_timestamps = self.db_object.get_max_and_min_time(
+            table_name=self.table_name,
+            schema_name=self.schema_name
+        )
+        self.assertEqual(max_min_timestamps.loc[0, 'min_timestamp'], 1705100000)
+
+
+    def test_watermark_validation(self):
+        """
+        Test that `get_max_and_min_time` advances the watermark past rows
+        written outside of `insert_data`, that empty inserts keep it and
+        that the upsert merges repeated boundaries.
+        """
+        self.data.iloc[:1].assign(timestamp=1705300000).to_sql(
+            name=self.table_name,
+            con=self.db_object.engine,
+            if_exists='append',
+            index=False
+        )
+        self.db_object.insert_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            data=self.data.iloc[:0]
+        )
+        max_min_timestamps = self.db_object.get_max_and_min_time(
+            table_name=self.table_name,
+            schema_name=self.schema_name
+        )
+        self.assertEqual(
+            max_min_timestamps.loc[0, 'max_timestamp'], 1705300000
+        )
+        self.assertEqual(
+            max_min_timestamps.loc[0, 'min_timestamp'], 1705199900
+        )
+
+        with self.db_object.engine.begin() as connection:
+            for min_timestamp, max_timestamp in [(5, 10), (0, 7), (3, 20)]:
+                self.db_object.upsert_watermark(
+                    connection=connection,
+                    watermark_name='other_table',
+                    min_timestamp=min_timestamp,
+                    max_timestamp=max_timestamp
+                )
+            watermark = connection.execute(text(
+                "SELECT min_timestamp, max_timestamp FROM twin_watermarks "
+                "WHERE table_name = 'other_table'"
+            )).one()
+        self.assertEqual(tuple(watermark), (0, 20))
+
+
+    def test_get_max_time(self):
+        """
+        Test that `get_max_time` reads rows written outside of
+        `insert_data` and honours the lower bound.
+        """
+        self.data.iloc[:1].assign(timestamp=1705300000).to_sql(
+            name=self.table_name,
+            con=self.db_object.engine,
+            if_exists='append',
+            index=False
+        )
+        self.assertEqual(
+            self.db_object.get_max_time(
+                table_name=self.table_name,
+                schema_name=self.schema_name
+            ),
+            1705300000
+        )
+        self.assertIsNone(self.db_object.get_max_time(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            timestamps_list=[1705300001, 1705400000]
+        ))
+
+
+    def test_load_latest_rows(self):
+        """
+        Test that `load_latest_rows` finds the latest row of every asset,
+        also for assets whose data ends at different timestamps.
+        """
+        results = pd.DataFrame({
+            'timestamp': [100, 101, 102, 100, 101, 100],
+            'asset_id': ['A', 'A', 'A', 'B', 'B', 'C'],
+            'acc_destruction': [1.0, 2.0, 3.0, 10.0, 20.0, 100.0]
+        })
+        self.db_object.insert_data(
+            table_name='fleet_results',
+            schema_name=self.schema_name,
+            data=results
+        )
+        latest_rows = self.db_object.load_latest_rows(
+            table_name='fleet_results',
+            schema_name=self.schema_name,
+            group_column='asset_id',
+            columns=['asset_id', 'acc_destruction'],
+            stop_timestamp=101
+        )
+        self.assertEqual(
+            dict(zip(latest_rows['asset_id'], latest_rows['acc_destruction'])),
+            {'A': 2.0, 'B': 20.0, 'C': 100.0}
+        )
+
+
+    def test_coverage(self):
+        """
+        Test that `insert_data` maintains the coverage bitmaps and that
+        `get_coverage` reports the gaps between the inserted batches.
+        """
+        self.db_object.insert_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            data=self.data.assign(timestamp=self.data['timestamp'] + 300)
+        )
+        coverage = self.db_object.get_coverage(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            timestamps_list=[1705199900, 1705200399]
+        )
+        self.assertTrue(coverage.is_complete(1705199900, 1705200099))
+        self.assertFalse(coverage.is_complete(1705199900, 1705200399))
+        self.assertEqual(coverage.count(1705199900, 1705200399), 400)
+        self.assertEqual(
+            coverage.missing_ranges(1705199800, 1705200399),
+            [(1705199800, 1705199899), (1705200100, 1705200199)]
+        )
+        self.assertEqual(coverage.last_timestamp(), 1705200399)
+
+
+    def test_coverage_outside_insert_data(self):
+        """
+        Test that `get_coverage` follows a table written outside of
+        `insert_data`, keeps its bitmaps in the index database and reads
+        the timestamps only for new days, gaps and filled-in rows.
+        """
+        sensors_db = DBHandler(
+            server_name='local',
+            database_name='Sensors',
+            use_watermarks=False
+        )
+        readings = self.data.iloc[:100]
+
+        def append(timestamps):
+            readings.iloc[:len(timestamps)].assign(
+                timestamp=timestamps
+            ).to_sql(
+                name='readings',
+                con=sensors_db.engine,
+                if_exists='append',
+                index=False
+            )
+
+        def get_coverage():
+            return sensors_db.get_coverage(
+                table_name='readings',
+                schema_name=self.schema_name,
+                timestamps_list=[1705199900, 1705400000],
+                index_db=self.db_object
+            )
+
+        append(range(1705199900, 1705200000))
+        self.assertEqual(get_coverage().last_timestamp(), 1705199999)
+        self.assertEqual(
+            inspect(sensors_db.engine).get_table_names(), ['readings']
+        )
+        with self.db_object.engine.connect() as connection:
+            self.assertEqual(
+                connection.execute(text(
+                    "SELECT day FROM twin_coverage "
+                    "WHERE table_name = 'Sensors.dbo.readings'"
+                )).scalars().all(),
+                [1705199900 // 86400]
+            )
+
+        with patch.object(
+            sensors_db, 'scan_timestamps', wraps=sensors_db.scan_timestamps
+        ) as scan_timestamps:
+            # Unchanged and contiguously appended days are not read
+            self.assertEqual(get_coverage().last_timestamp(), 1705199999)
+            append(range(1705200000, 1705200100))
+            coverage = get_coverage()
+            self.assertTrue(coverage.is_complete(1705199900, 1705200099))
+            scan_timestamps.assert_not_called()
+
+            # Appended rows with a gap are read behind the last second only
+            append(range(1705200150, 1705200160))
+            coverage = get_coverage()
+            self.assertEqual(
+                coverage.missing_ranges(1705199900, 1705200159),
+                [(1705200100, 1705200149)]
+            )
+            self.assertEqual(
+                scan_timestamps.call_args.kwargs['timestamps_list'][0],
+                1705200100
+            )
+
+            # The gap filled in later is found by the count of the day
+            append(range(1705200100, 1705200150))
+            append([1705300000])
+            coverage = get_coverage()
+            self.assertTrue(coverage.is_complete(1705199900, 1705200159))
+            self.assertEqual(coverage.last_timestamp(), 1705300000)
+            self.assertEqual(scan_timestamps.call_count, 3)
+
+
+@skipUnless(
+    importlib.util.find_spec('duckdb_engine'),
+    'duckdb_engine is not installed'
+)
+class TestDuckDBHandler(TestEmbeddedDBHandler):
+    """
+    Runs the embedded backend tests against the DuckDB backend.
+    """
+    backend_type = 'duckdb'
@@ -0,0 +1,115 @@
+# Python/third-party imports
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+# Internal imports
+from flat_forest import flatten_forest
+from unittest import TestCase
+
+
+class TestFlatForest(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with random sensor features and smooth
+        destruction-like targets.
+        """
+        rng = np.random.default_rng(0)
+        self.features = pd.DataFrame({
+            'torque': rng.uniform(0, 3000, 2000),
+            'speed': rng.uniform(0, 300, 2000),
+            'oli_temperature': rng.uniform(-20, 100, 2000)
+        })
+        self.targets = (
+            self.features['torque'] * self.features['speed'] / 1e6
+            + self.features['oli_temperature'] / 1e3
+        )
+
+
+    def test_parity(self):
+        """
+        Test that the flattened forest predicts the same values as the
+        scikit-learn forest, also for trees of different depths and for
+        reordered feature columns.
+        """
+        model = RandomForestRegressor(
+            n_estimators=20,
+            min_samples_leaf=3,
+            random_state=0
+        )
+        model.fit(self.features[:1500], self.targets[:1500])
+        flat_forest = flatten_forest(model)
+
+        test_features = self.features[1500:]
+        np.testing.assert_allclose(
+            flat_forest.predict(test_features),
+            model.predict(test_features),
+            rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            flat_forest.predict(test_features[test_features.columns[::-1]]),
+            model.predict(test_features),
+            rtol=1e-12
+        )
+
+
+    def test_float32_thresholds(self):
+        """
+        Test that values between a float64 threshold and its float32
+        rounding follow scikit-learn.
+        """
+        features = pd.DataFrame({'time_amount': np.arange(10.0)})
+        model = RandomForestRegressor(n_estimators=3, random_state=0)
+        model.fit(features, np.arange(10.0))
+        thresholds = model.estimators_[0].tree_.threshold
+        close_values = pd.DataFrame({
+            'time_amount': np.concatenate([
+                np.nextafter(thresholds, np.inf),
+                np.nextafter(thresholds, -np.inf)
+            ])
+        })
+        np.testing.assert_array_equal(
+            flatten_forest(model).predict(close_values),
+            model.predict(close_values)
+        )
+
+
+    def test_unpruned_parity(self):
+        """
+        Test that the flattened forest matches unpruned trees of very
+        different depths, including single-leaf trees.
+        """
+        model = RandomForestRegressor(n_estimators=10, random_state=0)
+        model.fit(self.features, self.targets)
+        constant_model = RandomForestRegressor(n_estimators=2).fit(
+            self.features, np.ones(len(self.features))
+        )
+        for fitted_model in (model, constant_model):
+            np.testing.assert_allclose(
+                flatten_forest(fitted_model).predict(self.features),
+                fitted_model.predict(self.features),
+                rtol=1e-12
+            )
+
+
+    def test_missing_values(self):
+        """
+        Test that rows with missing values follow the directions of
+        scikit-learn, for forests fitted with and without missing values.
+        """
+        features_with_nan = self.features.copy()
+        features_with_nan.iloc[::5, 0] = np.nan
+        features_with_nan.iloc[::7, 2] = np.nan
+        for training_features in (self.features, features_with_nan):
+            model = RandomForestRegressor(n_estimators=10, random_state=0)
+            model.fit(training_features, self.targets)
+            np.testing.assert_allclose(
+                flatten_forest(model).predict(features_with_nan),
+                model.predict(features_with_nan),
+                rtol=1e-12
+            )
+
+        flat_forest = flatten_forest(model)
+        flat_forest.missing_go_to_left = None
+        with self.assertRaises(ValueError):
+            flat_forest.predict(features_with_nan)
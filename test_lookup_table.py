@@ -0,0 +1,100 @@
+# Python/third-party imports
+import numpy as np
+import pandas as pd
+
+# Internal imports
+from lookup_table import build_lookup_table, lookup_error_report
+from unittest import TestCase
+
+
+class MultilinearModel:
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Return a function linear in every feature.
+        """
+        torque, speed, oli_temperature = np.asarray(features).T
+        return 2 * torque + speed * oli_temperature - torque * speed + 1
+
+
+class TestLookupTable(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with the lookup table of a multilinear model.
+        """
+        self.model = MultilinearModel()
+        self.lookup_table = build_lookup_table(
+            model=self.model,
+            feature_ranges={
+                'torque': (0, 3000),
+                'speed': (0, 300),
+                'oli_temperature': (-20, 100)
+            },
+            grid_size=[3, 4, 5]
+        )
+
+
+    def test_trilinear_interpolation(self):
+        """
+        Test that a function linear in every feature is interpolated
+        exactly and features outside the ranges are clamped.
+        """
+        self.assertEqual(self.lookup_table.values.shape, (3, 4, 5))
+
+        report = lookup_error_report(
+            self.lookup_table, self.model, samples=1000
+        )
+        self.assertLess(report['max_relative_error'], 1e-12)
+
+        outside = pd.DataFrame({
+            'torque': [-100.0, 3500.0],
+            'speed': [150.0, 150.0],
+            'oli_temperature': [40.0, 40.0]
+        })
+        clamped = outside.assign(torque=[0.0, 3000.0])
+        np.testing.assert_allclose(
+            self.lookup_table.predict(outside),
+            self.model.predict(clamped)
+        )
+
+
+    def test_missing_values(self):
+        """
+        Test that rows with missing features are predicted as NaN and do
+        not change the other rows.
+        """
+        features = pd.DataFrame({
+            'torque': [1000.0, np.nan, 2000.0],
+            'speed': [100.0, 100.0, np.nan],
+            'oli_temperature': [40.0, 40.0, 40.0]
+        })
+        predictions = self.lookup_table.predict(features)
+        np.testing.assert_array_equal(
+            np.isnan(predictions), [False, True, True]
+        )
+        np.testing.assert_allclose(
+            predictions[0], self.model.predict(features[:1])[0]
+        )
+
+
+    def test_outside_share(self):
+        """
+        Test that the error report counts the real inputs outside the grid.
+        """
+        features = pd.DataFrame({
+            'torque': [-100.0, 1000.0, 2000.0, np.nan],
+            'speed': [100.0, 400.0, 100.0, 100.0],
+            'oli_temperature': [40.0, 40.0, 40.0, 40.0]
+        })
+        np.testing.assert_array_equal(
+            self.lookup_table.is_outside(features),
+            [True, True, False, True]
+        )
+        report = lookup_error_report(
+            self.lookup_table, self.model, samples=100, features=features
+        )
+        self.assertEqual(report['outside_share'], 0.75)
+        self.assertIsNone(
+            lookup_error_report(
+                self.lookup_table, self.model, samples=100
+            )['outside_share']
+        )
@@ -0,0 +1,81 @@
+# Python/third-party imports
+from pathlib import Path
+import tempfile
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+# Internal imports
+from model_registry import ModelRegistry
+from unittest import TestCase
+
+
+class TestModelRegistry(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with a registry in a temporary directory and a
+        fitted forest.
+        """
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(
+            Path(self.temporary_directory.name),
+            keep_versions=2
+        )
+        features = np.arange(100, dtype=float).reshape(-1, 1)
+        self.model = RandomForestRegressor(n_estimators=5, random_state=0)
+        self.model.fit(features, features.ravel())
+        self.features = features
+
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temporary_directory.cleanup()
+
+
+    def test_activation(self):
+        """
+        Test that a registered version is loaded only after activation and
+        the old versions are pruned.
+        """
+        self.assertIsNone(self.registry.get_active_version())
+        with self.assertRaises(FileNotFoundError):
+            self.registry.load('destruction')
+
+        for _ in range(3):
+            version = self.registry.register(
+                models={'destruction': self.model},
+                metadata={'training_stop': 100}
+            )
+            self.registry.activate(version)
+        self.assertEqual(self.registry.get_versions(), ['v0002', 'v0003'])
+        self.assertEqual(self.registry.get_active_version(), 'v0003')
+
+        metadata = self.registry.get_metadata()
+        self.assertEqual(metadata['training_stop'], 100)
+        self.assertGreater(
+            metadata['files']['destruction']['size_bytes'], 0
+        )
+        np.testing.assert_array_equal(
+            self.registry.load('destruction').predict(self.features),
+            self.model.predict(self.features)
+        )
+
+
+    def test_version_order(self):
+        """
+        Test that the versions are ordered by their numbers above 9999.
+        """
+        for version in ['v0001', 'v9999', 'v10000']:
+            (self.registry.versions_path / version).mkdir(parents=True)
+        (self.registry.versions_path / '.v10001.tmp').mkdir()
+        self.assertEqual(
+            self.registry.get_versions(), ['v0001', 'v9999', 'v10000']
+        )
+        version = self.registry.register(
+            models={'destruction': self.model},
+            metadata={}
+        )
+        self.assertEqual(version, 'v10001')
+        self.registry.activate(version)
+        self.assertEqual(self.registry.get_versions(), ['v10000', 'v10001'])
@@ -0,0 +1,228 @@
+# Python/third-party imports
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import os
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, RegressorMixin
+from threadpoolctl import threadpool_info
+
+# Internal imports
+from model_types import (
+    build_model,
+    partial_fit_models,
+    record_timing,
+    supports_partial_fit,
+    timed_fit
+)
+from unittest import TestCase
+from unittest.mock import patch
+
+
+class TestPartialFitModels(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with chunks of linear data.
+        """
+        generator = np.random.default_rng(0)
+        features = generator.uniform(-1, 1, size=(2_000, 2))
+        self.data = pd.DataFrame(features, columns=['x1', 'x2'])
+        self.data['y'] = 3 * self.data['x1'] - 2 * self.data['x2'] + 1
+        self.passes = 0
+
+
+    def chunks(self):
+        """
+        Yield the data in chunks of 250 rows and count the passes.
+        """
+        self.passes += 1
+        for start in range(0, len(self.data), 250):
+            yield self.data[start:start + 250]
+
+
+    def test_partial_fit_models(self):
+        """
+        Test that a streamed model fits the data and that the final
+        estimator gets one pass per epoch.
+        """
+        model = build_model('SGDRegressor', {'random_state': 0})
+        rows = partial_fit_models(
+            models=[(model, ['x1', 'x2'], 'y')],
+            chunks=self.chunks,
+            epochs=3
+        )
+        self.assertEqual(rows, len(self.data))
+        # One pass of the scaler and three passes of the regressor
+        self.assertEqual(self.passes, 4)
+        self.assertEqual(model.steps[-1][1].t_, 3 * len(self.data) + 1)
+        self.assertGreater(
+            model.score(self.data[['x1', 'x2']], self.data['y']), 0.99
+        )
+
+
+    def test_unsupported_model(self):
+        """
+        Test that models without `partial_fit` are refused before the data
+        is read.
+        """
+        model = build_model('RandomForestRegressor')
+        self.assertFalse(supports_partial_fit(model))
+        self.assertTrue(supports_partial_fit(build_model('SGDRegressor')))
+        with self.assertRaises(ValueError):
+            partial_fit_models(
+                models=[(model, ['x1', 'x2'], 'y')],
+                chunks=self.chunks
+            )
+        self.assertEqual(self.passes, 0)
+
+
+class ThreadRecorder(RegressorMixin, BaseEstimator):
+    """
+    A regressor which records the OpenMP thread counts seen by its fit.
+    """
+
+    def fit(self, features, targets):
+        """
+        Record the thread counts instead of fitting.
+        """
+        self.threads_ = [
+            pool['num_threads']
+            for pool in threadpool_info()
+            if pool['user_api'] == 'openmp'
+        ]
+        return self
+
+
+class TestTimedFit(TestCase):
+    def test_thread_limit(self):
+        """
+        Test that concurrent fits each run with the given OpenMP thread
+        limit, which bounds models without `n_jobs`.
+        """
+        models = [ThreadRecorder(), ThreadRecorder()]
+        data = pd.DataFrame({'x': [0.0, 1.0]})
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(
+                lambda model: timed_fit(model, data, data['x'], threads=3),
+                models
+            ))
+        for model in models:
+            self.assertTrue(model.threads_)
+            self.assertEqual(set(model.threads_), {3})
+
+
+class TestRecordTiming(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with a timings file in a temporary directory.
+        """
+        self.storage_dir = TemporaryDirectory()
+        self.timings_path = Path(self.storage_dir.name) / 'model_timings.json'
+
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.storage_dir.cleanup()
+
+
+    def test_record_timing(self):
+        """
+        Test that the timings of both models are kept and that no lock or
+        temporary file is left.
+        """
+        for model_name, elapsed_time in [
+            ('destruction', 2.0),
+            ('acc_destruction', 4.0)
+        ]:
+            record_timing(
+                model_type='SGDRegressor',
+                model_name=model_name,
+                operation='fit',
+                elapsed_time=elapsed_time,
+                rows=100,
+                timings_path=self.timings_path
+            )
+        with open(self.timings_path, 'r') as timings_json:
+            timings = json.load(timings_json)
+        self.assertEqual(
+            timings['SGDRegressor']['destruction']['fit']['seconds'], 2.0
+        )
+        self.assertEqual(
+            timings['SGDRegressor']['acc_destruction']['fit']
+            ['rows_per_second'],
+            25.0
+        )
+        self.assertEqual(
+            os.listdir(self.storage_dir.name), ['model_timings.json']
+        )
+
+
+    def test_concurrent_record_timing(self):
+        """
+        Test that concurrent updates of the timings file are not lost.
+        """
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(
+                lambda index: record_timing(
+                    model_type=f'model_{index}',
+                    model_name='destruction',
+                    operation='predict',
+                    elapsed_time=1.0,
+                    rows=index,
+                    timings_path=self.timings_path
+                ),
+                range(32)
+            ))
+        with open(self.timings_path, 'r') as timings_json:
+            timings = json.load(timings_json)
+        self.assertEqual(len(timings), 32)
+
+
+    def test_stale_lock(self):
+        """
+        Test that a lock file left by a killed run is taken over.
+        """
+        lock_path = Path(f'{self.timings_path}.lock')
+        lock_path.touch()
+        os.utime(lock_path, (0, 0))
+        record_timing(
+            model_type='LinearRegression',
+            model_name='destruction',
+            operation='fit',
+            elapsed_time=1.0,
+            rows=10,
+            timings_path=self.timings_path,
+            lock_timeout=1.0
+        )
+        self.assertFalse(lock_path.exists())
+
+
+    def test_lock_taken_over(self):
+        """
+        Test that a run whose lock was taken over during a slow update
+        leaves the lock file of the new owner in place.
+        """
+        lock_path = Path(f'{self.timings_path}.lock')
+        replace = os.replace
+
+        def take_over_and_replace(source, destination):
+            """
+            Replace the lock file with the one of another run first.
+            """
+            lock_path.write_text('other-run')
+            replace(source, destination)
+
+        with patch('model_types.os.replace', take_over_and_replace):
+            record_timing(
+                model_type='LinearRegression',
+                model_name='destruction',
+                operation='fit',
+                elapsed_time=1.0,
+                rows=10,
+                timings_path=self.timings_path
+            )
+        self.assertEqual(lock_path.read_text(), 'other-run')
@@ -0,0 +1,140 @@
+# Python/third-party imports
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import numpy as np
+import pandas as pd
+
+# Internal imports
+from db_handler import DBHandler
+from engine_registry import engine_registry
+from sensor_cache import SensorCache
+from unittest import TestCase
+
+
+DAY = 24 * 60 * 60
+FIRST_DAY = 1705276800
+
+
+class TestSensorCache(TestCase):
+    def setUp(self):
+        """
+        Set up the test case with an embedded SQLite backend holding a full
+        day, an empty day, a day with a gap and NULL speeds, and the still
+        open last day.
+        """
+        self.storage_dir = TemporaryDirectory()
+        engine_registry.configure_backend(
+            backend_type='sqlite',
+            storage_path=Path(self.storage_dir.name) / 'storage'
+        )
+        self.cache_path = Path(self.storage_dir.name) / 'cache'
+        self.schema_name = 'dbo'
+        self.table_name = 'sensor_readings'
+        self.db_object = DBHandler(
+            server_name='local',
+            database_name='Sensor_readings'
+        )
+        full_day = np.arange(FIRST_DAY, FIRST_DAY + DAY, 600)
+        gap_day = np.arange(2 * DAY, 2 * DAY + 3600, 60) + FIRST_DAY
+        open_day = np.arange(3 * DAY, 3 * DAY + 600) + FIRST_DAY
+        self.data = pd.DataFrame({
+            'timestamp': np.concatenate([full_day, gap_day, open_day]),
+            'asset_id': 'WT-01'
+        })
+        self.data['torque'] = self.data['timestamp'] % 3000 * 1.0
+        self.data['speed'] = np.where(
+            self.data['timestamp'].isin(gap_day),
+            np.nan,
+            150.0
+        )
+        self.db_object.insert_data(
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            data=self.data
+        )
+
+
+    def tearDown(self):
+        """
+        Dispose the embedded engines and restore the default backend.
+        """
+        engine_registry.dispose_all()
+        engine_registry.configure_backend()
+        self.storage_dir.cleanup()
+
+
+    def load(self, cache: SensorCache) -> pd.DataFrame:
+        """
+        Loads all days of the sensor table through the cache.
+        """
+        return cache.load_data(
+            db_handler=self.db_object,
+            table_name=self.table_name,
+            schema_name=self.schema_name,
+            timestamps_list=[FIRST_DAY, FIRST_DAY + 4 * DAY - 1]
+        )
+
+
+    def test_round_trip(self):
+        """
+        Test that full, empty and gap partitions are stored without
+        pickling and read back equal to the database rows.
+        """
+        cache = SensorCache(cache_path=self.cache_path)
+        first_data = self.load(cache)
+        self.assertEqual(cache.stats()['misses'], 3)
+        pd.testing.assert_frame_equal(
+            first_data,
+            self.data,
+            check_dtype=False
+        )
+
+        second_data = self.load(cache)
+        self.assertEqual(cache.stats()['hits'], 3)
+        pd.testing.assert_frame_equal(
+            second_data,
+            first_data,
+            check_dtype=False
+        )
+        self.assertEqual(second_data['timestamp'].dtype, np.int64)
+        self.assertEqual(second_data['speed'].isna().sum(), 60)
+
+        partition_files = sorted(self.cache_path.glob('*/*.npz'))
+        self.assertEqual(len(partition_files), 3)
+        self.assertTrue(
+            partition_files[0].parent.name.startswith('sqlite.local.')
+        )
+        for partition_file in partition_files:
+            with np.load(partition_file, allow_pickle=False) as arrays:
+                self.assertEqual(arrays['timestamp'].dtype, np.int64)
+
+
+    def test_unreadable_partition(self):
+        """
+        Test that an unreadable partition is read again from the database
+        as a cache miss.
+        """
+        cache = SensorCache(cache_path=self.cache_path)
+        first_data = self.load(cache)
+        partition_file = sorted(self.cache_path.glob('*/*.npz'))[0]
+        partition_file.write_bytes(b'not a partition')
+
+        cache = SensorCache(cache_path=self.cache_path)
+        pd.testing.assert_frame_equal(self.load(cache), first_data)
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+
+    def test_eviction(self):
+        """
+        Test that the least recently used partitions are removed above the
+        size limit and the most recent one is kept.
+        """
+        cache = SensorCache(cache_path=self.cache_path, max_bytes=1)
+        self.load(cache)
+        partition_files = list(self.cache_path.glob('*/*.npz'))
+        self.assertEqual(cache.stats()['partitions'], 1)
+        self.assertEqual(
+            [partition_file.name for partition_file in partition_files],
+            [f'{FIRST_DAY + 2 * DAY}.npz']
+        )
@@ -1,13 +1,25 @@
 # Internal imports
 from db_handler import DBHandler
 from settings import Settings
+from checkpoint_store import CheckpointStore
 
 
-def get_timestamps():
+def get_timestamps(checkpoint_store: CheckpointStore | None = None):
     # Load settings
     """
     Retrieves the timestamps for the next calculations batch.
 
+    Parameters
+    ----------
+    checkpoint_store : CheckpointStore | None, optional
+        The pipeline progress record. If its calculation stage matches the
+        latest timestamp of the results table (one index seek), the
+        timestamps are taken from it. Otherwise the results were saved
+        without the record (e.g. a crash between the insert and the record
+        save), so the stage is aligned with the results table and the
+        running destruction state of the record is dropped.
+        Defaults to None.
+
     Returns
     -------
     tuple[int, int, int]
@@ -27,13 +39,30 @@ def get_timestamps():
     # Get the objects of dbs
     sensors_db = DBHandler(
         server_name=server_name,
-        database_name=sensors_db_settings['database']
+        database_name=sensors_db_settings['database'],
+        use_watermarks=False
     )
     results_db = DBHandler(
         server_name=server_name,
         database_name=results_db_settings['database']
     )
 
+    calculation_stage = (
+        None if checkpoint_store is None
+        else checkpoint_store.get_stage('calculation')
+    )
+    if calculation_stage is not None:
+        last_results_timestamp = results_db.get_max_time(
+            table_name=results_db_settings['table'],
+            schema_name=results_db_settings['schema']
+        )
+        if calculation_stage['last_timestamp'] == last_results_timestamp:
+            return (
+                calculation_stage['last_timestamp'] + 1,
+                calculation_stage['first_timestamp'],
+                calculation_stage['last_timestamp']
+            )
+
     # Get The latest results timestamp -> sensors timestamps for new calcs
     max_min_results_timestamps = results_db.get_max_and_min_time(
         table_name=results_db_settings['table'],
@@ -49,8 +78,68 @@ def get_timestamps():
     else:
         start_sensors_timestamp = max_results_timestamp + 1
 
+    if checkpoint_store is not None and checkpoint_store.reconcile(
+        'calculation',
+        last_timestamp=max_results_timestamp,
+        first_timestamp=min_results_timestamp
+    ):
+        # The running state belongs to the old high-water mark
+        checkpoint_store.state['accumulator'] = None
+        checkpoint_store.save()
+
     return (
         start_sensors_timestamp,
         min_results_timestamp,
         max_results_timestamp
     )
+
+
+def get_last_prediction_timestamp() -> int | None:
+    """
+    Retrieves the latest timestamp of the predictions data.
+
+    Returns
+    -------
+    int | None
+        The latest predictions timestamp or None if there are no
+        predictions.
+    """
+
+    (
+        server_name,
+        _,
+        _,
+        _,
+        predictions_db_settings
+    ) = Settings().get_db_settings()
+    predictions_db = DBHandler(
+        server_name=server_name,
+        database_name=predictions_db_settings['database']
+    )
+    return predictions_db.get_max_time(
+        table_name=predictions_db_settings['table'],
+        schema_name=predictions_db_settings['schema']
+    )
+
+
+def get_last_sensor_timestamp() -> int | None:
+    """
+    Retrieves the latest timestamp of the sensors data. The table is read
+    directly, as the sensors are written outside of the pipeline.
+
+    Returns
+    -------
+    int | None
+        The latest sensors timestamp or None if there's no sensors data.
+    """
+
+    server_name, _, sensors_db_settings, _, _ = Settings().get_db_settings()
+    sensors_db = DBHandler(
+        server_name=server_name,
+        database_name=sensors_db_settings['database'],
+        use_watermarks=False
+    )
+    return sensors_db.get_max_time(
+        table_name=sensors_db_settings['table'],
+        schema_name=sensors_db_settings['schema']
+    )